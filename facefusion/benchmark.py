@@ -0,0 +1,335 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from types import ModuleType
+from argparse import ArgumentError, ArgumentParser
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import glob
+import json
+import os
+import shutil
+import sys
+import time
+import numpy
+
+import facefusion.globals
+from facefusion import wording
+from facefusion.benchmark_quality import detect_face_boxes, is_benchmark_quality_comparable, create_benchmark_quality, select_benchmark_quality
+from facefusion.benchmark_store import save_benchmark_run, set_baseline_run, find_baseline_run, load_benchmark_run, compare_benchmark_runs
+from facefusion.core import update_status, load_models
+from facefusion.face_analyser import get_one_face, detect_many_faces, acquire_face_analyser, release_face_analyser
+from facefusion.face_cache import clear_faces_cache
+from facefusion.face_reference import set_face_reference, clear_face_reference
+from facefusion.model_registry import acquire_model, release_model
+from facefusion.processors.frame.core import get_frame_processors_modules, load_frame_processor_module
+from facefusion.processors.frame import globals as frame_processors_globals
+from facefusion.typing import BenchmarkReport, BenchmarkStage, BenchmarkQuality, BenchmarkRun, BoundingBox
+from facefusion.utilities import TEMP_DIRECTORY_PATH, run_ffmpeg, is_file, is_image, is_video, create_temp, clear_temp, extract_frames, merge_video, restore_audio, get_temp_frame_paths, get_temp_directory_path
+from facefusion.vision import detect_fps, detect_video_resolution, read_image
+
+BENCHMARK_SYNTHETIC_PATH = os.path.join(TEMP_DIRECTORY_PATH, 'benchmark.mp4')
+BENCHMARK_SYNTHETIC_RESOLUTION = (1280, 720)
+BENCHMARK_SYNTHETIC_DURATION = 3
+BENCHMARK_SYNTHETIC_FPS = 25
+BENCHMARK_FACE_BOXES : List[List[BoundingBox]] = []
+NAME = 'FACEFUSION.BENCHMARK'
+
+
+def run(program : ArgumentParser) -> None:
+	if not is_image(facefusion.globals.source_path):
+		update_status(wording.get('select_image_source') + wording.get('exclamation_mark'), NAME)
+		return
+	target_path = facefusion.globals.target_path
+	if is_file(target_path) and not is_video(target_path):
+		update_status(wording.get('benchmark_target_not_video'), NAME)
+	if not is_video(target_path):
+		update_status(wording.get('creating_synthetic_target'), NAME)
+		target_path = create_synthetic_target(facefusion.globals.source_path)
+	if not target_path:
+		update_status(wording.get('creating_synthetic_target_failed'), NAME)
+		return
+	facefusion.globals.target_path = target_path
+	facefusion.globals.output_path = os.path.join(get_temp_directory_path(target_path), 'output.mp4')
+	benchmark_reports : List[BenchmarkReport] = []
+	benchmark_runs : List[BenchmarkRun] = []
+	benchmark_qualities : List[BenchmarkQuality] = []
+	try:
+		for index, benchmark_config in enumerate(facefusion.globals.benchmark_configs or [ 'default' ]):
+			previous_config = apply_benchmark_config(program, benchmark_config)
+			if previous_config is None:
+				update_status(wording.get('benchmark_config_invalid').format(benchmark_config = benchmark_config), NAME)
+				sys.exit(1)
+			try:
+				if not prepare_benchmark():
+					sys.exit(1)
+				benchmark_report = benchmark(target_path)
+				benchmark_report['config'] = benchmark_config
+				benchmark_reports.append(benchmark_report)
+				benchmark_runs.append(save_benchmark_run(benchmark_report))
+				if facefusion.globals.benchmark_configs:
+					benchmark_quality = benchmark_config_quality(target_path, index, benchmark_report, benchmark_reports[0])
+					if benchmark_quality:
+						benchmark_qualities.append(benchmark_quality)
+			finally:
+				restore_benchmark_config(previous_config)
+	finally:
+		if target_path == BENCHMARK_SYNTHETIC_PATH and os.path.exists(target_path):
+			os.remove(target_path)
+		clear_temp(target_path)
+	for benchmark_report, benchmark_run in zip(benchmark_reports, benchmark_runs):
+		report_benchmark_stages(benchmark_report)
+		if facefusion.globals.benchmark_baseline:
+			set_baseline_run(benchmark_run)
+		update_status(wording.get('benchmark_run_saved').format(run_id = benchmark_run['run_id']), NAME)
+	if benchmark_qualities:
+		selected_quality = report_benchmark_qualities(benchmark_qualities)
+		write_benchmark_output(
+		{
+			'reports': benchmark_reports,
+			'qualities': benchmark_qualities,
+			'selected_config': selected_quality['config'] if selected_quality else None
+		})
+	else:
+		write_benchmark_output(benchmark_reports[0])
+
+
+def prepare_benchmark() -> bool:
+	load_models()
+	for frame_processor_module in get_frame_processors_modules(facefusion.globals.frame_processors):
+		if not frame_processor_module.pre_process('output'):
+			return False
+	return True
+
+
+def apply_benchmark_config(program : ArgumentParser, benchmark_config : str) -> Optional[Dict[str, Any]]:
+	previous_config : Dict[str, Any] = {}
+	if benchmark_config == 'default':
+		return previous_config
+	for config_item in benchmark_config.split(','):
+		key, _, value = config_item.partition('=')
+		config_module = frame_processors_globals if hasattr(frame_processors_globals, key) else facefusion.globals
+		try:
+			if not hasattr(config_module, key):
+				raise KeyError(key)
+			config_value = parse_benchmark_config_value(program, key, value)
+			previous_config[key] = getattr(config_module, key)
+			set_benchmark_config_value(config_module, key, config_value)
+		except (ValueError, KeyError):
+			restore_benchmark_config(previous_config)
+			return None
+	return previous_config
+
+
+def restore_benchmark_config(previous_config : Dict[str, Any]) -> None:
+	for key, value in previous_config.items():
+		if hasattr(frame_processors_globals, key):
+			set_benchmark_config_value(frame_processors_globals, key, value)
+		else:
+			set_benchmark_config_value(facefusion.globals, key, value)
+
+
+def parse_benchmark_config_value(program : ArgumentParser, key : str, value : str) -> Any:
+	config_program = ArgumentParser(parents = [ program ], add_help = False, allow_abbrev = False, exit_on_error = False)
+	config_args = [ '--' + key.replace('_', '-'), value ]
+	if isinstance(config_program.get_default(key), bool):
+		if value.lower() not in [ 'true', 'false', '1', '0', 'yes', 'no' ]:
+			raise ValueError(value)
+		config_args = config_args[:1]
+	try:
+		config_namespace, config_extras = config_program.parse_known_args(config_args)
+	except ArgumentError:
+		raise ValueError(value)
+	config_value = getattr(config_namespace, key, None)
+	if config_extras or isinstance(config_value, list):
+		raise ValueError(value)
+	if isinstance(config_value, bool):
+		return value.lower() in [ 'true', '1', 'yes' ]
+	return config_value
+
+
+def set_benchmark_config_value(config_module : ModuleType, key : str, value : Any) -> None:
+	setattr(config_module, key, value)
+	if config_module is frame_processors_globals and key.endswith('_model'):
+		frame_processor_module = load_frame_processor_module(key[:-len('_model')])
+		frame_processor_module.set_options('model', frame_processor_module.MODELS[value])
+		frame_processor_module.pre_check()
+
+
+def benchmark_config_quality(target_path : str, index : int, benchmark_report : BenchmarkReport, reference_report : BenchmarkReport) -> Optional[BenchmarkQuality]:
+	global BENCHMARK_FACE_BOXES
+
+	temp_directory_path = get_temp_directory_path(target_path)
+	temp_frame_paths = get_temp_frame_paths(target_path)
+	config_frame_paths = [ os.path.join(temp_directory_path, 'configs', str(index), os.path.basename(temp_frame_path)) for temp_frame_path in temp_frame_paths ]
+	reference_frame_paths = sorted(glob.glob(os.path.join(temp_directory_path, 'configs', '0', '*')))
+	if index == 0:
+		BENCHMARK_FACE_BOXES = detect_face_boxes(sorted(glob.glob(os.path.join(temp_directory_path, 'pristine', '*'))))
+	copy_frames(temp_frame_paths, config_frame_paths)
+	for temp_frame_path in temp_frame_paths:
+		os.remove(temp_frame_path)
+	if index == 0:
+		reference_frame_paths = config_frame_paths
+	if not is_benchmark_quality_comparable(benchmark_report, reference_report, config_frame_paths, reference_frame_paths):
+		update_status(wording.get('benchmark_quality_not_comparable').format(benchmark_config = benchmark_report['config']), NAME)
+		return None
+	return create_benchmark_quality(benchmark_report, config_frame_paths, reference_frame_paths, BENCHMARK_FACE_BOXES)
+
+
+def compare() -> None:
+	run_ids = facefusion.globals.benchmark_compare
+	candidate_run = load_benchmark_run(run_ids[-1])
+	baseline_run = load_benchmark_run(run_ids[0]) if len(run_ids) > 1 else None
+	if candidate_run and len(run_ids) == 1:
+		baseline_run = find_baseline_run(candidate_run)
+	if not baseline_run or not candidate_run:
+		update_status(wording.get('benchmark_run_not_found'), NAME)
+		sys.exit(1)
+	if baseline_run['fingerprint'] != candidate_run['fingerprint'] or baseline_run['settings_hash'] != candidate_run['settings_hash']:
+		update_status(wording.get('benchmark_runs_not_comparable'), NAME)
+		sys.exit(1)
+	update_status(wording.get('comparing_benchmark_runs').format(baseline_run_id = baseline_run['run_id'], candidate_run_id = candidate_run['run_id']), NAME)
+	benchmark_comparisons = compare_benchmark_runs(baseline_run, candidate_run)
+	for benchmark_comparison in benchmark_comparisons:
+		benchmark_status = wording.get('benchmark_comparison').format(**benchmark_comparison)
+		if benchmark_comparison['regression']:
+			benchmark_status += wording.get('benchmark_regression')
+		update_status(benchmark_status, NAME)
+	if any(benchmark_comparison['regression'] for benchmark_comparison in benchmark_comparisons):
+		sys.exit(1)
+
+
+def create_synthetic_target(source_path : str) -> Optional[str]:
+	width, height = BENCHMARK_SYNTHETIC_RESOLUTION
+	Path(TEMP_DIRECTORY_PATH).mkdir(parents = True, exist_ok = True)
+	commands = [ '-loop', '1', '-i', source_path, '-f', 'lavfi', '-i', 'anullsrc=r=44100:cl=stereo', '-t', str(BENCHMARK_SYNTHETIC_DURATION), '-r', str(BENCHMARK_SYNTHETIC_FPS) ]
+	commands.extend([ '-vf', 'scale=' + str(width) + ':' + str(height) + ':force_original_aspect_ratio=decrease,pad=' + str(width) + ':' + str(height) + ':(ow-iw)/2:(oh-ih)/2,noise=alls=8:allf=t' ])
+	commands.extend([ '-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-c:a', 'aac', '-shortest', '-y', BENCHMARK_SYNTHETIC_PATH ])
+	if run_ffmpeg(commands):
+		return BENCHMARK_SYNTHETIC_PATH
+	return None
+
+
+def benchmark(target_path : str) -> BenchmarkReport:
+	fps = detect_fps(target_path) if facefusion.globals.keep_fps else 25.0
+	stage_times : Dict[str, List[float]] = {}
+	stage_latencies : Dict[str, List[float]] = {}
+	create_temp(target_path)
+	start_time = time.perf_counter()
+	extract_frames(target_path, fps)
+	stage_times['extraction'] = [ time.perf_counter() - start_time ]
+	temp_frame_paths = get_temp_frame_paths(target_path)
+	pristine_directory_path = os.path.join(get_temp_directory_path(target_path), 'pristine')
+	copy_frames(temp_frame_paths, [ os.path.join(pristine_directory_path, os.path.basename(temp_frame_path)) for temp_frame_path in temp_frame_paths ])
+	for _ in range(facefusion.globals.benchmark_cycles):
+		copy_frames([ os.path.join(pristine_directory_path, os.path.basename(temp_frame_path)) for temp_frame_path in temp_frame_paths ], temp_frame_paths)
+		clear_faces_cache()
+		clear_face_reference()
+		conditional_set_face_reference(temp_frame_paths)
+		acquire_face_analyser()
+		try:
+			record_stage(stage_times, stage_latencies, 'analysis', *benchmark_frames(temp_frame_paths, analyse_frame))
+			for frame_processor, frame_processor_module in zip(facefusion.globals.frame_processors, get_frame_processors_modules(facefusion.globals.frame_processors)):
+				process_frame_path = create_process_frame_path(frame_processor_module.process_frames)
+				acquire_model(frame_processor_module.get_model_key())
+				try:
+					record_stage(stage_times, stage_latencies, frame_processor, *benchmark_frames(temp_frame_paths, process_frame_path))
+				finally:
+					release_model(frame_processor_module.get_model_key())
+		finally:
+			release_face_analyser()
+		start_time = time.perf_counter()
+		merge_video(target_path, fps)
+		record_stage(stage_times, stage_latencies, 'merge', time.perf_counter() - start_time, [])
+		start_time = time.perf_counter()
+		restore_audio(target_path, facefusion.globals.output_path)
+		record_stage(stage_times, stage_latencies, 'audio_restore', time.perf_counter() - start_time, [])
+	resolution = detect_video_resolution(target_path) or (0, 0)
+	return\
+	{
+		'config': 'default',
+		'target_path': target_path,
+		'resolution': str(resolution[0]) + 'x' + str(resolution[1]),
+		'fps': fps,
+		'frame_total': len(temp_frame_paths),
+		'cycle_total': facefusion.globals.benchmark_cycles,
+		'frame_processors': facefusion.globals.frame_processors,
+		'stages': { stage_name: create_benchmark_stage(stage_times[stage_name], stage_latencies.get(stage_name, []), len(temp_frame_paths)) for stage_name in stage_times }
+	}
+
+
+def copy_frames(frame_paths : List[str], copy_frame_paths : List[str]) -> None:
+	for frame_path, copy_frame_path in zip(frame_paths, copy_frame_paths):
+		Path(os.path.dirname(copy_frame_path)).mkdir(parents = True, exist_ok = True)
+		shutil.copyfile(frame_path, copy_frame_path)
+
+
+def conditional_set_face_reference(temp_frame_paths : List[str]) -> None:
+	if 'reference' in facefusion.globals.face_recognition and temp_frame_paths:
+		reference_frame_number = min(facefusion.globals.reference_frame_number, len(temp_frame_paths) - 1)
+		reference_frame = read_image(temp_frame_paths[reference_frame_number])
+		set_face_reference(get_one_face(reference_frame, facefusion.globals.reference_face_position))
+
+
+def analyse_frame(temp_frame_path : str) -> None:
+	temp_frame = read_image(temp_frame_path)
+	if temp_frame is not None:
+		detect_many_faces(temp_frame)
+
+
+def create_process_frame_path(process_frames : Callable[..., None]) -> Callable[[str], None]:
+	return lambda temp_frame_path: process_frames(facefusion.globals.source_path, [ temp_frame_path ], lambda: None)
+
+
+def benchmark_frames(temp_frame_paths : List[str], process_frame_path : Callable[[str], None]) -> Tuple[float, List[float]]:
+	start_time = time.perf_counter()
+	with ThreadPoolExecutor(max_workers = facefusion.globals.execution_thread_count) as executor:
+		frame_latencies = list(executor.map(lambda temp_frame_path: measure_frame_latency(process_frame_path, temp_frame_path), temp_frame_paths))
+	return time.perf_counter() - start_time, frame_latencies
+
+
+def measure_frame_latency(process_frame_path : Callable[[str], None], temp_frame_path : str) -> float:
+	start_time = time.perf_counter()
+	process_frame_path(temp_frame_path)
+	return time.perf_counter() - start_time
+
+
+def record_stage(stage_times : Dict[str, List[float]], stage_latencies : Dict[str, List[float]], stage_name : str, stage_time : float, frame_latencies : List[float]) -> None:
+	stage_times.setdefault(stage_name, []).append(stage_time)
+	stage_latencies.setdefault(stage_name, []).extend(frame_latencies)
+
+
+def create_benchmark_stage(stage_times : List[float], frame_latencies : List[float], frame_total : int) -> BenchmarkStage:
+	stage_time = float(numpy.median(stage_times))
+	latency_p50 = float(numpy.percentile(frame_latencies, 50)) * 1000 if frame_latencies else 0.0
+	latency_p95 = float(numpy.percentile(frame_latencies, 95)) * 1000 if frame_latencies else 0.0
+	return\
+	{
+		'time': stage_time,
+		'fps': frame_total / stage_time if stage_time > 0 else 0.0,
+		'latency_p50': latency_p50,
+		'latency_p95': latency_p95,
+		'time_samples': stage_times,
+		'latency_samples': frame_latencies
+	}
+
+
+def report_benchmark_stages(benchmark_report : BenchmarkReport) -> None:
+	for stage_name, benchmark_stage in benchmark_report['stages'].items():
+		update_status(wording.get('benchmark_stage').format(stage_name = stage_name, **benchmark_stage), NAME)
+
+
+def report_benchmark_qualities(benchmark_qualities : List[BenchmarkQuality]) -> Optional[BenchmarkQuality]:
+	for benchmark_quality in benchmark_qualities:
+		update_status(wording.get('benchmark_quality').format(**benchmark_quality), NAME)
+	selected_quality = select_benchmark_quality(benchmark_qualities, facefusion.globals.benchmark_quality_budget)
+	if selected_quality:
+		update_status(wording.get('benchmark_quality_selected').format(config = selected_quality['config']), NAME)
+	return selected_quality
+
+
+def write_benchmark_output(benchmark_output : Any) -> None:
+	benchmark_json = json.dumps(benchmark_output, indent = 4)
+	if facefusion.globals.benchmark_output_path:
+		with open(facefusion.globals.benchmark_output_path, 'w') as benchmark_file:
+			benchmark_file.write(benchmark_json)
+	else:
+		print(benchmark_json)
@@ -0,0 +1,100 @@
+from typing import Dict, List, Optional
+import math
+import cv2
+import numpy
+
+from facefusion.face_analyser import detect_many_faces
+from facefusion.typing import BenchmarkQuality, BenchmarkReport, BoundingBox, Frame
+from facefusion.vision import read_image
+
+BENCHMARK_PSNR_LIMIT = 100.0
+BENCHMARK_FACE_SIZE = 16
+
+
+def detect_face_boxes(frame_paths : List[str]) -> List[List[BoundingBox]]:
+	face_boxes = []
+	for frame_path in frame_paths:
+		frame = read_image(frame_path)
+		faces = detect_many_faces(frame) if frame is not None else []
+		frame_face_boxes : List[BoundingBox] = []
+		for face in faces:
+			start_x, start_y, end_x, end_y = face.bbox.astype(int).tolist()
+			frame_face_boxes.append((start_x, start_y, end_x, end_y))
+		face_boxes.append(frame_face_boxes)
+	return face_boxes
+
+
+def is_benchmark_quality_comparable(benchmark_report : BenchmarkReport, reference_report : BenchmarkReport, frame_paths : List[str], reference_frame_paths : List[str]) -> bool:
+	return benchmark_report['fps'] == reference_report['fps'] and len(frame_paths) == len(reference_frame_paths)
+
+
+def create_benchmark_quality(benchmark_report : BenchmarkReport, frame_paths : List[str], reference_frame_paths : List[str], face_boxes : List[List[BoundingBox]]) -> BenchmarkQuality:
+	qualities : Dict[str, List[float]] =\
+	{
+		'psnr': [],
+		'ssim': [],
+		'face_psnr': [],
+		'face_ssim': []
+	}
+	for frame_path, reference_frame_path, frame_face_boxes in zip(frame_paths, reference_frame_paths, face_boxes):
+		frame = read_image(frame_path)
+		reference_frame = read_image(reference_frame_path)
+		if frame is None or reference_frame is None:
+			continue
+		if frame.shape != reference_frame.shape:
+			frame = cv2.resize(frame, (reference_frame.shape[1], reference_frame.shape[0]), interpolation = cv2.INTER_AREA)
+		qualities['psnr'].append(calc_psnr(frame, reference_frame))
+		qualities['ssim'].append(calc_ssim(frame, reference_frame))
+		for face_box in frame_face_boxes:
+			crop_frame = crop_face_box(frame, face_box)
+			reference_crop_frame = crop_face_box(reference_frame, face_box)
+			if crop_frame is not None and reference_crop_frame is not None:
+				qualities['face_psnr'].append(calc_psnr(crop_frame, reference_crop_frame))
+				qualities['face_ssim'].append(calc_ssim(crop_frame, reference_crop_frame))
+	psnr = float(numpy.mean(qualities['psnr'])) if qualities['psnr'] else 0.0
+	ssim = float(numpy.mean(qualities['ssim'])) if qualities['ssim'] else 0.0
+	return\
+	{
+		'config': benchmark_report['config'],
+		'time': sum(benchmark_stage['time'] for benchmark_stage in benchmark_report['stages'].values()),
+		'psnr': psnr,
+		'ssim': ssim,
+		'face_psnr': float(numpy.mean(qualities['face_psnr'])) if qualities['face_psnr'] else psnr,
+		'face_ssim': float(numpy.mean(qualities['face_ssim'])) if qualities['face_ssim'] else ssim
+	}
+
+
+def select_benchmark_quality(benchmark_qualities : List[BenchmarkQuality], quality_budget : float) -> Optional[BenchmarkQuality]:
+	benchmark_qualities = [ benchmark_quality for benchmark_quality in benchmark_qualities if benchmark_quality['face_ssim'] >= quality_budget ]
+	if benchmark_qualities:
+		return min(benchmark_qualities, key = lambda benchmark_quality: benchmark_quality['time'])
+	return None
+
+
+def crop_face_box(frame : Frame, face_box : BoundingBox) -> Optional[Frame]:
+	height, width = frame.shape[:2]
+	start_x, start_y, end_x, end_y = max(face_box[0], 0), max(face_box[1], 0), min(face_box[2], width), min(face_box[3], height)
+	if end_x - start_x >= BENCHMARK_FACE_SIZE and end_y - start_y >= BENCHMARK_FACE_SIZE:
+		return frame[start_y:end_y, start_x:end_x]
+	return None
+
+
+def calc_psnr(frame : Frame, reference_frame : Frame) -> float:
+	mean_squared_error = numpy.mean((frame.astype(numpy.float64) - reference_frame.astype(numpy.float64)) ** 2)
+	if mean_squared_error == 0:
+		return BENCHMARK_PSNR_LIMIT
+	return min(10 * math.log10(255 ** 2 / mean_squared_error), BENCHMARK_PSNR_LIMIT)
+
+
+def calc_ssim(frame : Frame, reference_frame : Frame) -> float:
+	frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY).astype(numpy.float64)
+	reference_frame = cv2.cvtColor(reference_frame, cv2.COLOR_BGR2GRAY).astype(numpy.float64)
+	luminance_constant = (0.01 * 255) ** 2
+	contrast_constant = (0.03 * 255) ** 2
+	frame_mean = cv2.GaussianBlur(frame, (11, 11), 1.5)
+	reference_frame_mean = cv2.GaussianBlur(reference_frame, (11, 11), 1.5)
+	frame_variance = cv2.GaussianBlur(frame ** 2, (11, 11), 1.5) - frame_mean ** 2
+	reference_frame_variance = cv2.GaussianBlur(reference_frame ** 2, (11, 11), 1.5) - reference_frame_mean ** 2
+	covariance = cv2.GaussianBlur(frame * reference_frame, (11, 11), 1.5) - frame_mean * reference_frame_mean
+	ssim_map = ((2 * frame_mean * reference_frame_mean + luminance_constant) * (2 * covariance + contrast_constant)) / ((frame_mean ** 2 + reference_frame_mean ** 2 + luminance_constant) * (frame_variance + reference_frame_variance + contrast_constant))
+	return float(numpy.mean(ssim_map))
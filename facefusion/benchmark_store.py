@@ -0,0 +1,232 @@
+from typing import Any, Dict, List, Optional
+from pathlib import Path
+import glob
+import hashlib
+import json
+import math
+import os
+import platform
+import subprocess
+import time
+import psutil
+
+import facefusion.globals
+from facefusion import metadata
+from facefusion.typing import BenchmarkReport, BenchmarkRun, BenchmarkStage, BenchmarkComparison, BenchmarkSamplesKey, MicrobenchmarkResult
+from facefusion.processors.frame import globals as frame_processors_globals
+
+BENCHMARK_SIGNIFICANCE = 0.05
+BENCHMARK_THRESHOLD = 0.05
+BENCHMARK_TINY = 1e-30
+BENCHMARK_METRICS : Dict[str, BenchmarkSamplesKey] =\
+{
+	'time': 'time_samples',
+	'latency': 'latency_samples'
+}
+
+
+def save_benchmark_run(benchmark_report : BenchmarkReport) -> BenchmarkRun:
+	revision = detect_revision()
+	settings_hash = create_settings_hash(benchmark_report)
+	benchmark_run : BenchmarkRun =\
+	{
+		'run_id': time.strftime('%Y%m%d-%H%M%S') + '-' + revision[:7] + '-' + settings_hash[:6],
+		'fingerprint': create_machine_fingerprint(),
+		'settings_hash': settings_hash,
+		'revision': revision,
+		'created_at': time.time(),
+		'report': benchmark_report
+	}
+	write_benchmark_run(os.path.join(facefusion.globals.benchmark_store_path, benchmark_run['run_id'] + '.json'), benchmark_run)
+	return benchmark_run
+
+
+def set_baseline_run(benchmark_run : BenchmarkRun) -> None:
+	write_benchmark_run(get_baseline_run_path(benchmark_run['fingerprint'], benchmark_run['settings_hash']), benchmark_run)
+
+
+def find_baseline_run(benchmark_run : BenchmarkRun) -> Optional[BenchmarkRun]:
+	return read_benchmark_run(get_baseline_run_path(benchmark_run['fingerprint'], benchmark_run['settings_hash']))
+
+
+def load_benchmark_run(run_id : str) -> Optional[BenchmarkRun]:
+	if run_id == 'latest':
+		benchmark_run_paths = [ benchmark_run_path for benchmark_run_path in glob.glob(os.path.join(facefusion.globals.benchmark_store_path, '*.json')) if not os.path.basename(benchmark_run_path).startswith('baseline-') ]
+		if benchmark_run_paths:
+			return read_benchmark_run(max(benchmark_run_paths, key = os.path.getmtime))
+		return None
+	return read_benchmark_run(os.path.join(facefusion.globals.benchmark_store_path, run_id + '.json'))
+
+
+def save_microbenchmark_baseline(microbenchmark_results : Dict[str, MicrobenchmarkResult]) -> None:
+	microbenchmark_baseline_path = get_microbenchmark_baseline_path()
+	Path(os.path.dirname(microbenchmark_baseline_path)).mkdir(parents = True, exist_ok = True)
+	with open(microbenchmark_baseline_path, 'w') as microbenchmark_baseline_file:
+		json.dump(microbenchmark_results, microbenchmark_baseline_file, indent = 4)
+
+
+def load_microbenchmark_baseline() -> Optional[Dict[str, MicrobenchmarkResult]]:
+	microbenchmark_baseline_path = get_microbenchmark_baseline_path()
+	if os.path.isfile(microbenchmark_baseline_path):
+		with open(microbenchmark_baseline_path) as microbenchmark_baseline_file:
+			return json.load(microbenchmark_baseline_file)
+	return None
+
+
+def get_microbenchmark_baseline_path() -> str:
+	return os.path.join(facefusion.globals.benchmark_store_path, 'microbenchmark-baseline-' + create_machine_fingerprint() + '-' + create_microbenchmark_settings_hash() + '.json')
+
+
+def get_baseline_run_path(fingerprint : str, settings_hash : str) -> str:
+	return os.path.join(facefusion.globals.benchmark_store_path, 'baseline-' + fingerprint + '-' + settings_hash + '.json')
+
+
+def read_benchmark_run(benchmark_run_path : str) -> Optional[BenchmarkRun]:
+	if os.path.isfile(benchmark_run_path):
+		with open(benchmark_run_path) as benchmark_run_file:
+			return json.load(benchmark_run_file)
+	return None
+
+
+def write_benchmark_run(benchmark_run_path : str, benchmark_run : BenchmarkRun) -> None:
+	Path(os.path.dirname(benchmark_run_path)).mkdir(parents = True, exist_ok = True)
+	with open(benchmark_run_path, 'w') as benchmark_run_file:
+		json.dump(benchmark_run, benchmark_run_file, indent = 4)
+
+
+def create_machine_fingerprint() -> str:
+	machine =\
+	[
+		platform.system(),
+		platform.machine(),
+		platform.processor(),
+		os.cpu_count(),
+		psutil.virtual_memory().total
+	]
+	return create_hash(machine)
+
+
+def create_settings_hash(benchmark_report : BenchmarkReport) -> str:
+	settings =\
+	{
+		'resolution': benchmark_report['resolution'],
+		'frame_total': benchmark_report['frame_total'],
+		'frame_processors': benchmark_report['frame_processors'],
+		'execution_providers': facefusion.globals.execution_providers,
+		'execution_thread_count': facefusion.globals.execution_thread_count,
+		'execution_queue_count': facefusion.globals.execution_queue_count,
+		'face_recognition': facefusion.globals.face_recognition,
+		'temp_frame_format': facefusion.globals.temp_frame_format,
+		'temp_frame_quality': facefusion.globals.temp_frame_quality,
+		'output_video_encoder': facefusion.globals.output_video_encoder,
+		'output_video_quality': facefusion.globals.output_video_quality,
+		'face_swapper_model': frame_processors_globals.face_swapper_model,
+		'face_enhancer_model': frame_processors_globals.face_enhancer_model,
+		'face_enhancer_blend': frame_processors_globals.face_enhancer_blend,
+		'frame_enhancer_model': frame_processors_globals.frame_enhancer_model,
+		'frame_enhancer_blend': frame_processors_globals.frame_enhancer_blend
+	}
+	return create_hash(settings)
+
+
+def create_microbenchmark_settings_hash() -> str:
+	settings =\
+	{
+		'face_analyser_direction': facefusion.globals.face_analyser_direction,
+		'face_analyser_age': facefusion.globals.face_analyser_age,
+		'face_analyser_gender': facefusion.globals.face_analyser_gender,
+		'reference_face_distance': facefusion.globals.reference_face_distance,
+		'temp_frame_format': facefusion.globals.temp_frame_format,
+		'temp_frame_quality': facefusion.globals.temp_frame_quality,
+		'face_enhancer_blend': frame_processors_globals.face_enhancer_blend
+	}
+	return create_hash(settings)
+
+
+def create_hash(value : Any) -> str:
+	return hashlib.sha256(json.dumps(value, sort_keys = True).encode()).hexdigest()[:12]
+
+
+def detect_revision() -> str:
+	try:
+		return subprocess.run([ 'git', 'rev-parse', 'HEAD' ], cwd = os.path.dirname(__file__), capture_output = True, check = True).stdout.decode().strip()
+	except (OSError, subprocess.CalledProcessError):
+		return metadata.get('version')
+
+
+def compare_benchmark_runs(baseline_run : BenchmarkRun, candidate_run : BenchmarkRun) -> List[BenchmarkComparison]:
+	benchmark_comparisons : List[BenchmarkComparison] = []
+	for stage_name, candidate_stage in candidate_run['report']['stages'].items():
+		baseline_stage : Optional[BenchmarkStage] = baseline_run['report']['stages'].get(stage_name)
+		if baseline_stage:
+			for metric, samples_key in BENCHMARK_METRICS.items():
+				baseline_samples = baseline_stage[samples_key]
+				candidate_samples = candidate_stage[samples_key]
+				if baseline_samples and candidate_samples:
+					benchmark_comparisons.append(compare_samples(stage_name, metric, baseline_samples, candidate_samples))
+	return benchmark_comparisons
+
+
+def compare_samples(stage_name : str, metric : str, baseline_samples : List[float], candidate_samples : List[float]) -> BenchmarkComparison:
+	baseline_mean = sum(baseline_samples) / len(baseline_samples)
+	candidate_mean = sum(candidate_samples) / len(candidate_samples)
+	change = (candidate_mean - baseline_mean) / baseline_mean if baseline_mean > 0 else 0.0
+	p_value = calc_welch_p_value(baseline_samples, candidate_samples)
+	return\
+	{
+		'stage_name': stage_name,
+		'metric': metric,
+		'baseline': baseline_mean,
+		'candidate': candidate_mean,
+		'change': change,
+		'p_value': p_value,
+		'regression': p_value < BENCHMARK_SIGNIFICANCE and change > BENCHMARK_THRESHOLD
+	}
+
+
+def calc_welch_p_value(baseline_samples : List[float], candidate_samples : List[float]) -> float:
+	baseline_total = len(baseline_samples)
+	candidate_total = len(candidate_samples)
+	if baseline_total < 2 or candidate_total < 2:
+		return 1.0
+	baseline_mean = sum(baseline_samples) / baseline_total
+	candidate_mean = sum(candidate_samples) / candidate_total
+	baseline_error = sum((sample - baseline_mean) ** 2 for sample in baseline_samples) / (baseline_total - 1) / baseline_total
+	candidate_error = sum((sample - candidate_mean) ** 2 for sample in candidate_samples) / (candidate_total - 1) / candidate_total
+	standard_error = baseline_error + candidate_error
+	if standard_error == 0:
+		return 1.0 if baseline_mean == candidate_mean else 0.0
+	t_value = (candidate_mean - baseline_mean) / math.sqrt(standard_error)
+	degrees_of_freedom = standard_error ** 2 / (baseline_error ** 2 / (baseline_total - 1) + candidate_error ** 2 / (candidate_total - 1))
+	return calc_incomplete_beta(degrees_of_freedom / (degrees_of_freedom + t_value ** 2), degrees_of_freedom / 2, 0.5)
+
+
+def calc_incomplete_beta(x : float, a : float, b : float) -> float:
+	if x <= 0:
+		return 0.0
+	if x >= 1:
+		return 1.0
+	front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log(1 - x))
+	if x < (a + 1) / (a + b + 2):
+		return front * calc_beta_fraction(x, a, b) / a
+	return 1 - front * calc_beta_fraction(1 - x, b, a) / b
+
+
+def calc_beta_fraction(x : float, a : float, b : float) -> float:
+	c = 1.0
+	d = 1 / limit_beta_term(1 - (a + b) * x / (a + 1))
+	fraction = d
+	for m in range(1, 200):
+		for numerator in [ m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)), -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1)) ]:
+			d = 1 / limit_beta_term(1 + numerator * d)
+			c = limit_beta_term(1 + numerator / c)
+			fraction *= d * c
+		if abs(d * c - 1) < 1e-10:
+			break
+	return fraction
+
+
+def limit_beta_term(term : float) -> float:
+	if abs(term) < BENCHMARK_TINY:
+		return BENCHMARK_TINY
+	return term
@@ -5,19 +5,25 @@ os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
 
 import signal
 import sys
+import time
+from typing import Any, Callable, List, Tuple
 import warnings
 import platform
 import shutil
 import onnxruntime
-import tensorflow
 from argparse import ArgumentParser, HelpFormatter
+from concurrent.futures import ThreadPoolExecutor
 
 import facefusion.choices
 import facefusion.globals
+import facefusion.face_analyser as face_analyser
 from facefusion import metadata, wording
+from facefusion.face_index import clear_face_index
+from facefusion.model_registry import is_model_resident, get_resident_model
 from facefusion.predictor import predict_image, predict_video
-from facefusion.processors.frame.core import get_frame_processors_modules, load_frame_processor_module
-from facefusion.utilities import is_image, is_video, detect_fps, compress_image, merge_video, extract_frames, get_temp_frame_paths, restore_audio, create_temp, move_temp, clear_temp, list_module_names, encode_execution_providers, decode_execution_providers, normalize_output_path
+from facefusion.processors.frame.core import get_frame_processors_modules, get_processed_temp_frame_paths, clear_processed_temp_frame_paths
+from facefusion.processors.frame.registry import list_frame_processors, has_frame_processor_capability, register_frame_processors_args, apply_frame_processors_args
+from facefusion.utilities import is_file, is_image, is_video, detect_fps, compress_image, merge_video, merge_video_audio, smart_merge_video, extract_frames, get_temp_frame_paths, restore_audio, create_temp, move_temp, clear_temp, list_module_names, encode_execution_providers, decode_execution_providers, normalize_output_path
 
 warnings.filterwarnings('ignore', category = FutureWarning, module = 'insightface')
 warnings.filterwarnings('ignore', category = UserWarning, module = 'torchvision')
@@ -35,12 +41,25 @@ def cli() -> None:
 	group_misc = program.add_argument_group('misc')
 	group_misc.add_argument('--skip-download', help = wording.get('skip_download_help'), dest = 'skip_download', action = 'store_true')
 	group_misc.add_argument('--headless', help = wording.get('headless_help'), dest = 'headless', action = 'store_true')
+	group_misc.add_argument('--live-inputs', help = wording.get('live_inputs_help'), dest = 'live_inputs', default = [], nargs = '+')
+	# benchmark
+	group_benchmark = program.add_argument_group('benchmark')
+	group_benchmark.add_argument('--benchmark', help = wording.get('benchmark_help'), dest = 'benchmark', action = 'store_true')
+	group_benchmark.add_argument('--microbenchmark', help = wording.get('microbenchmark_help'), dest = 'microbenchmark', action = 'store_true')
+	group_benchmark.add_argument('--benchmark-cycles', help = wording.get('benchmark_cycles_help'), dest = 'benchmark_cycles', type = int, default = 3, choices = range(1, 11), metavar = '[1-10]')
+	group_benchmark.add_argument('--benchmark-output-path', help = wording.get('benchmark_output_path_help'), dest = 'benchmark_output_path')
+	group_benchmark.add_argument('--benchmark-configs', help = wording.get('benchmark_configs_help'), dest = 'benchmark_configs', default = [], nargs = '+', metavar = 'CONFIG')
+	group_benchmark.add_argument('--benchmark-quality-budget', help = wording.get('benchmark_quality_budget_help'), dest = 'benchmark_quality_budget', type = float, default = 0.95)
+	group_benchmark.add_argument('--benchmark-store-path', help = wording.get('benchmark_store_path_help'), dest = 'benchmark_store_path', default = os.path.join(os.path.expanduser('~'), '.cache', 'facefusion', 'benchmarks'))
+	group_benchmark.add_argument('--benchmark-baseline', help = wording.get('benchmark_baseline_help'), dest = 'benchmark_baseline', action = 'store_true')
+	group_benchmark.add_argument('--benchmark-compare', help = wording.get('benchmark_compare_help'), dest = 'benchmark_compare', default = [], nargs = '+', metavar = 'RUN_ID')
 	# execution
 	group_execution = program.add_argument_group('execution')
 	group_execution.add_argument('--execution-providers', help = wording.get('execution_providers_help').format(choices = 'cpu'), dest = 'execution_providers', default = [ 'cpu' ], choices = encode_execution_providers(onnxruntime.get_available_providers()), nargs = '+')
 	group_execution.add_argument('--execution-thread-count', help = wording.get('execution_thread_count_help'), dest = 'execution_thread_count', type = int, default = 1)
 	group_execution.add_argument('--execution-queue-count', help = wording.get('execution_queue_count_help'), dest = 'execution_queue_count', type = int, default = 1)
 	group_execution.add_argument('--max-memory', help=wording.get('max_memory_help'), dest='max_memory', type = int)
+	group_execution.add_argument('--model-memory-budget', help = wording.get('model_memory_budget_help'), dest = 'model_memory_budget', type = int, default = 4)
 	# face recognition
 	group_face_recognition = program.add_argument_group('face recognition')
 	group_face_recognition.add_argument('--face-recognition', help = wording.get('face_recognition_help'), dest = 'face_recognition', default = 'reference', choices = facefusion.choices.face_recognitions)
@@ -50,6 +69,8 @@ def cli() -> None:
 	group_face_recognition.add_argument('--reference-face-position', help = wording.get('reference_face_position_help'), dest = 'reference_face_position', type = int, default = 0)
 	group_face_recognition.add_argument('--reference-face-distance', help = wording.get('reference_face_distance_help'), dest = 'reference_face_distance', type = float, default = 1.5)
 	group_face_recognition.add_argument('--reference-frame-number', help = wording.get('reference_frame_number_help'), dest = 'reference_frame_number', type = int, default = 0)
+	group_face_recognition.add_argument('--skip-faceless-frames', help = wording.get('skip_faceless_frames_help'), dest = 'skip_faceless_frames', action = 'store_true')
+	group_face_recognition.add_argument('--skip-unselected-frames', help = wording.get('skip_unselected_frames_help'), dest = 'skip_unselected_frames', action = 'store_true')
 	# frame extraction
 	group_processing = program.add_argument_group('frame extraction')
 	group_processing.add_argument('--trim-frame-start', help = wording.get('trim_frame_start_help'), dest = 'trim_frame_start', type = int)
@@ -64,14 +85,12 @@ def cli() -> None:
 	group_output.add_argument('--output-video-quality', help = wording.get('output_video_quality_help'), dest = 'output_video_quality', type = int, default = 80, choices = range(101), metavar = '[0-100]')
 	group_output.add_argument('--keep-fps', help = wording.get('keep_fps_help'), dest = 'keep_fps', action = 'store_true')
 	group_output.add_argument('--skip-audio', help = wording.get('skip_audio_help'), dest = 'skip_audio', action = 'store_true')
+	group_output.add_argument('--smart-cut', help = wording.get('smart_cut_help'), dest = 'smart_cut', action = 'store_true')
 	# frame processors
-	available_frame_processors = list_module_names('facefusion/processors/frame/modules')
 	program = ArgumentParser(parents = [ program ], formatter_class = program.formatter_class, add_help = True)
 	group_frame_processors = program.add_argument_group('frame processors')
-	group_frame_processors.add_argument('--frame-processors', help = wording.get('frame_processors_help').format(choices = ', '.join(available_frame_processors)), dest = 'frame_processors', default = [ 'face_swapper' ], nargs = '+')
-	for frame_processor in available_frame_processors:
-		frame_processor_module = load_frame_processor_module(frame_processor)
-		frame_processor_module.register_args(group_frame_processors)
+	group_frame_processors.add_argument('--frame-processors', help = wording.get('frame_processors_help').format(choices = ', '.join(list_frame_processors())), dest = 'frame_processors', default = [ 'face_swapper' ], nargs = '+')
+	register_frame_processors_args(group_frame_processors)
 	# uis
 	group_uis = program.add_argument_group('uis')
 	group_uis.add_argument('--ui-layouts', help = wording.get('ui_layouts_help').format(choices = ', '.join(list_module_names('facefusion/uis/layouts'))), dest = 'ui_layouts', default = [ 'default' ], nargs = '+')
@@ -87,11 +106,23 @@ def apply_args(program : ArgumentParser) -> None:
 	# misc
 	facefusion.globals.skip_download = args.skip_download
 	facefusion.globals.headless = args.headless
+	facefusion.globals.live_inputs = args.live_inputs
+	# benchmark
+	facefusion.globals.benchmark = args.benchmark
+	facefusion.globals.microbenchmark = args.microbenchmark
+	facefusion.globals.benchmark_cycles = args.benchmark_cycles
+	facefusion.globals.benchmark_output_path = args.benchmark_output_path
+	facefusion.globals.benchmark_configs = args.benchmark_configs
+	facefusion.globals.benchmark_quality_budget = args.benchmark_quality_budget
+	facefusion.globals.benchmark_store_path = args.benchmark_store_path
+	facefusion.globals.benchmark_baseline = args.benchmark_baseline
+	facefusion.globals.benchmark_compare = args.benchmark_compare
 	# execution
 	facefusion.globals.execution_providers = decode_execution_providers(args.execution_providers)
 	facefusion.globals.execution_thread_count = args.execution_thread_count
 	facefusion.globals.execution_queue_count = args.execution_queue_count
 	facefusion.globals.max_memory = args.max_memory
+	facefusion.globals.model_memory_budget = args.model_memory_budget
 	# face recognition
 	facefusion.globals.face_recognition = args.face_recognition
 	facefusion.globals.face_analyser_direction = args.face_analyser_direction
@@ -100,6 +131,8 @@ def apply_args(program : ArgumentParser) -> None:
 	facefusion.globals.reference_face_position = args.reference_face_position
 	facefusion.globals.reference_face_distance = args.reference_face_distance
 	facefusion.globals.reference_frame_number = args.reference_frame_number
+	facefusion.globals.skip_faceless_frames = args.skip_faceless_frames
+	facefusion.globals.skip_unselected_frames = args.skip_unselected_frames
 	# frame extraction
 	facefusion.globals.trim_frame_start = args.trim_frame_start
 	facefusion.globals.trim_frame_end = args.trim_frame_end
@@ -112,25 +145,41 @@ def apply_args(program : ArgumentParser) -> None:
 	facefusion.globals.output_video_quality = args.output_video_quality
 	facefusion.globals.keep_fps = args.keep_fps
 	facefusion.globals.skip_audio = args.skip_audio
+	facefusion.globals.smart_cut = args.smart_cut
 	# frame processors
-	available_frame_processors = list_module_names('facefusion/processors/frame/modules')
 	facefusion.globals.frame_processors = args.frame_processors
-	for frame_processor in available_frame_processors:
-		frame_processor_module = load_frame_processor_module(frame_processor)
-		frame_processor_module.apply_args(program)
+	apply_frame_processors_args(args)
 	# uis
 	facefusion.globals.ui_layouts = args.ui_layouts
 
 
 def run(program : ArgumentParser) -> None:
 	apply_args(program)
+	if facefusion.globals.benchmark_compare:
+		import facefusion.benchmark as benchmark
+
+		benchmark.compare()
+		return
+	if facefusion.globals.microbenchmark:
+		import facefusion.microbenchmark as microbenchmark
+
+		microbenchmark.run()
+		return
 	limit_resources()
 	if not pre_check():
 		return
 	for frame_processor_module in get_frame_processors_modules(facefusion.globals.frame_processors):
 		if not frame_processor_module.pre_check():
 			return
-	if facefusion.globals.headless:
+	if facefusion.globals.live_inputs:
+		import facefusion.live as live
+
+		live.run()
+	elif facefusion.globals.benchmark:
+		import facefusion.benchmark as benchmark
+
+		benchmark.run(program)
+	elif facefusion.globals.headless:
 		conditional_process()
 	else:
 		import facefusion.uis.core as ui
@@ -149,6 +198,8 @@ def destroy() -> None:
 
 def limit_resources() -> None:
 	# prevent tensorflow memory leak
+	import tensorflow
+
 	gpus = tensorflow.config.experimental.list_physical_devices('GPU')
 	for gpu in gpus:
 		tensorflow.config.experimental.set_virtual_device_configuration(gpu,
@@ -180,6 +231,7 @@ def pre_check() -> bool:
 
 
 def conditional_process() -> None:
+	load_models()
 	for frame_processor_module in get_frame_processors_modules(facefusion.globals.frame_processors):
 		if not frame_processor_module.pre_process('output'):
 			return
@@ -189,6 +241,27 @@ def conditional_process() -> None:
 		process_video()
 
 
+def load_models() -> None:
+	model_loaders : List[Tuple[str, Any, Callable[[], Any]]] = []
+	if any(has_frame_processor_capability(frame_processor, 'face') for frame_processor in facefusion.globals.frame_processors):
+		model_loaders.append((face_analyser.NAME, face_analyser.get_model_key(), face_analyser.get_face_analyser))
+	for frame_processor_module in get_frame_processors_modules(facefusion.globals.frame_processors):
+		if is_file(frame_processor_module.get_options('model').get('path')):
+			model_loaders.append((frame_processor_module.NAME, frame_processor_module.get_model_key(), frame_processor_module.get_frame_processor))
+	model_loaders = [ model_loader for model_loader in model_loaders if not is_model_resident(model_loader[1]) ]
+	if model_loaders:
+		update_status(wording.get('loading_models'))
+		start_time = time.perf_counter()
+		with ThreadPoolExecutor(max_workers = len(model_loaders)) as executor:
+			futures = [ executor.submit(model_loader[2]) for model_loader in model_loaders ]
+			for (name, model_key, _), future in zip(model_loaders, futures):
+				future.result()
+				resident_model = get_resident_model(model_key)
+				if resident_model:
+					update_status(wording.get('model_loaded').format(load_time = resident_model['load_time'], warm_up_time = resident_model['warm_up_time']), name)
+		update_status(wording.get('models_loaded').format(total_time = time.perf_counter() - start_time))
+
+
 def process_image() -> None:
 	if predict_image(facefusion.globals.target_path):
 		return
@@ -196,8 +269,10 @@ def process_image() -> None:
 	# process frame
 	for frame_processor_module in get_frame_processors_modules(facefusion.globals.frame_processors):
 		update_status(wording.get('processing'), frame_processor_module.NAME)
-		frame_processor_module.process_image(facefusion.globals.source_path, facefusion.globals.output_path, facefusion.globals.output_path)
-		frame_processor_module.post_process()
+		try:
+			frame_processor_module.process_image(facefusion.globals.source_path, facefusion.globals.output_path, facefusion.globals.output_path)
+		finally:
+			frame_processor_module.post_process()
 	# compress image
 	update_status(wording.get('compressing_image'))
 	if not compress_image(facefusion.globals.output_path):
@@ -221,19 +296,46 @@ def process_video() -> None:
 	extract_frames(facefusion.globals.target_path, fps)
 	# process frame
 	temp_frame_paths = get_temp_frame_paths(facefusion.globals.target_path)
+	clear_face_index()
+	clear_processed_temp_frame_paths()
 	if temp_frame_paths:
 		for frame_processor_module in get_frame_processors_modules(facefusion.globals.frame_processors):
 			update_status(wording.get('processing'), frame_processor_module.NAME)
-			frame_processor_module.process_video(facefusion.globals.source_path, temp_frame_paths)
-			frame_processor_module.post_process()
+			try:
+				frame_processor_module.process_video(facefusion.globals.source_path, temp_frame_paths)
+			finally:
+				frame_processor_module.post_process()
 	else:
 		update_status(wording.get('temp_frames_not_found'))
 		return
 	# merge video
 	update_status(wording.get('merging_video_fps').format(fps = fps))
-	if not merge_video(facefusion.globals.target_path, fps):
+	if not conditional_merge_video(temp_frame_paths, fps):
 		update_status(wording.get('merging_video_failed'))
 		return
+	# clear temp
+	update_status(wording.get('clearing_temp'))
+	clear_temp(facefusion.globals.target_path)
+	# validate video
+	if is_video(facefusion.globals.target_path):
+		update_status(wording.get('processing_video_succeed'))
+	else:
+		update_status(wording.get('processing_video_failed'))
+
+
+def conditional_merge_video(temp_frame_paths : List[str], fps : float) -> bool:
+	if facefusion.globals.smart_cut:
+		processed_temp_frame_paths = get_processed_temp_frame_paths()
+		process_frame_numbers = [ frame_number for frame_number, temp_frame_path in enumerate(temp_frame_paths) if temp_frame_path in processed_temp_frame_paths ]
+		if smart_merge_video(facefusion.globals.target_path, facefusion.globals.output_path, fps, process_frame_numbers):
+			return True
+		update_status(wording.get('smart_cutting_video_failed'))
+	if not facefusion.globals.skip_audio:
+		if merge_video_audio(facefusion.globals.target_path, facefusion.globals.output_path, fps):
+			return True
+		update_status(wording.get('merging_video_audio_failed'))
+	if not merge_video(facefusion.globals.target_path, fps):
+		return False
 	# handle audio
 	if facefusion.globals.skip_audio:
 		update_status(wording.get('skipping_audio'))
@@ -243,14 +345,7 @@ def process_video() -> None:
 		if not restore_audio(facefusion.globals.target_path, facefusion.globals.output_path):
 			update_status(wording.get('restoring_audio_failed'))
 			move_temp(facefusion.globals.target_path, facefusion.globals.output_path)
-	# clear temp
-	update_status(wording.get('clearing_temp'))
-	clear_temp(facefusion.globals.target_path)
-	# validate video
-	if is_video(facefusion.globals.target_path):
-		update_status(wording.get('processing_video_succeed'))
-	else:
-		update_status(wording.get('processing_video_failed'))
+	return True
 
 
 def update_status(message : str, scope : str = 'FACEFUSION.CORE') -> None:
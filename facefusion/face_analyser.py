@@ -1,30 +1,53 @@
 from typing import Any, Optional, List
-import threading
-import insightface
+import os
 import numpy
 
 import facefusion.globals
 from facefusion.face_cache import get_faces_cache, set_faces_cache
-from facefusion.typing import Frame, Face, FaceAnalyserDirection, FaceAnalyserAge, FaceAnalyserGender
+from facefusion.model_registry import get_model, acquire_model, release_model, unload_model
+from facefusion.typing import Frame, Face, FaceAnalyserDirection, FaceAnalyserAge, FaceAnalyserGender, ModelKey
 
-FACE_ANALYSER = None
-THREAD_LOCK : threading.Lock = threading.Lock()
+NAME = 'FACEFUSION.FACE_ANALYSER'
 
 
 def get_face_analyser() -> Any:
-	global FACE_ANALYSER
+	model_path = os.path.expanduser('~/.insightface/models/buffalo_l')
+	return get_model(get_model_key(), load_face_analyser, model_path, warm_up_face_analyser)
 
-	with THREAD_LOCK:
-		if FACE_ANALYSER is None:
-			FACE_ANALYSER = insightface.app.FaceAnalysis(name = 'buffalo_l', providers = facefusion.globals.execution_providers)
-			FACE_ANALYSER.prepare(ctx_id = 0)
-	return FACE_ANALYSER
 
+def load_face_analyser() -> Any:
+	import insightface
 
-def clear_face_analyser() -> Any:
-	global FACE_ANALYSER
+	face_analyser = insightface.app.FaceAnalysis(name = 'buffalo_l', providers = facefusion.globals.execution_providers)
+	face_analyser.prepare(ctx_id = 0)
+	return face_analyser
 
-	FACE_ANALYSER = None
+
+def warm_up_face_analyser(face_analyser : Any) -> None:
+	import insightface
+
+	warm_up_frame = numpy.zeros((640, 640, 3), dtype = numpy.uint8)
+	warm_up_face = insightface.app.common.Face(bbox = numpy.array([ 192, 192, 448, 448 ], dtype = numpy.float32), kps = numpy.array([ [ 256, 272 ], [ 384, 272 ], [ 320, 336 ], [ 272, 400 ], [ 368, 400 ] ], dtype = numpy.float32), det_score = 1.0)
+	face_analyser.get(warm_up_frame)
+	for task_name, face_model in face_analyser.models.items():
+		if task_name != 'detection':
+			face_model.get(warm_up_frame, warm_up_face)
+
+
+def get_model_key() -> ModelKey:
+	return (NAME, 'buffalo_l', *facefusion.globals.execution_providers)
+
+
+def acquire_face_analyser() -> None:
+	acquire_model(get_model_key())
+
+
+def release_face_analyser() -> None:
+	release_model(get_model_key())
+
+
+def clear_face_analyser() -> None:
+	unload_model(get_model_key())
 
 
 def get_one_face(frame : Frame, position : int = 0) -> Optional[Face]:
@@ -39,23 +62,39 @@ def get_one_face(frame : Frame, position : int = 0) -> Optional[Face]:
 
 def get_many_faces(frame : Frame) -> List[Face]:
 	try:
-		faces_cache = get_faces_cache(frame)
-		if faces_cache:
-			faces = faces_cache
-		else:
-			faces = get_face_analyser().get(frame)
-			set_faces_cache(frame, faces)
-		if facefusion.globals.face_analyser_direction:
-			faces = sort_by_direction(faces, facefusion.globals.face_analyser_direction)
-		if facefusion.globals.face_analyser_age:
-			faces = filter_by_age(faces, facefusion.globals.face_analyser_age)
-		if facefusion.globals.face_analyser_gender:
-			faces = filter_by_gender(faces, facefusion.globals.face_analyser_gender)
-		return faces
+		faces = detect_many_faces(frame)
+		return sort_and_filter_faces(faces)
 	except (AttributeError, ValueError):
 		return []
 
 
+def detect_many_faces(frame : Frame) -> List[Face]:
+	faces_cache = get_faces_cache(frame)
+	if faces_cache:
+		return faces_cache
+	faces = get_face_analyser().get(frame)
+	set_faces_cache(frame, faces)
+	return faces
+
+
+def sort_and_filter_faces(faces : List[Face]) -> List[Face]:
+	if facefusion.globals.face_analyser_direction:
+		faces = sort_by_direction(faces, facefusion.globals.face_analyser_direction)
+	if facefusion.globals.face_analyser_age:
+		faces = filter_by_age(faces, facefusion.globals.face_analyser_age)
+	if facefusion.globals.face_analyser_gender:
+		faces = filter_by_gender(faces, facefusion.globals.face_analyser_gender)
+	return faces
+
+
+def has_face(frame : Frame) -> bool:
+	try:
+		bounding_boxes, _ = get_face_analyser().det_model.detect(frame, max_num = 0, metric = 'default')
+		return len(bounding_boxes) > 0
+	except (AttributeError, ValueError):
+		return False
+
+
 def find_similar_faces(frame : Frame, reference_face : Face, face_distance : float) -> List[Face]:
 	many_faces = get_many_faces(frame)
 	similar_faces = []
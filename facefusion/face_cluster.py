@@ -0,0 +1,137 @@
+from typing import Dict, Generator, List, Optional
+import numpy
+
+import facefusion.globals
+from facefusion.face_analyser import detect_many_faces
+from facefusion.face_reference import get_face_reference
+from facefusion.typing import Face, FaceCluster, Frame, FrameRange
+from facefusion.vision import count_video_frame_total, get_video_frame
+
+FACE_CLUSTERS : List[FaceCluster] = []
+FACE_CLUSTER_SAMPLE_TOTAL = 64
+FACE_CLUSTER_BATCH_SIZE = 8
+
+
+def get_face_clusters() -> List[FaceCluster]:
+	return FACE_CLUSTERS
+
+
+def clear_face_clusters() -> None:
+	global FACE_CLUSTERS
+
+	FACE_CLUSTERS = []
+
+
+def scan_face_clusters(target_path : str) -> Generator[List[FaceCluster], None, None]:
+	global FACE_CLUSTERS
+
+	frame_total = count_video_frame_total(target_path)
+	sample_frame_numbers = create_sample_frame_numbers(frame_total)
+	sample_faces : List[Face] = []
+	sample_face_frame_numbers : List[int] = []
+	crop_frames : Dict[int, Frame] = {}
+	for index, frame_number in enumerate(sample_frame_numbers):
+		if target_path != facefusion.globals.target_path:
+			return
+		temp_frame = get_video_frame(target_path, frame_number)
+		if temp_frame is not None:
+			try:
+				faces = detect_many_faces(temp_frame)
+			except (AttributeError, ValueError):
+				faces = []
+			for face in faces:
+				if hasattr(face, 'normed_embedding'):
+					sample_faces.append(face)
+					sample_face_frame_numbers.append(frame_number)
+					crop_frames[id(face)] = crop_face_frame(temp_frame, face)
+		if (index + 1) % FACE_CLUSTER_BATCH_SIZE == 0 or index + 1 == len(sample_frame_numbers):
+			FACE_CLUSTERS = create_face_clusters(sample_faces, sample_face_frame_numbers, sample_frame_numbers, frame_total)
+			crop_frames = { id(face_cluster['face']): crop_frames[id(face_cluster['face'])] for face_cluster in FACE_CLUSTERS if id(face_cluster['face']) in crop_frames }
+			for face_cluster in FACE_CLUSTERS:
+				face_cluster['crop_frame'] = crop_frames.get(id(face_cluster['face']))
+			yield FACE_CLUSTERS
+
+
+def crop_face_frame(temp_frame : Frame, face : Face) -> Frame:
+	start_x, start_y, end_x, end_y = map(int, face['bbox'])
+	padding_x = int((end_x - start_x) * 0.25)
+	padding_y = int((end_y - start_y) * 0.25)
+	start_x = max(0, start_x - padding_x)
+	start_y = max(0, start_y - padding_y)
+	end_x = max(0, end_x + padding_x)
+	end_y = max(0, end_y + padding_y)
+	return temp_frame[start_y:end_y, start_x:end_x].copy()
+
+
+def create_sample_frame_numbers(frame_total : int) -> List[int]:
+	sample_total = min(FACE_CLUSTER_SAMPLE_TOTAL, frame_total)
+	if sample_total > 0:
+		return sorted(set(numpy.linspace(0, frame_total - 1, sample_total).round().astype(int).tolist()))
+	return []
+
+
+def create_face_clusters(faces : List[Face], face_frame_numbers : List[int], sample_frame_numbers : List[int], frame_total : int) -> List[FaceCluster]:
+	face_clusters : List[FaceCluster] = []
+	if faces:
+		face_embeddings = numpy.array([ face.normed_embedding for face in faces ])
+		face_distances = 2 - 2 * numpy.dot(face_embeddings, face_embeddings.T)
+		face_scores = numpy.array([ face.det_score for face in faces ])
+		face_frame_numbers_array = numpy.array(face_frame_numbers)
+		unassigned_faces = numpy.ones(len(faces), dtype = bool)
+		for index in numpy.argsort(-face_scores):
+			if unassigned_faces[index]:
+				member_faces = unassigned_faces & (face_distances[index] < facefusion.globals.reference_face_distance)
+				member_faces[index] = True
+				unassigned_faces &= ~member_faces
+				member_frame_numbers = numpy.unique(face_frame_numbers_array[member_faces]).tolist()
+				face_clusters.append(
+				{
+					'face': faces[index],
+					'frame_number': face_frame_numbers[index],
+					'frame_ranges': create_frame_ranges(member_frame_numbers, sample_frame_numbers, frame_total),
+					'face_total': int(numpy.sum(member_faces)),
+					'crop_frame': None
+				})
+	return sorted(face_clusters, key = lambda face_cluster: face_cluster['face_total'], reverse = True)
+
+
+def create_frame_ranges(frame_numbers : List[int], sample_frame_numbers : List[int], frame_total : int) -> List[FrameRange]:
+	frame_ranges : List[FrameRange] = []
+	frame_number_set = set(frame_numbers)
+	for index, sample_frame_number in enumerate(sample_frame_numbers):
+		if sample_frame_number in frame_number_set:
+			start_frame = sample_frame_numbers[index - 1] if index > 0 else 0
+			end_frame = sample_frame_numbers[index + 1] + 1 if index + 1 < len(sample_frame_numbers) else frame_total
+			if frame_ranges and start_frame <= frame_ranges[-1][1]:
+				frame_ranges[-1] = (frame_ranges[-1][0], end_frame)
+			else:
+				frame_ranges.append((start_frame, end_frame))
+	return frame_ranges
+
+
+def find_reference_face_cluster() -> Optional[FaceCluster]:
+	reference_face = get_face_reference()
+	if 'reference' in facefusion.globals.face_recognition and hasattr(reference_face, 'normed_embedding') and FACE_CLUSTERS:
+		face_distances = [ 2 - 2 * numpy.dot(face_cluster['face'].normed_embedding, reference_face.normed_embedding) for face_cluster in FACE_CLUSTERS ]
+		face_cluster_index = int(numpy.argmin(face_distances))
+		if face_distances[face_cluster_index] < facefusion.globals.reference_face_distance:
+			return FACE_CLUSTERS[face_cluster_index]
+	return None
+
+
+def filter_face_cluster_frame_paths(temp_frame_paths : List[str]) -> List[str]:
+	if facefusion.globals.skip_unselected_frames and 'reference' in facefusion.globals.face_recognition and temp_frame_paths:
+		if not FACE_CLUSTERS:
+			for _ in scan_face_clusters(facefusion.globals.target_path):
+				pass
+		face_cluster = find_reference_face_cluster()
+		if face_cluster:
+			trim_frame_start = facefusion.globals.trim_frame_start or 0
+			trim_frame_end = facefusion.globals.trim_frame_end or count_video_frame_total(facefusion.globals.target_path)
+			frame_ratio = (trim_frame_end - trim_frame_start) / len(temp_frame_paths)
+			return [ temp_frame_path for index, temp_frame_path in enumerate(temp_frame_paths) if is_frame_in_ranges(trim_frame_start + int(index * frame_ratio), face_cluster['frame_ranges']) ]
+	return temp_frame_paths
+
+
+def is_frame_in_ranges(frame_number : int, frame_ranges : List[FrameRange]) -> bool:
+	return any(start_frame <= frame_number < end_frame for start_frame, end_frame in frame_ranges)
@@ -0,0 +1,38 @@
+from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from tqdm import tqdm
+
+import facefusion.globals
+from facefusion import wording
+from facefusion.face_analyser import has_face
+from facefusion.vision import read_image
+
+FACE_INDEX : Dict[str, bool] = {}
+
+
+def filter_face_frame_paths(temp_frame_paths : List[str]) -> List[str]:
+	if facefusion.globals.skip_faceless_frames:
+		create_face_index(temp_frame_paths)
+		return [ temp_frame_path for temp_frame_path in temp_frame_paths if FACE_INDEX.get(temp_frame_path) ]
+	return temp_frame_paths
+
+
+def create_face_index(temp_frame_paths : List[str]) -> None:
+	index_frame_paths = [ temp_frame_path for temp_frame_path in temp_frame_paths if temp_frame_path not in FACE_INDEX ]
+	if index_frame_paths:
+		with tqdm(total = len(index_frame_paths), desc = wording.get('indexing_faces'), unit = 'frame', dynamic_ncols = True) as progress:
+			with ThreadPoolExecutor(max_workers = facefusion.globals.execution_thread_count) as executor:
+				for temp_frame_path, face_presence in zip(index_frame_paths, executor.map(detect_face_presence, index_frame_paths)):
+					FACE_INDEX[temp_frame_path] = face_presence
+					progress.update()
+
+
+def detect_face_presence(temp_frame_path : str) -> bool:
+	temp_frame = read_image(temp_frame_path)
+	return has_face(temp_frame)
+
+
+def clear_face_index() -> None:
+	global FACE_INDEX
+
+	FACE_INDEX = {}
@@ -9,11 +9,23 @@ output_path : Optional[str] = None
 # misc
 skip_download : Optional[bool] = None
 headless : Optional[bool] = None
+live_inputs : List[str] = []
+# benchmark
+benchmark : Optional[bool] = None
+microbenchmark : Optional[bool] = None
+benchmark_cycles : Optional[int] = None
+benchmark_output_path : Optional[str] = None
+benchmark_configs : List[str] = []
+benchmark_quality_budget : Optional[float] = None
+benchmark_store_path : Optional[str] = None
+benchmark_baseline : Optional[bool] = None
+benchmark_compare : List[str] = []
 # execution
 execution_providers : List[str] = []
 execution_thread_count : Optional[int] = None
 execution_queue_count : Optional[int] = None
 max_memory : Optional[int] = None
+model_memory_budget : Optional[int] = None
 # face recognition
 face_recognition : Optional[FaceRecognition] = None
 face_analyser_direction : Optional[FaceAnalyserDirection] = None
@@ -22,6 +34,8 @@ face_analyser_gender : Optional[FaceAnalyserGender] = None
 reference_face_position : Optional[int] = None
 reference_face_distance : Optional[float] = None
 reference_frame_number : Optional[int] = None
+skip_faceless_frames : Optional[bool] = None
+skip_unselected_frames : Optional[bool] = None
 # frame extraction
 trim_frame_start : Optional[int] = None
 trim_frame_end : Optional[int] = None
@@ -34,6 +48,7 @@ output_video_encoder : Optional[OutputVideoEncoder] = None
 output_video_quality : Optional[int] = None
 keep_fps : Optional[bool] = None
 skip_audio : Optional[bool] = None
+smart_cut : Optional[bool] = None
 # frame processors
 frame_processors : List[str] = []
 # uis
@@ -0,0 +1,127 @@
+from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+import math
+import threading
+import time
+import cv2
+
+import facefusion.globals
+from facefusion import wording
+from facefusion.core import update_status, load_models
+from facefusion.predictor import predict_stream
+from facefusion.processors.frame.core import get_frame_processors_handles
+from facefusion.stream import STREAM_BUFFER_SIZE, read_capture_frames, is_capture_active, write_stream_frames, open_stream, create_stream_controller, submit_stream_frame, resolve_stream_frame, calc_stream_frame_budget, cancel_oldest_pending
+from facefusion.typing import LiveStream
+from facefusion.utilities import is_video
+
+LIVE_STREAM_PORT = 27000
+LIVE_STATUS_INTERVAL = 5.0
+
+
+def run() -> None:
+	facefusion.globals.face_recognition = 'many'
+	schedule_event = threading.Event()
+	live_streams = []
+	for index, live_input in enumerate(facefusion.globals.live_inputs):
+		live_stream = open_live_stream(index, live_input, schedule_event)
+		if live_stream:
+			live_streams.append(live_stream)
+	if not live_streams:
+		return
+	load_models()
+	get_frame_processors_handles(facefusion.globals.frame_processors, 'stream')
+	stream_window_size = math.ceil((facefusion.globals.execution_thread_count + facefusion.globals.execution_queue_count) / len(live_streams))
+	frame_budget = calc_stream_frame_budget(sum(live_stream['fps'] for live_stream in live_streams))
+	status_time = time.perf_counter()
+	schedule_offset = 0
+	try:
+		with ThreadPoolExecutor(max_workers = facefusion.globals.execution_thread_count) as executor:
+			while any(is_live_stream_active(live_stream) for live_stream in live_streams):
+				schedule_event.wait(0.5)
+				schedule_event.clear()
+				for live_stream in live_streams[schedule_offset:] + live_streams[:schedule_offset]:
+					schedule_live_stream(executor, live_stream, schedule_event, stream_window_size, frame_budget)
+				schedule_offset = (schedule_offset + 1) % len(live_streams)
+				if time.perf_counter() - status_time > LIVE_STATUS_INTERVAL:
+					report_live_streams(live_streams, time.perf_counter() - status_time)
+					status_time = time.perf_counter()
+	finally:
+		for live_stream in live_streams:
+			close_live_stream(live_stream)
+
+
+def open_live_stream(index : int, live_input : str, schedule_event : threading.Event) -> Optional[LiveStream]:
+	capture = cv2.VideoCapture(live_input)
+	if not capture.isOpened():
+		update_status(wording.get('live_input_not_opened').format(live_input = live_input), 'FACEFUSION.LIVE')
+		return None
+	fps = capture.get(cv2.CAP_PROP_FPS) or 25.0
+	resolution = str(int(capture.get(cv2.CAP_PROP_FRAME_WIDTH))) + 'x' + str(int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+	capture_fps = fps if is_video(live_input) else None
+	stop_event = threading.Event()
+	live_stream : LiveStream =\
+	{
+		'index': index,
+		'fps': fps,
+		'capture': capture,
+		'capture_frames': deque(maxlen = 1),
+		'capture_thread': None,
+		'stream': open_stream('udp', resolution, fps, LIVE_STREAM_PORT + index),
+		'stream_frames': deque(maxlen = STREAM_BUFFER_SIZE),
+		'stream_event': threading.Event(),
+		'stream_thread': None,
+		'stop_event': stop_event,
+		'futures': deque(),
+		'controller': create_stream_controller(),
+		'frame_total': 0,
+		'drop_total': 0,
+		'latency': 0.0
+	}
+	live_stream['capture_thread'] = threading.Thread(target = read_capture_frames, args = (capture, live_stream['capture_frames'], schedule_event, stop_event, capture_fps), daemon = True)
+	live_stream['stream_thread'] = threading.Thread(target = write_stream_frames, args = (live_stream['stream'], live_stream['stream_frames'], live_stream['stream_event'], stop_event), daemon = True)
+	live_stream['capture_thread'].start()
+	live_stream['stream_thread'].start()
+	return live_stream
+
+
+def schedule_live_stream(executor : ThreadPoolExecutor, live_stream : LiveStream, schedule_event : threading.Event, stream_window_size : int, frame_budget : float) -> None:
+	futures = live_stream['futures']
+	if live_stream['capture_frames'] and not live_stream['stop_event'].is_set():
+		capture_time, capture_frame = live_stream['capture_frames'].pop()
+		if predict_stream(capture_frame):
+			live_stream['stop_event'].set()
+			return
+		if len(futures) >= stream_window_size and cancel_oldest_pending(futures):
+			live_stream['drop_total'] += 1
+		if len(futures) < stream_window_size:
+			submit_stream_frame(executor, futures, live_stream['controller'], capture_time, capture_frame)
+			futures[-1][3].add_done_callback(lambda _: schedule_event.set())
+		else:
+			live_stream['drop_total'] += 1
+	while futures and futures[0][3].done():
+		capture_time, capture_frame = resolve_stream_frame(futures, live_stream['controller'], frame_budget)
+		live_stream['stream_frames'].append(capture_frame)
+		live_stream['stream_event'].set()
+		live_stream['frame_total'] += 1
+		live_stream['latency'] = live_stream['latency'] * 0.9 + (time.perf_counter() - capture_time) * 0.1
+
+
+def is_live_stream_active(live_stream : LiveStream) -> bool:
+	if live_stream['stop_event'].is_set():
+		return False
+	return is_capture_active(live_stream['capture_thread'], live_stream['capture_frames']) or bool(live_stream['futures'])
+
+
+def report_live_streams(live_streams : List[LiveStream], status_duration : float) -> None:
+	for live_stream in live_streams:
+		update_status(wording.get('live_stream_status').format(index = live_stream['index'], fps = live_stream['frame_total'] / status_duration, latency = live_stream['latency'] * 1000, drop_total = live_stream['drop_total']), 'FACEFUSION.LIVE')
+		live_stream['frame_total'] = 0
+
+
+def close_live_stream(live_stream : LiveStream) -> None:
+	live_stream['stop_event'].set()
+	live_stream['capture_thread'].join()
+	live_stream['capture'].release()
+	live_stream['stream_thread'].join()
+	live_stream['stream'].stdin.close()
@@ -0,0 +1,152 @@
+from typing import Any, Callable, Dict, List, Tuple
+import gc
+import os
+import sys
+import tempfile
+import time
+import cv2
+import numpy
+
+import facefusion.globals
+from facefusion import wording
+from facefusion.benchmark import write_benchmark_output
+from facefusion.benchmark_store import save_microbenchmark_baseline, load_microbenchmark_baseline, compare_samples
+from facefusion.core import update_status
+from facefusion.face_analyser import find_similar_faces, sort_by_direction
+from facefusion.face_cache import set_faces_cache, clear_faces_cache, create_frame_hash
+from facefusion.processors.frame.modules.face_enhancer import warp_face, prepare_crop_frame, normalize_crop_frame, paste_back, blend_frame
+from facefusion.typing import Face, Frame, MicrobenchmarkResult
+from facefusion.vision import read_image, write_image
+
+MICROBENCHMARK_RESOLUTIONS : Dict[str, Tuple[int, int]] =\
+{
+	'480p': (854, 480),
+	'1080p': (1920, 1080),
+	'4k': (3840, 2160)
+}
+MICROBENCHMARK_FACE_TOTAL = 4
+MICROBENCHMARK_ROUNDS = 15
+MICROBENCHMARK_ROUND_TIME = 0.05
+NAME = 'FACEFUSION.MICROBENCHMARK'
+
+
+def run() -> None:
+	microbenchmark_results : Dict[str, MicrobenchmarkResult] = {}
+	with tempfile.TemporaryDirectory() as temp_directory_path:
+		for resolution_name, resolution in MICROBENCHMARK_RESOLUTIONS.items():
+			temp_frame = create_synthetic_frame(resolution)
+			faces = create_synthetic_faces(resolution)
+			clear_faces_cache()
+			set_faces_cache(temp_frame, faces)
+			temp_frame_path = os.path.join(temp_directory_path, resolution_name + '.' + facefusion.globals.temp_frame_format)
+			for case_name, case_function in create_microbenchmark_cases(temp_frame, faces, temp_frame_path).items():
+				microbenchmark_results[case_name + '@' + resolution_name] = measure_microbenchmark(case_function)
+	clear_faces_cache()
+	for microbenchmark_name, microbenchmark_result in microbenchmark_results.items():
+		update_status(wording.get('microbenchmark_result').format(microbenchmark_name = microbenchmark_name, **microbenchmark_result), NAME)
+	write_benchmark_output(microbenchmark_results)
+	if facefusion.globals.benchmark_baseline:
+		save_microbenchmark_baseline(microbenchmark_results)
+		update_status(wording.get('microbenchmark_baseline_saved'), NAME)
+		return
+	microbenchmark_baseline = load_microbenchmark_baseline()
+	if microbenchmark_baseline and compare_microbenchmark(microbenchmark_baseline, microbenchmark_results):
+		sys.exit(1)
+
+
+def create_synthetic_frame(resolution : Tuple[int, int]) -> Frame:
+	width, height = resolution
+	random_frame = numpy.random.default_rng(0).integers(0, 255, (height, width, 3), dtype = numpy.uint8)
+	return cv2.GaussianBlur(random_frame, (0, 0), 3)
+
+
+def create_synthetic_faces(resolution : Tuple[int, int]) -> List[Face]:
+	import insightface
+
+	width, height = resolution
+	face_size = height // 4
+	random_generator = numpy.random.default_rng(0)
+	faces = []
+	for index in range(MICROBENCHMARK_FACE_TOTAL):
+		start_x = (index + 0.5) * width / MICROBENCHMARK_FACE_TOTAL - face_size / 2
+		start_y = height / 2 - face_size / 2
+		kps = numpy.array(
+		[
+			[ 0.3, 0.4 ],
+			[ 0.7, 0.4 ],
+			[ 0.5, 0.6 ],
+			[ 0.35, 0.8 ],
+			[ 0.65, 0.8 ]
+		]) * face_size + [ start_x, start_y ]
+		faces.append(insightface.app.common.Face(
+			bbox = numpy.array([ start_x, start_y, start_x + face_size, start_y + face_size ], dtype = numpy.float32),
+			kps = kps.astype(numpy.float32),
+			det_score = 0.9,
+			embedding = random_generator.standard_normal(512).astype(numpy.float32),
+			age = 30,
+			gender = 1
+		))
+	return faces
+
+
+def create_microbenchmark_cases(temp_frame : Frame, faces : List[Face], temp_frame_path : str) -> Dict[str, Callable[[], Any]]:
+	crop_frame, affine_matrix = warp_face(faces[0], temp_frame)
+	prepare_frame = prepare_crop_frame(crop_frame)
+	paste_frame = paste_back(temp_frame, crop_frame, affine_matrix)
+	write_image(temp_frame_path, temp_frame)
+	return\
+	{
+		'warp_face': lambda: warp_face(faces[0], temp_frame),
+		'prepare_crop_frame': lambda: prepare_crop_frame(crop_frame),
+		'normalize_crop_frame': lambda: normalize_crop_frame(prepare_frame[0]),
+		'paste_back': lambda: paste_back(temp_frame, crop_frame, affine_matrix),
+		'blend_frame': lambda: blend_frame(temp_frame, paste_frame),
+		'find_similar_faces': lambda: find_similar_faces(temp_frame, faces[0], facefusion.globals.reference_face_distance),
+		'sort_by_direction': lambda: sort_by_direction(faces, 'large-small'),
+		'create_frame_hash': lambda: create_frame_hash(temp_frame),
+		'read_image': lambda: read_image(temp_frame_path),
+		'write_image': lambda: write_image(temp_frame_path, temp_frame)
+	}
+
+
+def measure_microbenchmark(case_function : Callable[[], Any]) -> MicrobenchmarkResult:
+	case_function()
+	iterations = 1
+	while measure_iterations(case_function, iterations) < MICROBENCHMARK_ROUND_TIME:
+		iterations *= 2
+	samples = [ measure_iterations(case_function, iterations) / iterations * 1000000 for _ in range(MICROBENCHMARK_ROUNDS) ]
+	quartiles = numpy.percentile(samples, [ 25, 50, 75 ])
+	return\
+	{
+		'iterations': iterations,
+		'median': float(quartiles[1]),
+		'iqr': float(quartiles[2] - quartiles[0]),
+		'minimum': min(samples),
+		'samples': samples
+	}
+
+
+def measure_iterations(case_function : Callable[[], Any], iterations : int) -> float:
+	gc_enabled = gc.isenabled()
+	gc.disable()
+	try:
+		start_time = time.perf_counter()
+		for _ in range(iterations):
+			case_function()
+		return time.perf_counter() - start_time
+	finally:
+		if gc_enabled:
+			gc.enable()
+
+
+def compare_microbenchmark(microbenchmark_baseline : Dict[str, MicrobenchmarkResult], microbenchmark_results : Dict[str, MicrobenchmarkResult]) -> bool:
+	has_regression = False
+	for microbenchmark_name, microbenchmark_result in microbenchmark_results.items():
+		if microbenchmark_name in microbenchmark_baseline:
+			benchmark_comparison = compare_samples(microbenchmark_name, 'time', microbenchmark_baseline[microbenchmark_name]['samples'], microbenchmark_result['samples'])
+			benchmark_status = wording.get('benchmark_comparison').format(**benchmark_comparison)
+			if benchmark_comparison['regression']:
+				benchmark_status += wording.get('benchmark_regression')
+				has_regression = True
+			update_status(benchmark_status, NAME)
+	return has_regression
@@ -0,0 +1,90 @@
+from typing import Any, Callable, Dict, Optional
+from collections import OrderedDict
+import os
+import threading
+import time
+
+import facefusion.globals
+from facefusion.typing import ModelKey, ResidentModel
+
+RESIDENT_MODELS : OrderedDict[ModelKey, ResidentModel] = OrderedDict()
+MODEL_REFERENCES : Dict[ModelKey, int] = {}
+MODEL_LOCKS : Dict[ModelKey, threading.Lock] = {}
+THREAD_LOCK : threading.Lock = threading.Lock()
+
+
+def get_model(model_key : ModelKey, load_model : Callable[[], Any], model_path : Optional[str] = None, warm_up_model : Optional[Callable[[Any], None]] = None) -> Any:
+	with THREAD_LOCK:
+		if model_key in RESIDENT_MODELS:
+			RESIDENT_MODELS.move_to_end(model_key)
+			return RESIDENT_MODELS[model_key]['model']
+		model_lock = MODEL_LOCKS.setdefault(model_key, threading.Lock())
+	with model_lock:
+		with THREAD_LOCK:
+			if model_key in RESIDENT_MODELS:
+				return RESIDENT_MODELS[model_key]['model']
+		start_time = time.perf_counter()
+		model = load_model()
+		load_time = time.perf_counter() - start_time
+		if warm_up_model:
+			warm_up_model(model)
+		with THREAD_LOCK:
+			RESIDENT_MODELS[model_key] =\
+			{
+				'model': model,
+				'size': get_model_size(model_path),
+				'load_time': load_time,
+				'warm_up_time': time.perf_counter() - start_time - load_time
+			}
+			evict_models()
+	return model
+
+
+def acquire_model(model_key : ModelKey) -> None:
+	with THREAD_LOCK:
+		MODEL_REFERENCES[model_key] = MODEL_REFERENCES.get(model_key, 0) + 1
+
+
+def release_model(model_key : ModelKey) -> None:
+	with THREAD_LOCK:
+		if MODEL_REFERENCES.get(model_key, 0) > 1:
+			MODEL_REFERENCES[model_key] -= 1
+		else:
+			MODEL_REFERENCES.pop(model_key, None)
+		evict_models()
+
+
+def unload_model(model_key : ModelKey) -> None:
+	with THREAD_LOCK:
+		RESIDENT_MODELS.pop(model_key, None)
+
+
+def clear_models() -> None:
+	with THREAD_LOCK:
+		RESIDENT_MODELS.clear()
+
+
+def evict_models() -> None:
+	if facefusion.globals.model_memory_budget:
+		memory_budget = facefusion.globals.model_memory_budget * 1024 ** 3
+		for model_key in list(RESIDENT_MODELS.keys())[:-1]:
+			if sum(resident_model['size'] for resident_model in RESIDENT_MODELS.values()) <= memory_budget:
+				break
+			if model_key not in MODEL_REFERENCES:
+				del RESIDENT_MODELS[model_key]
+
+
+def is_model_resident(model_key : ModelKey) -> bool:
+	return model_key in RESIDENT_MODELS
+
+
+def get_resident_model(model_key : ModelKey) -> Optional[ResidentModel]:
+	return RESIDENT_MODELS.get(model_key)
+
+
+def get_model_size(model_path : Optional[str]) -> int:
+	if model_path and os.path.isdir(model_path):
+		return sum(get_model_size(os.path.join(model_path, file_name)) for file_name in os.listdir(model_path))
+	if model_path and os.path.isfile(model_path):
+		return os.path.getsize(model_path)
+	return 0
@@ -1,10 +1,7 @@
+from typing import Any
 import threading
 from functools import lru_cache
-
 import numpy
-import opennsfw2
-from PIL import Image
-from keras import Model
 
 from facefusion.typing import Frame
 
@@ -15,11 +12,13 @@ FRAME_INTERVAL = 25
 STREAM_COUNTER = 0
 
 
-def get_predictor() -> Model:
+def get_predictor() -> Any:
 	global PREDICTOR
 
 	with THREAD_LOCK:
 		if PREDICTOR is None:
+			import opennsfw2
+
 			PREDICTOR = opennsfw2.make_open_nsfw_model()
 	return PREDICTOR
 
@@ -40,6 +39,9 @@ def predict_stream(frame : Frame) -> bool:
 
 
 def predict_frame(frame : Frame) -> bool:
+	import opennsfw2
+	from PIL import Image
+
 	image = Image.fromarray(frame)
 	image = opennsfw2.preprocess_image(image, opennsfw2.Preprocessing.YAHOO)
 	views = numpy.expand_dims(image, axis = 0)
@@ -49,10 +51,14 @@ def predict_frame(frame : Frame) -> bool:
 
 @lru_cache(maxsize = None)
 def predict_image(image_path : str) -> bool:
+	import opennsfw2
+
 	return opennsfw2.predict_image(image_path) > MAX_PROBABILITY
 
 
 @lru_cache(maxsize = None)
 def predict_video(video_path : str) -> bool:
+	import opennsfw2
+
 	_, probabilities = opennsfw2.predict_video_frames(video_path = video_path, frame_interval = FRAME_INTERVAL)
 	return any(probability > MAX_PROBABILITY for probability in probabilities)
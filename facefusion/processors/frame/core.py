@@ -1,32 +1,37 @@
 import os
 import sys
 import importlib
+import threading
 import psutil
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from queue import Queue
 from types import ModuleType
-from typing import Any, List
+from typing import Any, Dict, List, Set, Tuple
 from tqdm import tqdm
 
 import facefusion.globals
 from facefusion import wording
-from facefusion.typing import Process_Frames
+from facefusion.typing import Process_Frames, ProcessMode, FrameProcessorHandle
+from facefusion.processors.frame import globals as frame_processors_globals
 
 FRAME_PROCESSORS_MODULES : List[ModuleType] = []
+FRAME_PROCESSORS_HANDLES : Dict[Tuple[Any, ...], List[FrameProcessorHandle]] = {}
+THREAD_LOCK : threading.Lock = threading.Lock()
+PROCESSED_TEMP_FRAME_PATHS : Set[str] = set()
 FRAME_PROCESSORS_METHODS =\
 [
 	'get_frame_processor',
 	'clear_frame_processor',
+	'get_model_key',
 	'get_options',
 	'set_options',
-	'register_args',
-	'apply_args',
 	'pre_check',
 	'pre_process',
 	'process_frame',
 	'process_frames',
 	'process_image',
 	'process_video',
+	'create_frame_processor_handle',
 	'post_process'
 ]
 
@@ -60,9 +65,57 @@ def clear_frame_processors_modules() -> None:
 	for frame_processor_module in get_frame_processors_modules(facefusion.globals.frame_processors):
 		frame_processor_module.clear_frame_processor()
 	FRAME_PROCESSORS_MODULES = []
+	clear_frame_processors_handles()
+
+
+def get_frame_processors_handles(frame_processors : List[str], mode : ProcessMode) -> List[FrameProcessorHandle]:
+	frame_processors_handles_key = create_frame_processors_handles_key(frame_processors, mode)
+	with THREAD_LOCK:
+		if frame_processors_handles_key not in FRAME_PROCESSORS_HANDLES:
+			FRAME_PROCESSORS_HANDLES.clear()
+			FRAME_PROCESSORS_HANDLES[frame_processors_handles_key] = create_frame_processors_handles(frame_processors, mode)
+	return FRAME_PROCESSORS_HANDLES[frame_processors_handles_key]
+
+
+def create_frame_processors_handles(frame_processors : List[str], mode : ProcessMode) -> List[FrameProcessorHandle]:
+	frame_processors_handles = []
+	for frame_processor in frame_processors:
+		frame_processor_handle = load_frame_processor_module(frame_processor).create_frame_processor_handle(mode)
+		if frame_processor_handle:
+			frame_processors_handles.append(frame_processor_handle)
+	return frame_processors_handles
+
+
+def create_frame_processors_handles_key(frame_processors : List[str], mode : ProcessMode) -> Tuple[Any, ...]:
+	return\
+	(
+		tuple(frame_processors),
+		mode,
+		facefusion.globals.source_path,
+		tuple(facefusion.globals.execution_providers),
+		frame_processors_globals.face_swapper_model,
+		frame_processors_globals.face_enhancer_model,
+		frame_processors_globals.frame_enhancer_model
+	)
+
+
+def clear_frame_processors_handles() -> None:
+	with THREAD_LOCK:
+		FRAME_PROCESSORS_HANDLES.clear()
+
+
+def get_processed_temp_frame_paths() -> Set[str]:
+	return PROCESSED_TEMP_FRAME_PATHS
+
+
+def clear_processed_temp_frame_paths() -> None:
+	global PROCESSED_TEMP_FRAME_PATHS
+
+	PROCESSED_TEMP_FRAME_PATHS = set()
 
 
 def multi_process_frames(source_path : str, temp_frame_paths : List[str], process_frames : Process_Frames) -> None:
+	PROCESSED_TEMP_FRAME_PATHS.update(temp_frame_paths)
 	progress_bar_format = '{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}, {rate_fmt}{postfix}]'
 	with tqdm(total = len(temp_frame_paths), desc = wording.get('processing'), unit = 'frame', dynamic_ncols = True, bar_format = progress_bar_format) as progress:
 		with ThreadPoolExecutor(max_workers = facefusion.globals.execution_thread_count) as executor:
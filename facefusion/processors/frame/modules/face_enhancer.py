@@ -1,5 +1,4 @@
 from typing import Any, List, Tuple, Dict, Literal, Optional
-from argparse import ArgumentParser
 import cv2
 import threading
 import numpy
@@ -8,16 +7,16 @@ import onnxruntime
 import facefusion.globals
 from facefusion import wording
 from facefusion.core import update_status
-from facefusion.face_analyser import get_many_faces, clear_face_analyser
-from facefusion.typing import Face, Frame, Matrix, Update_Process, ProcessMode, ModelValue, OptionsWithModel
+from facefusion.face_analyser import get_many_faces, acquire_face_analyser, release_face_analyser
+from facefusion.face_index import filter_face_frame_paths
+from facefusion.model_registry import get_model, acquire_model, release_model, unload_model
+from facefusion.typing import Face, Frame, Matrix, Update_Process, ProcessMode, ModelKey, ModelValue, OptionsWithModel, FrameProcessorHandle, FrameProcessorManifest
 from facefusion.utilities import conditional_download, resolve_relative_path, is_image, is_video, is_file, is_download_done
 from facefusion.vision import read_image, read_static_image, write_image
 from facefusion.processors.frame import globals as frame_processors_globals
 from facefusion.processors.frame import choices as frame_processors_choices
 
-FRAME_PROCESSOR = None
 THREAD_SEMAPHORE : threading.Semaphore = threading.Semaphore()
-THREAD_LOCK : threading.Lock = threading.Lock()
 NAME = 'FACEFUSION.FRAME_PROCESSOR.FACE_ENHANCER'
 MODELS : Dict[str, ModelValue] =\
 {
@@ -47,23 +46,59 @@ MODELS : Dict[str, ModelValue] =\
 		'path': resolve_relative_path('../.assets/models/GPEN-BFR-512.onnx')
 	}
 }
+MANIFEST : FrameProcessorManifest =\
+{
+	'args':
+	[
+		{
+			'flag': '--face-enhancer-model',
+			'help': 'frame_processor_model_help',
+			'dest': 'face_enhancer_model',
+			'default': 'gfpgan_1.4',
+			'choices': frame_processors_choices.face_enhancer_models
+		},
+		{
+			'flag': '--face-enhancer-blend',
+			'help': 'frame_processor_blend_help',
+			'dest': 'face_enhancer_blend',
+			'type': int,
+			'default': 100,
+			'choices': range(101),
+			'metavar': '[0-100]'
+		}
+	],
+	'models': frame_processors_choices.face_enhancer_models,
+	'capabilities': [ 'face', 'enhance' ]
+}
 OPTIONS : Optional[OptionsWithModel] = None
 
 
 def get_frame_processor() -> Any:
-	global FRAME_PROCESSOR
+	model_path = get_options('model').get('path')
+	return get_model(get_model_key(), load_frame_processor, model_path, warm_up_frame_processor)
 
-	with THREAD_LOCK:
-		if FRAME_PROCESSOR is None:
-			model_path = get_options('model').get('path')
-			FRAME_PROCESSOR = onnxruntime.InferenceSession(model_path, providers = facefusion.globals.execution_providers)
-	return FRAME_PROCESSOR
 
+def load_frame_processor() -> Any:
+	model_path = get_options('model').get('path')
+	return onnxruntime.InferenceSession(model_path, providers = facefusion.globals.execution_providers)
 
-def clear_frame_processor() -> None:
-	global FRAME_PROCESSOR
 
-	FRAME_PROCESSOR = None
+def warm_up_frame_processor(frame_processor : Any) -> None:
+	frame_processor_inputs = {}
+	for frame_processor_input in frame_processor.get_inputs():
+		if frame_processor_input.name == 'input':
+			frame_processor_inputs[frame_processor_input.name] = numpy.zeros((1, 3, 512, 512), dtype = numpy.float32)
+		if frame_processor_input.name == 'weight':
+			frame_processor_inputs[frame_processor_input.name] = numpy.array([ 1 ], dtype = numpy.double)
+	frame_processor.run(None, frame_processor_inputs)
+
+
+def get_model_key() -> ModelKey:
+	return (NAME, get_options('model').get('path'), *facefusion.globals.execution_providers)
+
+
+def clear_frame_processor() -> None:
+	unload_model(get_model_key())
 
 
 def get_options(key : Literal[ 'model' ]) -> Any:
@@ -83,17 +118,6 @@ def set_options(key : Literal[ 'model' ], value : Any) -> None:
 	OPTIONS[key] = value
 
 
-def register_args(program : ArgumentParser) -> None:
-	program.add_argument('--face-enhancer-model', help = wording.get('frame_processor_model_help'), dest = 'face_enhancer_model', default = 'gfpgan_1.4', choices = frame_processors_choices.face_enhancer_models)
-	program.add_argument('--face-enhancer-blend', help = wording.get('frame_processor_blend_help'), dest= 'face_enhancer_blend', type = int, default= 100, choices = range(101), metavar = '[0-100]')
-
-
-def apply_args(program : ArgumentParser) -> None:
-	args = program.parse_args()
-	frame_processors_globals.face_enhancer_model = args.face_enhancer_model
-	frame_processors_globals.face_enhancer_blend = args.face_enhancer_blend
-
-
 def pre_check() -> bool:
 	if not facefusion.globals.skip_download:
 		download_directory_path = resolve_relative_path('../.assets/models')
@@ -120,14 +144,25 @@ def pre_process(mode : ProcessMode) -> bool:
 	return True
 
 
+def create_frame_processor_handle(mode : ProcessMode) -> Optional[FrameProcessorHandle]:
+	if pre_process(mode):
+		return FrameProcessorHandle(
+			name = 'face_enhancer',
+			frame_processor = get_frame_processor(),
+			options = OPTIONS.copy(),
+			source_face = None,
+			process_frame = process_handle_frame
+		)
+	return None
+
+
 def post_process() -> None:
-	clear_frame_processor()
-	clear_face_analyser()
+	release_model(get_model_key())
+	release_face_analyser()
 	read_static_image.cache_clear()
 
 
-def enhance_face(target_face: Face, temp_frame: Frame) -> Frame:
-	frame_processor = get_frame_processor()
+def enhance_face(frame_processor : Any, target_face : Face, temp_frame : Frame) -> Frame:
 	crop_frame, affine_matrix = warp_face(target_face, temp_frame)
 	crop_frame = prepare_crop_frame(crop_frame)
 	frame_processor_inputs = {}
@@ -201,10 +236,14 @@ def blend_frame(temp_frame : Frame, paste_frame : Frame) -> Frame:
 
 
 def process_frame(source_face : Face, reference_face : Face, temp_frame : Frame) -> Frame:
+	return process_handle_frame(get_frame_processor(), source_face, reference_face, temp_frame)
+
+
+def process_handle_frame(frame_processor : Any, source_face : Face, reference_face : Face, temp_frame : Frame) -> Frame:
 	many_faces = get_many_faces(temp_frame)
 	if many_faces:
 		for target_face in many_faces:
-			temp_frame = enhance_face(target_face, temp_frame)
+			temp_frame = enhance_face(frame_processor, target_face, temp_frame)
 	return temp_frame
 
 
@@ -217,10 +256,14 @@ def process_frames(source_path : str, temp_frame_paths : List[str], update_progr
 
 
 def process_image(source_path : str, target_path : str, output_path : str) -> None:
+	acquire_model(get_model_key())
+	acquire_face_analyser()
 	target_frame = read_static_image(target_path)
 	result_frame = process_frame(None, None, target_frame)
 	write_image(output_path, result_frame)
 
 
 def process_video(source_path : str, temp_frame_paths : List[str]) -> None:
-	facefusion.processors.frame.core.multi_process_frames(None, temp_frame_paths, process_frames)
+	acquire_model(get_model_key())
+	acquire_face_analyser()
+	facefusion.processors.frame.core.multi_process_frames(None, filter_face_frame_paths(temp_frame_paths), process_frames)
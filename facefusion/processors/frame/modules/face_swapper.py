@@ -1,22 +1,21 @@
 from typing import Any, List, Dict, Literal, Optional
-from argparse import ArgumentParser
-import insightface
-import threading
+import numpy
 
 import facefusion.globals
 import facefusion.processors.frame.core as frame_processors
 from facefusion import wording
 from facefusion.core import update_status
-from facefusion.face_analyser import get_one_face, get_many_faces, find_similar_faces, clear_face_analyser
+from facefusion.face_analyser import get_one_face, get_many_faces, find_similar_faces, acquire_face_analyser, release_face_analyser
+from facefusion.face_index import filter_face_frame_paths
+from facefusion.face_cluster import filter_face_cluster_frame_paths
 from facefusion.face_reference import get_face_reference, set_face_reference
-from facefusion.typing import Face, Frame, Update_Process, ProcessMode, ModelValue, OptionsWithModel
+from facefusion.model_registry import get_model, acquire_model, release_model, unload_model
+from facefusion.typing import Face, Frame, Update_Process, ProcessMode, ModelKey, ModelValue, OptionsWithModel, FrameProcessorHandle, FrameProcessorManifest
 from facefusion.utilities import conditional_download, resolve_relative_path, is_image, is_video, is_file, is_download_done
 from facefusion.vision import read_image, read_static_image, write_image
 from facefusion.processors.frame import globals as frame_processors_globals
 from facefusion.processors.frame import choices as frame_processors_choices
 
-FRAME_PROCESSOR = None
-THREAD_LOCK : threading.Lock = threading.Lock()
 NAME = 'FACEFUSION.FRAME_PROCESSOR.FACE_SWAPPER'
 MODELS : Dict[str, ModelValue] =\
 {
@@ -31,23 +30,50 @@ MODELS : Dict[str, ModelValue] =\
 		'path': resolve_relative_path('../.assets/models/inswapper_128_fp16.onnx')
 	}
 }
+MANIFEST : FrameProcessorManifest =\
+{
+	'args':
+	[
+		{
+			'flag': '--face-swapper-model',
+			'help': 'frame_processor_model_help',
+			'dest': 'face_swapper_model',
+			'default': 'inswapper_128',
+			'choices': frame_processors_choices.face_swapper_models
+		}
+	],
+	'models': frame_processors_choices.face_swapper_models,
+	'capabilities': [ 'face', 'draft' ]
+}
 OPTIONS : Optional[OptionsWithModel] = None
 
 
 def get_frame_processor() -> Any:
-	global FRAME_PROCESSOR
+	model_path = get_options('model').get('path')
+	return get_model(get_model_key(), load_frame_processor, model_path, warm_up_frame_processor)
 
-	with THREAD_LOCK:
-		if FRAME_PROCESSOR is None:
-			model_path = get_options('model').get('path')
-			FRAME_PROCESSOR = insightface.model_zoo.get_model(model_path, providers = facefusion.globals.execution_providers)
-	return FRAME_PROCESSOR
 
+def load_frame_processor() -> Any:
+	import insightface
+
+	model_path = get_options('model').get('path')
+	return insightface.model_zoo.get_model(model_path, providers = facefusion.globals.execution_providers)
+
+
+def warm_up_frame_processor(frame_processor : Any) -> None:
+	frame_processor.session.run(frame_processor.output_names,
+	{
+		frame_processor.input_names[0]: numpy.zeros((1, 3, frame_processor.input_size[1], frame_processor.input_size[0]), dtype = numpy.float32),
+		frame_processor.input_names[1]: numpy.zeros((1, 512), dtype = numpy.float32)
+	})
 
-def clear_frame_processor() -> None:
-	global FRAME_PROCESSOR
 
-	FRAME_PROCESSOR = None
+def get_model_key() -> ModelKey:
+	return (NAME, get_options('model').get('path'), *facefusion.globals.execution_providers)
+
+
+def clear_frame_processor() -> None:
+	unload_model(get_model_key())
 
 
 def get_options(key : Literal[ 'model' ]) -> Any:
@@ -67,15 +93,6 @@ def set_options(key : Literal[ 'model' ], value : Any) -> None:
 	OPTIONS[key] = value
 
 
-def register_args(program : ArgumentParser) -> None:
-	program.add_argument('--face-swapper-model', help = wording.get('frame_processor_model_help'), dest = 'face_swapper_model', default = 'inswapper_128', choices = frame_processors_choices.face_swapper_models)
-
-
-def apply_args(program : ArgumentParser) -> None:
-	args = program.parse_args()
-	frame_processors_globals.face_swapper_model = args.face_swapper_model
-
-
 def pre_check() -> bool:
 	if not facefusion.globals.skip_download:
 		download_directory_path = resolve_relative_path('../.assets/models')
@@ -108,27 +125,43 @@ def pre_process(mode : ProcessMode) -> bool:
 	return True
 
 
+def create_frame_processor_handle(mode : ProcessMode) -> Optional[FrameProcessorHandle]:
+	if pre_process(mode):
+		return FrameProcessorHandle(
+			name = 'face_swapper',
+			frame_processor = get_frame_processor(),
+			options = OPTIONS.copy(),
+			source_face = get_one_face(read_static_image(facefusion.globals.source_path)),
+			process_frame = process_handle_frame
+		)
+	return None
+
+
 def post_process() -> None:
-	clear_frame_processor()
-	clear_face_analyser()
+	release_model(get_model_key())
+	release_face_analyser()
 	read_static_image.cache_clear()
 
 
-def swap_face(source_face : Face, target_face : Face, temp_frame : Frame) -> Frame:
-	return get_frame_processor().get(temp_frame, target_face, source_face, paste_back = True)
+def swap_face(frame_processor : Any, source_face : Face, target_face : Face, temp_frame : Frame) -> Frame:
+	return frame_processor.get(temp_frame, target_face, source_face, paste_back = True)
 
 
 def process_frame(source_face : Face, reference_face : Face, temp_frame : Frame) -> Frame:
+	return process_handle_frame(get_frame_processor(), source_face, reference_face, temp_frame)
+
+
+def process_handle_frame(frame_processor : Any, source_face : Face, reference_face : Face, temp_frame : Frame) -> Frame:
 	if 'reference' in facefusion.globals.face_recognition:
 		similar_faces = find_similar_faces(temp_frame, reference_face, facefusion.globals.reference_face_distance)
 		if similar_faces:
 			for similar_face in similar_faces:
-				temp_frame = swap_face(source_face, similar_face, temp_frame)
+				temp_frame = swap_face(frame_processor, source_face, similar_face, temp_frame)
 	if 'many' in facefusion.globals.face_recognition:
 		many_faces = get_many_faces(temp_frame)
 		if many_faces:
 			for target_face in many_faces:
-				temp_frame = swap_face(source_face, target_face, temp_frame)
+				temp_frame = swap_face(frame_processor, source_face, target_face, temp_frame)
 	return temp_frame
 
 
@@ -143,6 +176,8 @@ def process_frames(source_path : str, temp_frame_paths : List[str], update_progr
 
 
 def process_image(source_path : str, target_path : str, output_path : str) -> None:
+	acquire_model(get_model_key())
+	acquire_face_analyser()
 	source_face = get_one_face(read_static_image(source_path))
 	target_frame = read_static_image(target_path)
 	reference_face = get_one_face(target_frame, facefusion.globals.reference_face_position) if 'reference' in facefusion.globals.face_recognition else None
@@ -151,8 +186,10 @@ def process_image(source_path : str, target_path : str, output_path : str) -> No
 
 
 def process_video(source_path : str, temp_frame_paths : List[str]) -> None:
+	acquire_model(get_model_key())
+	acquire_face_analyser()
 	conditional_set_face_reference(temp_frame_paths)
-	frame_processors.multi_process_frames(source_path, temp_frame_paths, process_frames)
+	frame_processors.multi_process_frames(source_path, filter_face_frame_paths(filter_face_cluster_frame_paths(temp_frame_paths)), process_frames)
 
 
 def conditional_set_face_reference(temp_frame_paths : List[str]) -> None:
@@ -1,24 +1,20 @@
 from typing import Any, List, Dict, Literal, Optional
-from argparse import ArgumentParser
 import threading
+import numpy
 import cv2
-from basicsr.archs.rrdbnet_arch import RRDBNet
-from realesrgan import RealESRGANer
 
 import facefusion.globals
 import facefusion.processors.frame.core as frame_processors
 from facefusion import wording
 from facefusion.core import update_status
-from facefusion.face_analyser import clear_face_analyser
-from facefusion.typing import Frame, Face, Update_Process, ProcessMode, ModelValue, OptionsWithModel
+from facefusion.model_registry import get_model, acquire_model, release_model, unload_model
+from facefusion.typing import Frame, Face, Update_Process, ProcessMode, ModelKey, ModelValue, OptionsWithModel, FrameProcessorHandle, FrameProcessorManifest
 from facefusion.utilities import conditional_download, resolve_relative_path, is_file, is_download_done, get_device
 from facefusion.vision import read_image, read_static_image, write_image
 from facefusion.processors.frame import globals as frame_processors_globals
 from facefusion.processors.frame import choices as frame_processors_choices
 
-FRAME_PROCESSOR = None
 THREAD_SEMAPHORE : threading.Semaphore = threading.Semaphore()
-THREAD_LOCK : threading.Lock = threading.Lock()
 NAME = 'FACEFUSION.FRAME_PROCESSOR.FRAME_ENHANCER'
 MODELS: Dict[str, ModelValue] =\
 {
@@ -41,33 +37,66 @@ MODELS: Dict[str, ModelValue] =\
 		'scale': 4
 	}
 }
+MANIFEST : FrameProcessorManifest =\
+{
+	'args':
+	[
+		{
+			'flag': '--frame-enhancer-model',
+			'help': 'frame_processor_model_help',
+			'dest': 'frame_enhancer_model',
+			'default': 'realesrgan_x2plus',
+			'choices': frame_processors_choices.frame_enhancer_models
+		},
+		{
+			'flag': '--frame-enhancer-blend',
+			'help': 'frame_processor_blend_help',
+			'dest': 'frame_enhancer_blend',
+			'type': int,
+			'default': 100,
+			'choices': range(101),
+			'metavar': '[0-100]'
+		}
+	],
+	'models': frame_processors_choices.frame_enhancer_models,
+	'capabilities': [ 'enhance' ]
+}
 OPTIONS : Optional[OptionsWithModel] = None
 
 
 def get_frame_processor() -> Any:
-	global FRAME_PROCESSOR
-
-	with THREAD_LOCK:
-		if FRAME_PROCESSOR is None:
-			model_path = get_options('model').get('path')
-			model_scale = get_options('model').get('scale')
-			FRAME_PROCESSOR = RealESRGANer(
-				model_path = model_path,
-				model = RRDBNet(
-					num_in_ch = 3,
-					num_out_ch = 3,
-					scale = model_scale
-				),
-				device = get_device(facefusion.globals.execution_providers),
-				scale = model_scale
-			)
-	return FRAME_PROCESSOR
+	model_path = get_options('model').get('path')
+	return get_model(get_model_key(), load_frame_processor, model_path, warm_up_frame_processor)
 
 
-def clear_frame_processor() -> None:
-	global FRAME_PROCESSOR
+def load_frame_processor() -> Any:
+	from basicsr.archs.rrdbnet_arch import RRDBNet
+	from realesrgan import RealESRGANer
+
+	model_path = get_options('model').get('path')
+	model_scale = get_options('model').get('scale')
+	return RealESRGANer(
+		model_path = model_path,
+		model = RRDBNet(
+			num_in_ch = 3,
+			num_out_ch = 3,
+			scale = model_scale
+		),
+		device = get_device(facefusion.globals.execution_providers),
+		scale = model_scale
+	)
+
+
+def warm_up_frame_processor(frame_processor : Any) -> None:
+	frame_processor.enhance(numpy.zeros((64, 64, 3), dtype = numpy.uint8))
+
 
-	FRAME_PROCESSOR = None
+def get_model_key() -> ModelKey:
+	return (NAME, get_options('model').get('path'), *facefusion.globals.execution_providers)
+
+
+def clear_frame_processor() -> None:
+	unload_model(get_model_key())
 
 
 def get_options(key : Literal[ 'model' ]) -> Any:
@@ -87,17 +116,6 @@ def set_options(key : Literal[ 'model' ], value : Any) -> None:
 	OPTIONS[key] = value
 
 
-def register_args(program : ArgumentParser) -> None:
-	program.add_argument('--frame-enhancer-model', help = wording.get('frame_processor_model_help'), dest = 'frame_enhancer_model', default = 'realesrgan_x2plus', choices = frame_processors_choices.frame_enhancer_models)
-	program.add_argument('--frame-enhancer-blend', help = wording.get('frame_processor_blend_help'), dest = 'frame_enhancer_blend', type = int, default = 100, choices = range(101), metavar = '[0-100]')
-
-
-def apply_args(program : ArgumentParser) -> None:
-	args = program.parse_args()
-	frame_processors_globals.frame_enhancer_model = args.frame_enhancer_model
-	frame_processors_globals.frame_enhancer_blend = args.frame_enhancer_blend
-
-
 def pre_check() -> bool:
 	if not facefusion.globals.skip_download:
 		download_directory_path = resolve_relative_path('../.assets/models')
@@ -121,15 +139,26 @@ def pre_process(mode : ProcessMode) -> bool:
 	return True
 
 
+def create_frame_processor_handle(mode : ProcessMode) -> Optional[FrameProcessorHandle]:
+	if pre_process(mode):
+		return FrameProcessorHandle(
+			name = 'frame_enhancer',
+			frame_processor = get_frame_processor(),
+			options = OPTIONS.copy(),
+			source_face = None,
+			process_frame = process_handle_frame
+		)
+	return None
+
+
 def post_process() -> None:
-	clear_frame_processor()
-	clear_face_analyser()
+	release_model(get_model_key())
 	read_static_image.cache_clear()
 
 
-def enhance_frame(temp_frame : Frame) -> Frame:
+def enhance_frame(frame_processor : Any, temp_frame : Frame) -> Frame:
 	with THREAD_SEMAPHORE:
-		paste_frame, _ = get_frame_processor().enhance(temp_frame)
+		paste_frame, _ = frame_processor.enhance(temp_frame)
 		temp_frame = blend_frame(temp_frame, paste_frame)
 	return temp_frame
 
@@ -142,7 +171,11 @@ def blend_frame(temp_frame : Frame, paste_frame : Frame) -> Frame:
 
 
 def process_frame(source_face : Face, reference_face : Face, temp_frame : Frame) -> Frame:
-	return enhance_frame(temp_frame)
+	return process_handle_frame(get_frame_processor(), source_face, reference_face, temp_frame)
+
+
+def process_handle_frame(frame_processor : Any, source_face : Face, reference_face : Face, temp_frame : Frame) -> Frame:
+	return enhance_frame(frame_processor, temp_frame)
 
 
 def process_frames(source_path : str, temp_frame_paths : List[str], update_progress : Update_Process) -> None:
@@ -154,10 +187,12 @@ def process_frames(source_path : str, temp_frame_paths : List[str], update_progr
 
 
 def process_image(source_path : str, target_path : str, output_path : str) -> None:
+	acquire_model(get_model_key())
 	target_frame = read_static_image(target_path)
 	result = process_frame(None, None, target_frame)
 	write_image(output_path, result)
 
 
 def process_video(source_path : str, temp_frame_paths : List[str]) -> None:
+	acquire_model(get_model_key())
 	frame_processors.multi_process_frames(None, temp_frame_paths, process_frames)
@@ -0,0 +1,40 @@
+from typing import Dict, List, Union
+from argparse import ArgumentParser, Namespace, _ArgumentGroup
+import importlib
+
+from facefusion import wording
+from facefusion.typing import FrameProcessorManifest, FrameProcessorCapability
+from facefusion.utilities import list_module_names, resolve_relative_path
+from facefusion.processors.frame import globals as frame_processors_globals
+
+FRAME_PROCESSORS_MANIFESTS : Dict[str, FrameProcessorManifest] = {}
+
+
+def get_frame_processors_manifests() -> Dict[str, FrameProcessorManifest]:
+	if not FRAME_PROCESSORS_MANIFESTS:
+		for frame_processor in sorted(list_module_names(resolve_relative_path('processors/frame/modules'))):
+			frame_processor_module = importlib.import_module('facefusion.processors.frame.modules.' + frame_processor)
+			FRAME_PROCESSORS_MANIFESTS[frame_processor] = frame_processor_module.MANIFEST
+	return FRAME_PROCESSORS_MANIFESTS
+
+
+def list_frame_processors() -> List[str]:
+	return list(get_frame_processors_manifests().keys())
+
+
+def has_frame_processor_capability(frame_processor : str, capability : FrameProcessorCapability) -> bool:
+	frame_processor_manifest = get_frame_processors_manifests().get(frame_processor)
+	return frame_processor_manifest is not None and capability in frame_processor_manifest['capabilities']
+
+
+def register_frame_processors_args(program : Union[ArgumentParser, _ArgumentGroup]) -> None:
+	for frame_processor_manifest in get_frame_processors_manifests().values():
+		for frame_processor_arg in frame_processor_manifest['args']:
+			frame_processor_kwargs = { key: value for key, value in frame_processor_arg.items() if key not in [ 'flag', 'help' ] }
+			program.add_argument(frame_processor_arg['flag'], help = wording.get(frame_processor_arg['help']), **frame_processor_kwargs)
+
+
+def apply_frame_processors_args(args : Namespace) -> None:
+	for frame_processor_manifest in get_frame_processors_manifests().values():
+		for frame_processor_arg in frame_processor_manifest['args']:
+			setattr(frame_processors_globals, frame_processor_arg['dest'], getattr(args, frame_processor_arg['dest']))
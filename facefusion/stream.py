@@ -0,0 +1,255 @@
+from typing import Any, Deque, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, Future
+import os
+import subprocess
+import threading
+import time
+import cv2
+
+import facefusion.globals
+from facefusion import wording
+from facefusion.core import update_status
+from facefusion.face_analyser import detect_many_faces
+from facefusion.face_cache import set_faces_cache
+from facefusion.processors.frame.core import get_frame_processors_handles
+from facefusion.processors.frame.registry import has_frame_processor_capability
+from facefusion.typing import Frame, Face, StreamMode, StreamQuality, StreamController, StreamFuture
+from facefusion.utilities import open_ffmpeg
+
+STREAM_BUFFER_SIZE = 4
+STREAM_QUALITIES : List[StreamQuality] =\
+[
+	{
+		'scale': 1.0,
+		'detector_interval': 1,
+		'enhancer': True
+	},
+	{
+		'scale': 1.0,
+		'detector_interval': 1,
+		'enhancer': False
+	},
+	{
+		'scale': 1.0,
+		'detector_interval': 2,
+		'enhancer': False
+	},
+	{
+		'scale': 0.75,
+		'detector_interval': 2,
+		'enhancer': False
+	},
+	{
+		'scale': 0.5,
+		'detector_interval': 3,
+		'enhancer': False
+	}
+]
+STREAM_QUALITY_HYSTERESIS = 15
+STREAM_MOTION_SCALE = 0.125
+STREAM_MOTION_THRESHOLD = 3.0
+STREAM_MOTION_TIMEOUT = 0.5
+
+
+def read_capture_frames(capture : cv2.VideoCapture, capture_frames : Deque[Tuple[float, Frame]], capture_event : threading.Event, stop_event : threading.Event, capture_fps : Optional[float] = None) -> None:
+	start_time = time.perf_counter()
+	frame_number = 0
+	while not stop_event.is_set():
+		has_frame, capture_frame = capture.read()
+		if not has_frame:
+			break
+		if capture_fps:
+			frame_number += 1
+			time.sleep(max(0.0, start_time + frame_number / capture_fps - time.perf_counter()))
+		capture_frames.append((time.perf_counter(), capture_frame))
+		capture_event.set()
+	capture_event.set()
+
+
+def is_capture_active(capture_thread : threading.Thread, capture_frames : Deque[Tuple[float, Frame]]) -> bool:
+	return capture_thread.is_alive() or bool(capture_frames)
+
+
+def write_stream_frames(stream : subprocess.Popen[bytes], stream_frames : Deque[Frame], stream_event : threading.Event, stop_event : threading.Event) -> None:
+	while not stop_event.is_set():
+		if stream_event.wait(0.5):
+			stream_event.clear()
+			if not flush_stream_frames(stream, stream_frames):
+				return
+	flush_stream_frames(stream, stream_frames)
+
+
+def flush_stream_frames(stream : subprocess.Popen[bytes], stream_frames : Deque[Frame]) -> bool:
+	while stream_frames:
+		try:
+			stream.stdin.write(stream_frames.popleft().tobytes())
+		except (BrokenPipeError, ValueError):
+			return False
+	return True
+
+
+def create_stream_controller() -> StreamController:
+	return\
+	{
+		'level': 0,
+		'process_time': 0.0,
+		'degrade_count': 0,
+		'upgrade_count': 0,
+		'frame_number': 0,
+		'faces': [],
+		'motion_frame': None,
+		'motion_result': None,
+		'motion_regions': [],
+		'motion_time': 0.0
+	}
+
+
+def calc_stream_frame_budget(fps_total : float) -> float:
+	return facefusion.globals.execution_thread_count / fps_total
+
+
+def update_stream_controller(stream_controller : StreamController, process_time : float, frame_budget : float) -> None:
+	if stream_controller['process_time']:
+		stream_controller['process_time'] = stream_controller['process_time'] * 0.9 + process_time * 0.1
+	else:
+		stream_controller['process_time'] = process_time
+	if stream_controller['process_time'] > frame_budget:
+		stream_controller['degrade_count'] += 1
+		stream_controller['upgrade_count'] = 0
+	elif stream_controller['process_time'] < frame_budget * 0.6:
+		stream_controller['upgrade_count'] += 1
+		stream_controller['degrade_count'] = 0
+	else:
+		stream_controller['degrade_count'] = 0
+		stream_controller['upgrade_count'] = 0
+	if stream_controller['degrade_count'] >= STREAM_QUALITY_HYSTERESIS and stream_controller['level'] < len(STREAM_QUALITIES) - 1:
+		set_stream_quality_level(stream_controller, stream_controller['level'] + 1)
+	if stream_controller['upgrade_count'] >= STREAM_QUALITY_HYSTERESIS * 2 and stream_controller['level'] > 0:
+		set_stream_quality_level(stream_controller, stream_controller['level'] - 1)
+
+
+def set_stream_quality_level(stream_controller : StreamController, level : int) -> None:
+	stream_quality = STREAM_QUALITIES[level]
+	stream_controller['level'] = level
+	stream_controller['process_time'] = 0.0
+	stream_controller['degrade_count'] = 0
+	stream_controller['upgrade_count'] = 0
+	stream_controller['faces'] = []
+	update_status(wording.get('stream_quality_changed').format(level = level, scale = stream_quality['scale'], detector_interval = stream_quality['detector_interval'], enhancer = stream_quality['enhancer']), 'FACEFUSION.STREAM')
+
+
+def create_motion_frame(temp_frame : Frame) -> Frame:
+	motion_frame = cv2.resize(temp_frame, None, fx = STREAM_MOTION_SCALE, fy = STREAM_MOTION_SCALE, interpolation = cv2.INTER_AREA)
+	return cv2.cvtColor(motion_frame, cv2.COLOR_BGR2GRAY)
+
+
+def is_static_stream_frame(stream_controller : StreamController, motion_frame : Frame, capture_time : float) -> bool:
+	if stream_controller['motion_frame'] is None or stream_controller['motion_frame'].shape != motion_frame.shape:
+		return False
+	if capture_time - stream_controller['motion_time'] > STREAM_MOTION_TIMEOUT:
+		return False
+	motion_difference = cv2.absdiff(motion_frame, stream_controller['motion_frame'])
+	motion_values = [ motion_difference.mean() ]
+	if stream_controller['motion_regions']:
+		motion_values = []
+		for start_x, start_y, end_x, end_y in stream_controller['motion_regions']:
+			motion_region = motion_difference[int(start_y * STREAM_MOTION_SCALE):int(end_y * STREAM_MOTION_SCALE) + 1, int(start_x * STREAM_MOTION_SCALE):int(end_x * STREAM_MOTION_SCALE) + 1]
+			if motion_region.size:
+				motion_values.append(motion_region.mean())
+	return max(motion_values, default = 0) < STREAM_MOTION_THRESHOLD
+
+
+def composite_stream_frame(stream_controller : StreamController, capture_frame : Frame) -> Frame:
+	temp_frame = capture_frame.copy()
+	for start_x, start_y, end_x, end_y in stream_controller['motion_regions']:
+		temp_frame[start_y:end_y, start_x:end_x] = stream_controller['motion_result'][start_y:end_y, start_x:end_x]
+	return temp_frame
+
+
+def set_motion_reference(stream_controller : StreamController, motion_frame : Frame, result_frame : Frame, faces : List[Face], scale : float, capture_time : float) -> None:
+	frame_height, frame_width = result_frame.shape[:2]
+	motion_regions = []
+	if not all(has_frame_processor_capability(frame_processor, 'face') for frame_processor in facefusion.globals.frame_processors):
+		faces = []
+		motion_regions.append((0, 0, frame_width, frame_height))
+	for face in faces:
+		start_x, start_y, end_x, end_y = [ value / scale for value in face['bbox'] ]
+		padding_x = (end_x - start_x) * 0.25
+		padding_y = (end_y - start_y) * 0.25
+		motion_regions.append((max(0, int(start_x - padding_x)), max(0, int(start_y - padding_y)), min(frame_width, int(end_x + padding_x)), min(frame_height, int(end_y + padding_y))))
+	stream_controller['motion_frame'] = motion_frame
+	stream_controller['motion_result'] = result_frame
+	stream_controller['motion_regions'] = motion_regions
+	stream_controller['motion_time'] = capture_time
+
+
+def submit_stream_frame(executor : ThreadPoolExecutor, futures : Deque[StreamFuture], stream_controller : StreamController, capture_time : float, capture_frame : Frame) -> None:
+	stream_quality = STREAM_QUALITIES[stream_controller['level']]
+	motion_frame = create_motion_frame(capture_frame)
+	if is_static_stream_frame(stream_controller, motion_frame, capture_time):
+		future : Future[Any] = Future()
+		future.set_result((composite_stream_frame(stream_controller, capture_frame), 0.0, None))
+		futures.append((capture_time, stream_quality, None, future))
+	else:
+		stream_faces = None
+		if stream_controller['frame_number'] % stream_quality['detector_interval'] and stream_controller['faces']:
+			stream_faces = stream_controller['faces']
+		stream_controller['frame_number'] += 1
+		futures.append((capture_time, stream_quality, motion_frame, executor.submit(process_stream_frame, capture_frame, stream_quality, stream_faces)))
+
+
+def resolve_stream_frame(futures : Deque[StreamFuture], stream_controller : StreamController, frame_budget : float) -> Tuple[float, Frame]:
+	capture_time, stream_quality, motion_frame, future = futures.popleft()
+	capture_frame, process_time, stream_faces = future.result()
+	if motion_frame is not None:
+		if stream_quality is STREAM_QUALITIES[stream_controller['level']]:
+			stream_controller['faces'] = stream_faces
+		set_motion_reference(stream_controller, motion_frame, capture_frame, stream_faces, stream_quality['scale'], capture_time)
+		update_stream_controller(stream_controller, process_time, frame_budget)
+	return capture_time, capture_frame
+
+
+def cancel_oldest_pending(futures : Deque[StreamFuture]) -> bool:
+	for stream_future in futures:
+		if stream_future[3].cancel():
+			futures.remove(stream_future)
+			return True
+	return False
+
+
+def process_stream_frame(temp_frame : Frame, stream_quality : StreamQuality, stream_faces : Optional[List[Face]]) -> Tuple[Frame, float, List[Face]]:
+	start_time = time.perf_counter()
+	frame_height, frame_width = temp_frame.shape[:2]
+	if stream_quality['scale'] < 1:
+		temp_frame = cv2.resize(temp_frame, (int(frame_width * stream_quality['scale']), int(frame_height * stream_quality['scale'])))
+	if stream_faces:
+		set_faces_cache(temp_frame, stream_faces)
+	elif not any(has_frame_processor_capability(frame_processor, 'face') for frame_processor in facefusion.globals.frame_processors):
+		stream_faces = []
+	else:
+		try:
+			stream_faces = detect_many_faces(temp_frame)
+		except (AttributeError, ValueError):
+			stream_faces = []
+	for frame_processor_handle in get_frame_processors_handles(facefusion.globals.frame_processors, 'stream'):
+		if has_frame_processor_capability(frame_processor_handle.name, 'enhance') and not stream_quality['enhancer']:
+			continue
+		temp_frame = frame_processor_handle.process_frame(
+			frame_processor_handle.frame_processor,
+			frame_processor_handle.source_face,
+			None,
+			temp_frame
+		)
+	if temp_frame.shape[:2] != (frame_height, frame_width):
+		temp_frame = cv2.resize(temp_frame, (frame_width, frame_height))
+	return temp_frame, time.perf_counter() - start_time, stream_faces
+
+
+def open_stream(mode : StreamMode, resolution : str, fps : float, stream_port : int = 27000) -> subprocess.Popen[bytes]:
+	commands = [ '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', resolution, '-r', str(fps), '-i', '-' ]
+	if mode == 'udp':
+		commands.extend([ '-b:v', '2000k', '-f', 'mpegts', 'udp://localhost:' + str(stream_port) + '?pkt_size=1316' ])
+	if mode == 'v4l2':
+		device_name = os.listdir('/sys/devices/virtual/video4linux')[0]
+		commands.extend([ '-f', 'v4l2', '/dev/' + device_name ])
+	return open_ffmpeg(commands)
@@ -1,8 +1,11 @@
-from typing import Any, Literal, Callable, List, TypedDict, Dict
-from insightface.app.common import Face
+from typing import TYPE_CHECKING, Any, Literal, Callable, Deque, List, Tuple, TypedDict, NamedTuple, Dict, Optional
+from concurrent.futures import Future
 import numpy
 
-Face = Face
+if TYPE_CHECKING:
+	from insightface.app.common import Face
+else:
+	Face = Any
 Frame = numpy.ndarray[Any, Any]
 Matrix = numpy.ndarray[Any, Any]
 
@@ -10,6 +13,7 @@ Update_Process = Callable[[], None]
 Process_Frames = Callable[[str, List[str], Update_Process], None]
 
 ProcessMode = Literal[ 'output', 'preview', 'stream' ]
+FrameProcessorCapability = Literal[ 'face', 'draft', 'enhance' ]
 FaceRecognition = Literal[ 'reference', 'many' ]
 FaceAnalyserDirection = Literal[ 'left-right', 'right-left', 'top-bottom', 'bottom-top', 'small-large', 'large-small' ]
 FaceAnalyserAge = Literal[ 'child', 'teen', 'adult', 'senior' ]
@@ -17,8 +21,167 @@ FaceAnalyserGender = Literal[ 'male', 'female' ]
 TempFrameFormat = Literal[ 'jpg', 'png' ]
 OutputVideoEncoder = Literal[ 'libx264', 'libx265', 'libvpx-vp9', 'h264_nvenc', 'hevc_nvenc' ]
 
+VideoSegment = Tuple[int, int, bool]
+FrameRange = Tuple[int, int]
+FaceCluster = TypedDict('FaceCluster',
+{
+	'face' : Face,
+	'frame_number' : int,
+	'frame_ranges' : List[FrameRange],
+	'face_total' : int,
+	'crop_frame' : Optional[Frame]
+})
+VideoReader = TypedDict('VideoReader',
+{
+	'capture' : Any,
+	'video_mtime' : float,
+	'frame_position' : int
+})
+VideoProbe = TypedDict('VideoProbe',
+{
+	'fps' : float,
+	'frame_total' : int,
+	'duration' : float,
+	'resolution' : Tuple[int, int],
+	'rotation' : int
+})
+VideoStream = TypedDict('VideoStream',
+{
+	'codec_name' : Optional[str],
+	'profile' : Optional[str],
+	'pix_fmt' : Optional[str],
+	'width' : Optional[int],
+	'height' : Optional[int],
+	'field_order' : Optional[str]
+})
+VideoPacket = Tuple[float, bool]
+
+FrameProcessorHandle = NamedTuple('FrameProcessorHandle',
+[
+	('name', str),
+	('frame_processor', Any),
+	('options', 'OptionsWithModel'),
+	('source_face', Optional[Face]),
+	('process_frame', Callable[[Any, Optional[Face], Optional[Face], Frame], Frame])
+])
+
+StreamMode = Literal[ 'udp', 'v4l2' ]
+StreamQuality = TypedDict('StreamQuality',
+{
+	'scale' : float,
+	'detector_interval' : int,
+	'enhancer' : bool
+})
+StreamController = TypedDict('StreamController',
+{
+	'level' : int,
+	'process_time' : float,
+	'degrade_count' : int,
+	'upgrade_count' : int,
+	'frame_number' : int,
+	'faces' : List[Face],
+	'motion_frame' : Optional[Frame],
+	'motion_result' : Optional[Frame],
+	'motion_regions' : List[Tuple[int, int, int, int]],
+	'motion_time' : float
+})
+StreamFuture = Tuple[float, StreamQuality, Optional[Frame], Future[Any]]
+LiveStream = TypedDict('LiveStream',
+{
+	'index' : int,
+	'fps' : float,
+	'capture' : Any,
+	'capture_frames' : Deque[Tuple[float, Frame]],
+	'capture_thread' : Any,
+	'stream' : Any,
+	'stream_frames' : Deque[Frame],
+	'stream_event' : Any,
+	'stream_thread' : Any,
+	'stop_event' : Any,
+	'futures' : Deque[StreamFuture],
+	'controller' : StreamController,
+	'frame_total' : int,
+	'drop_total' : int,
+	'latency' : float
+})
+
+FrameProcessorManifest = TypedDict('FrameProcessorManifest',
+{
+	'args' : List[Dict[str, Any]],
+	'models' : List[str],
+	'capabilities' : List[FrameProcessorCapability]
+})
+
 ModelValue = Dict['str', Any]
 OptionsWithModel = TypedDict('OptionsWithModel',
 {
 	'model' : ModelValue
 })
+
+ModelKey = Tuple[str, ...]
+BoundingBox = Tuple[int, int, int, int]
+ResidentModel = TypedDict('ResidentModel',
+{
+	'model' : Any,
+	'size' : int,
+	'load_time' : float,
+	'warm_up_time' : float
+})
+
+BenchmarkSamplesKey = Literal[ 'time_samples', 'latency_samples' ]
+BenchmarkStage = TypedDict('BenchmarkStage',
+{
+	'time' : float,
+	'fps' : float,
+	'latency_p50' : float,
+	'latency_p95' : float,
+	'time_samples' : List[float],
+	'latency_samples' : List[float]
+})
+BenchmarkReport = TypedDict('BenchmarkReport',
+{
+	'config' : str,
+	'target_path' : str,
+	'resolution' : str,
+	'fps' : float,
+	'frame_total' : int,
+	'cycle_total' : int,
+	'frame_processors' : List[str],
+	'stages' : Dict[str, BenchmarkStage]
+})
+BenchmarkQuality = TypedDict('BenchmarkQuality',
+{
+	'config' : str,
+	'time' : float,
+	'psnr' : float,
+	'ssim' : float,
+	'face_psnr' : float,
+	'face_ssim' : float
+})
+MicrobenchmarkResult = TypedDict('MicrobenchmarkResult',
+{
+	'iterations' : int,
+	'median' : float,
+	'iqr' : float,
+	'minimum' : float,
+	'samples' : List[float]
+})
+BenchmarkRun = TypedDict('BenchmarkRun',
+{
+	'run_id' : str,
+	'fingerprint' : str,
+	'settings_hash' : str,
+	'revision' : str,
+	'created_at' : float,
+	'report' : BenchmarkReport
+})
+BenchmarkComparison = TypedDict('BenchmarkComparison',
+{
+	'stage_name' : str,
+	'metric' : str,
+	'baseline' : float,
+	'candidate' : float,
+	'change' : float,
+	'p_value' : float,
+	'regression' : bool
+})
@@ -20,6 +20,12 @@ def render() -> None:
 		value.append('skip-audio')
 	if facefusion.globals.skip_download:
 		value.append('skip-download')
+	if facefusion.globals.skip_faceless_frames:
+		value.append('skip-faceless-frames')
+	if facefusion.globals.skip_unselected_frames:
+		value.append('skip-unselected-frames')
+	if facefusion.globals.smart_cut:
+		value.append('smart-cut')
 	COMMON_OPTIONS_CHECKBOX_GROUP = gradio.Checkboxgroup(
 		label = wording.get('common_options_checkbox_group_label'),
 		choices = choices.common_options,
@@ -36,3 +42,6 @@ def update(common_options : List[str]) -> None:
 	facefusion.globals.keep_temp = 'keep-temp' in common_options
 	facefusion.globals.skip_audio = 'skip-audio' in common_options
 	facefusion.globals.skip_download = 'skip-download' in common_options
+	facefusion.globals.skip_faceless_frames = 'skip-faceless-frames' in common_options
+	facefusion.globals.skip_unselected_frames = 'skip-unselected-frames' in common_options
+	facefusion.globals.smart_cut = 'smart-cut' in common_options
@@ -4,7 +4,7 @@ import onnxruntime
 
 import facefusion.globals
 from facefusion import wording
-from facefusion.face_analyser import clear_face_analyser
+from facefusion.model_registry import clear_models
 from facefusion.processors.frame.core import clear_frame_processors_modules
 from facefusion.utilities import encode_execution_providers, decode_execution_providers
 
@@ -26,7 +26,7 @@ def listen() -> None:
 
 
 def update_execution_providers(execution_providers : List[str]) -> gradio.CheckboxGroup:
-	clear_face_analyser()
+	clear_models()
 	clear_frame_processors_modules()
 	if not execution_providers:
 		execution_providers = encode_execution_providers(onnxruntime.get_available_providers())
@@ -1,26 +1,31 @@
-from typing import List, Optional, Tuple, Any, Dict
-
+from typing import List, Optional, Tuple, Any, Dict, Generator
+from functools import lru_cache
+import os
 import gradio
 
 import facefusion.choices
 import facefusion.globals
 from facefusion import wording
 from facefusion.vision import get_video_frame, normalize_frame_color, read_static_image
-from facefusion.face_analyser import get_many_faces
-from facefusion.face_reference import clear_face_reference
-from facefusion.typing import Frame, FaceRecognition
-from facefusion.utilities import is_image, is_video
+from facefusion.face_analyser import detect_many_faces, sort_and_filter_faces
+from facefusion.face_reference import clear_face_reference, set_face_reference
+from facefusion.face_cluster import get_face_clusters, scan_face_clusters, crop_face_frame
+from facefusion.typing import Frame, Face, FaceCluster, FaceRecognition
+from facefusion.utilities import is_image, is_video, resolve_video_preview_path
 from facefusion.uis.core import get_ui_component, register_ui_component
+from facefusion.uis.components.preview import update_preview_image
 from facefusion.uis.typing import ComponentName
 
 FACE_RECOGNITION_DROPDOWN : Optional[gradio.Dropdown] = None
 REFERENCE_FACE_POSITION_GALLERY : Optional[gradio.Gallery] = None
+FACE_CLUSTER_GALLERY : Optional[gradio.Gallery] = None
 REFERENCE_FACE_DISTANCE_SLIDER : Optional[gradio.Slider] = None
 
 
 def render() -> None:
 	global FACE_RECOGNITION_DROPDOWN
 	global REFERENCE_FACE_POSITION_GALLERY
+	global FACE_CLUSTER_GALLERY
 	global REFERENCE_FACE_DISTANCE_SLIDER
 
 	reference_face_gallery_args: Dict[str, Any] =\
@@ -32,18 +37,26 @@ def render() -> None:
 		'allow_preview': False,
 		'visible': 'reference' in facefusion.globals.face_recognition
 	}
-	if is_image(facefusion.globals.target_path):
-		reference_frame = read_static_image(facefusion.globals.target_path)
-		reference_face_gallery_args['value'] = extract_gallery_frames(reference_frame)
+	face_cluster_gallery_args: Dict[str, Any] =\
+	{
+		'label': wording.get('face_cluster_gallery_label'),
+		'height': 120,
+		'object_fit': 'cover',
+		'columns': 10,
+		'allow_preview': False,
+		'visible': 'reference' in facefusion.globals.face_recognition
+	}
+	if is_image(facefusion.globals.target_path) or is_video(facefusion.globals.target_path):
+		reference_face_gallery_args['value'] = get_gallery_frames()
 	if is_video(facefusion.globals.target_path):
-		reference_frame = get_video_frame(facefusion.globals.target_path, facefusion.globals.reference_frame_number)
-		reference_face_gallery_args['value'] = extract_gallery_frames(reference_frame)
+		face_cluster_gallery_args['value'] = get_face_cluster_gallery_frames(get_face_clusters())
 	FACE_RECOGNITION_DROPDOWN = gradio.Dropdown(
 		label = wording.get('face_recognition_dropdown_label'),
 		choices = facefusion.choices.face_recognitions,
 		value = facefusion.globals.face_recognition
 	)
 	REFERENCE_FACE_POSITION_GALLERY = gradio.Gallery(**reference_face_gallery_args)
+	FACE_CLUSTER_GALLERY = gradio.Gallery(**face_cluster_gallery_args)
 	REFERENCE_FACE_DISTANCE_SLIDER = gradio.Slider(
 		label = wording.get('reference_face_distance_slider_label'),
 		value = facefusion.globals.reference_face_distance,
@@ -54,12 +67,18 @@ def render() -> None:
 	)
 	register_ui_component('face_recognition_dropdown', FACE_RECOGNITION_DROPDOWN)
 	register_ui_component('reference_face_position_gallery', REFERENCE_FACE_POSITION_GALLERY)
+	register_ui_component('face_cluster_gallery', FACE_CLUSTER_GALLERY)
 	register_ui_component('reference_face_distance_slider', REFERENCE_FACE_DISTANCE_SLIDER)
 
 
 def listen() -> None:
-	FACE_RECOGNITION_DROPDOWN.select(update_face_recognition, inputs = FACE_RECOGNITION_DROPDOWN, outputs = [ REFERENCE_FACE_POSITION_GALLERY, REFERENCE_FACE_DISTANCE_SLIDER ])
+	FACE_RECOGNITION_DROPDOWN.select(update_face_recognition, inputs = FACE_RECOGNITION_DROPDOWN, outputs = [ REFERENCE_FACE_POSITION_GALLERY, FACE_CLUSTER_GALLERY, REFERENCE_FACE_DISTANCE_SLIDER ])
 	REFERENCE_FACE_POSITION_GALLERY.select(clear_and_update_face_reference_position)
+	face_cluster_reference_event = FACE_CLUSTER_GALLERY.select(update_face_cluster_reference)
+	preview_image = get_ui_component('preview_image')
+	preview_frame_slider = get_ui_component('preview_frame_slider')
+	if preview_image and preview_frame_slider:
+		face_cluster_reference_event.then(update_preview_image, inputs = preview_frame_slider, outputs = preview_image)
 	REFERENCE_FACE_DISTANCE_SLIDER.change(update_reference_face_distance, inputs = REFERENCE_FACE_DISTANCE_SLIDER)
 	multi_component_names : List[ComponentName] =\
 	[
@@ -72,6 +91,9 @@ def listen() -> None:
 		if component:
 			for method in [ 'upload', 'change', 'clear' ]:
 				getattr(component, method)(update_face_reference_position, outputs = REFERENCE_FACE_POSITION_GALLERY)
+	target_video = get_ui_component('target_video')
+	if target_video:
+		target_video.change(update_face_cluster_gallery, outputs = FACE_CLUSTER_GALLERY)
 	select_component_names : List[ComponentName] =\
 	[
 		'face_analyser_direction_dropdown',
@@ -87,13 +109,13 @@ def listen() -> None:
 		preview_frame_slider.release(update_face_reference_position, outputs = REFERENCE_FACE_POSITION_GALLERY)
 
 
-def update_face_recognition(face_recognition : FaceRecognition) -> Tuple[gradio.Gallery, gradio.Slider]:
+def update_face_recognition(face_recognition : FaceRecognition) -> Tuple[gradio.Gallery, gradio.Gallery, gradio.Slider]:
 	if face_recognition == 'reference':
 		facefusion.globals.face_recognition = face_recognition
-		return gradio.Gallery(visible = True), gradio.Slider(visible = True)
+		return gradio.Gallery(visible = True), gradio.Gallery(visible = True), gradio.Slider(visible = True)
 	if face_recognition == 'many':
 		facefusion.globals.face_recognition = face_recognition
-		return gradio.Gallery(visible = False), gradio.Slider(visible = False)
+		return gradio.Gallery(visible = False), gradio.Gallery(visible = False), gradio.Slider(visible = False)
 
 
 def clear_and_update_face_reference_position(event: gradio.SelectData) -> gradio.Gallery:
@@ -104,33 +126,67 @@ def clear_and_update_face_reference_position(event: gradio.SelectData) -> gradio
 def update_face_reference_position(reference_face_position : int = 0) -> gradio.Gallery:
 	gallery_frames = []
 	facefusion.globals.reference_face_position = reference_face_position
-	if is_image(facefusion.globals.target_path):
-		reference_frame = read_static_image(facefusion.globals.target_path)
-		gallery_frames = extract_gallery_frames(reference_frame)
-	if is_video(facefusion.globals.target_path):
-		reference_frame = get_video_frame(facefusion.globals.target_path, facefusion.globals.reference_frame_number)
-		gallery_frames = extract_gallery_frames(reference_frame)
+	if is_image(facefusion.globals.target_path) or is_video(facefusion.globals.target_path):
+		gallery_frames = get_gallery_frames()
 	if gallery_frames:
 		return gradio.Gallery(value = gallery_frames)
 	return gradio.Gallery(value = None)
 
 
+def update_face_cluster_reference(event : gradio.SelectData) -> None:
+	face_clusters = get_face_clusters()
+	if event.index < len(face_clusters):
+		set_face_reference(face_clusters[event.index]['face'])
+
+
+def update_face_cluster_gallery() -> Generator[gradio.Gallery, None, None]:
+	if is_video(facefusion.globals.target_path):
+		for face_clusters in scan_face_clusters(facefusion.globals.target_path):
+			yield gradio.Gallery(value = get_face_cluster_gallery_frames(face_clusters))
+	else:
+		yield gradio.Gallery(value = None)
+
+
+def get_face_cluster_gallery_frames(face_clusters : List[FaceCluster]) -> List[Tuple[Frame, str]]:
+	gallery_frames = []
+	for face_cluster in face_clusters:
+		cluster_frame = face_cluster['crop_frame']
+		if cluster_frame is None:
+			reference_frame = get_video_frame(facefusion.globals.target_path, face_cluster['frame_number'])
+			cluster_frame = crop_face_frame(reference_frame, face_cluster['face'])
+		cluster_caption = ', '.join(str(start_frame) + '-' + str(end_frame - 1) for start_frame, end_frame in face_cluster['frame_ranges'])
+		gallery_frames.append((normalize_frame_color(cluster_frame), cluster_caption))
+	return gallery_frames
+
+
 def update_reference_face_distance(reference_face_distance : float) -> None:
 	facefusion.globals.reference_face_distance = reference_face_distance
 
 
-def extract_gallery_frames(reference_frame : Frame) -> List[Frame]:
-	crop_frames = []
-	faces = get_many_faces(reference_frame)
-	for face in faces:
-		start_x, start_y, end_x, end_y = map(int, face['bbox'])
-		padding_x = int((end_x - start_x) * 0.25)
-		padding_y = int((end_y - start_y) * 0.25)
-		start_x = max(0, start_x - padding_x)
-		start_y = max(0, start_y - padding_y)
-		end_x = max(0, end_x + padding_x)
-		end_y = max(0, end_y + padding_y)
-		crop_frame = reference_frame[start_y:end_y, start_x:end_x]
-		crop_frame = normalize_frame_color(crop_frame)
-		crop_frames.append(crop_frame)
-	return crop_frames
+def get_gallery_frames() -> List[Frame]:
+	if is_image(facefusion.globals.target_path):
+		gallery_path = facefusion.globals.target_path
+		gallery_frame_number = 0
+	else:
+		gallery_path = resolve_video_preview_path(facefusion.globals.target_path)
+		gallery_frame_number = facefusion.globals.reference_frame_number
+	gallery_faces, gallery_frames = extract_gallery_faces(gallery_path, os.path.getmtime(gallery_path), gallery_frame_number)
+	gallery_frame_map = { id(face): gallery_frame for face, gallery_frame in zip(gallery_faces, gallery_frames) }
+	return [ gallery_frame_map[id(face)] for face in sort_and_filter_faces(gallery_faces) ]
+
+
+@lru_cache(maxsize = 16)
+def extract_gallery_faces(gallery_path : str, gallery_mtime : float, gallery_frame_number : int) -> Tuple[List[Face], List[Frame]]:
+	if is_image(gallery_path):
+		reference_frame = read_static_image(gallery_path)
+	else:
+		reference_frame = get_video_frame(gallery_path, gallery_frame_number)
+	try:
+		faces = detect_many_faces(reference_frame)
+	except (AttributeError, ValueError):
+		faces = []
+	return faces, extract_gallery_frames(reference_frame, faces)
+
+
+def extract_gallery_frames(reference_frame : Frame, faces : List[Face]) -> List[Frame]:
+	return [ normalize_frame_color(crop_face_frame(reference_frame, face)) for face in faces ]
@@ -4,7 +4,7 @@ import gradio
 import facefusion.globals
 from facefusion import wording
 from facefusion.processors.frame.core import load_frame_processor_module, clear_frame_processors_modules
-from facefusion.utilities import list_module_names
+from facefusion.processors.frame.registry import list_frame_processors
 from facefusion.uis.core import register_ui_component
 
 FRAME_PROCESSORS_CHECKBOX_GROUP : Optional[gradio.CheckboxGroup] = None
@@ -36,5 +36,5 @@ def update_frame_processors(frame_processors : List[str]) -> gradio.CheckboxGrou
 
 
 def sort_frame_processors(frame_processors : List[str]) -> list[str]:
-	available_frame_processors = list_module_names('facefusion/processors/frame/modules')
+	available_frame_processors = list_frame_processors()
 	return sorted(available_frame_processors, key = lambda frame_processor : frame_processors.index(frame_processor) if frame_processor in frame_processors else len(frame_processors))
@@ -1,21 +1,31 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Generator, List, Optional, Tuple
+from collections import OrderedDict
+import threading
 import cv2
 import gradio
 
 import facefusion.globals
 from facefusion import wording
+from facefusion.face_cache import create_frame_hash
 from facefusion.typing import Frame, Face
 from facefusion.vision import get_video_frame, count_video_frame_total, normalize_frame_color, resize_frame_dimension, read_static_image
 from facefusion.face_analyser import get_one_face
 from facefusion.face_reference import get_face_reference, set_face_reference
 from facefusion.predictor import predict_frame
 from facefusion.processors.frame.core import load_frame_processor_module
-from facefusion.utilities import is_video, is_image
+from facefusion.processors.frame import globals as frame_processors_globals
+from facefusion.processors.frame.registry import has_frame_processor_capability
+from facefusion.utilities import is_video, is_image, resolve_video_preview_path
 from facefusion.uis.typing import ComponentName
 from facefusion.uis.core import get_ui_component, register_ui_component
 
 PREVIEW_IMAGE : Optional[gradio.Image] = None
 PREVIEW_FRAME_SLIDER : Optional[gradio.Slider] = None
+PREVIEW_FRAME_CACHE : OrderedDict[Tuple[Any, ...], Frame] = OrderedDict()
+PREDICT_FRAME_CACHE : OrderedDict[str, bool] = OrderedDict()
+PREVIEW_CACHE_LIMIT = 64
+PREVIEW_REQUEST_ID = 0
+THREAD_LOCK : threading.Lock = threading.Lock()
 
 
 def render() -> None:
@@ -40,11 +50,11 @@ def render() -> None:
 	reference_face = get_face_reference() if 'reference' in facefusion.globals.face_recognition else None
 	if is_image(facefusion.globals.target_path):
 		target_frame = read_static_image(facefusion.globals.target_path)
-		preview_frame = process_preview_frame(source_face, reference_face, target_frame)
+		preview_frame = process_preview_frame(source_face, reference_face, target_frame, facefusion.globals.frame_processors)
 		preview_image_args['value'] = normalize_frame_color(preview_frame)
 	if is_video(facefusion.globals.target_path):
-		temp_frame = get_video_frame(facefusion.globals.target_path, facefusion.globals.reference_frame_number)
-		preview_frame = process_preview_frame(source_face, reference_face, temp_frame)
+		temp_frame = get_video_frame(resolve_video_preview_path(facefusion.globals.target_path), facefusion.globals.reference_frame_number)
+		preview_frame = process_preview_frame(source_face, reference_face, temp_frame, facefusion.globals.frame_processors)
 		preview_image_args['value'] = normalize_frame_color(preview_frame)
 		preview_image_args['visible'] = True
 		preview_frame_slider_args['value'] = facefusion.globals.reference_frame_number
@@ -52,6 +62,7 @@ def render() -> None:
 		preview_frame_slider_args['visible'] = True
 	PREVIEW_IMAGE = gradio.Image(**preview_image_args)
 	PREVIEW_FRAME_SLIDER = gradio.Slider(**preview_frame_slider_args)
+	register_ui_component('preview_image', PREVIEW_IMAGE)
 	register_ui_component('preview_frame_slider', PREVIEW_FRAME_SLIDER)
 
 
@@ -104,22 +115,101 @@ def listen() -> None:
 			component.change(update_preview_image, inputs = PREVIEW_FRAME_SLIDER, outputs = PREVIEW_IMAGE)
 
 
-def update_preview_image(frame_number : int = 0) -> gradio.Image:
-	conditional_set_face_reference()
-	source_face = get_one_face(read_static_image(facefusion.globals.source_path))
-	reference_face = get_face_reference() if 'reference' in facefusion.globals.face_recognition else None
-	if is_image(facefusion.globals.target_path):
-		target_frame = read_static_image(facefusion.globals.target_path)
-		preview_frame = process_preview_frame(source_face, reference_face, target_frame)
-		preview_frame = normalize_frame_color(preview_frame)
-		return gradio.Image(value = preview_frame)
+def update_preview_image(frame_number : int = 0) -> Generator[gradio.Image, None, None]:
+	preview_request_id = create_preview_request_id()
+	with THREAD_LOCK:
+		if preview_request_id != PREVIEW_REQUEST_ID:
+			yield gradio.Image()
+			return
+		if is_video(facefusion.globals.target_path):
+			facefusion.globals.reference_frame_number = frame_number
+		conditional_set_face_reference()
+		preview_key = create_preview_key(frame_number)
+		if preview_key in PREVIEW_FRAME_CACHE:
+			PREVIEW_FRAME_CACHE.move_to_end(preview_key)
+			yield gradio.Image(value = PREVIEW_FRAME_CACHE[preview_key])
+			return
+		source_face = get_one_face(read_static_image(facefusion.globals.source_path))
+		reference_face = get_face_reference() if 'reference' in facefusion.globals.face_recognition else None
+		if is_image(facefusion.globals.target_path):
+			temp_frame = read_static_image(facefusion.globals.target_path)
+		elif is_video(facefusion.globals.target_path):
+			temp_frame = get_video_frame(resolve_video_preview_path(facefusion.globals.target_path), facefusion.globals.reference_frame_number)
+		else:
+			yield gradio.Image(value = None)
+			return
+		temp_frame = resize_frame_dimension(temp_frame, 640, 640)
+		draft_frame_processors, refine_frame_processors = split_preview_frame_processors(facefusion.globals.frame_processors)
+		if predict_preview_frame(temp_frame):
+			refine_frame_processors = []
+		preview_frame = process_preview_frame(source_face, reference_face, temp_frame, draft_frame_processors, preview_request_id)
+	if preview_frame is None:
+		yield gradio.Image()
+		return
+	if refine_frame_processors:
+		yield gradio.Image(value = normalize_frame_color(preview_frame))
+		with THREAD_LOCK:
+			preview_frame = apply_preview_frame_processors(source_face, reference_face, preview_frame, refine_frame_processors, preview_request_id)
+		if preview_frame is None:
+			yield gradio.Image()
+			return
+	preview_frame = normalize_frame_color(preview_frame)
+	with THREAD_LOCK:
+		set_preview_cache(PREVIEW_FRAME_CACHE, preview_key, preview_frame)
+	yield gradio.Image(value = preview_frame)
+
+
+def split_preview_frame_processors(frame_processors : List[str]) -> Tuple[List[str], List[str]]:
+	draft_indices = [ index for index, frame_processor in enumerate(frame_processors) if has_frame_processor_capability(frame_processor, 'draft') ]
+	if draft_indices:
+		draft_index = draft_indices[-1] + 1
+		return frame_processors[:draft_index], frame_processors[draft_index:]
+	return frame_processors, []
+
+
+def create_preview_request_id() -> int:
+	global PREVIEW_REQUEST_ID
+
+	PREVIEW_REQUEST_ID = PREVIEW_REQUEST_ID + 1
+	return PREVIEW_REQUEST_ID
+
+
+def create_preview_key(frame_number : int) -> Tuple[Any, ...]:
+	preview_path = facefusion.globals.target_path
 	if is_video(facefusion.globals.target_path):
-		facefusion.globals.reference_frame_number = frame_number
-		temp_frame = get_video_frame(facefusion.globals.target_path, facefusion.globals.reference_frame_number)
-		preview_frame = process_preview_frame(source_face, reference_face, temp_frame)
-		preview_frame = normalize_frame_color(preview_frame)
-		return gradio.Image(value = preview_frame)
-	return gradio.Image(value = None)
+		preview_path = resolve_video_preview_path(facefusion.globals.target_path)
+	else:
+		frame_number = 0
+	return\
+	(
+		facefusion.globals.source_path,
+		preview_path,
+		frame_number,
+		tuple(facefusion.globals.frame_processors),
+		facefusion.globals.face_recognition,
+		facefusion.globals.face_analyser_direction,
+		facefusion.globals.face_analyser_age,
+		facefusion.globals.face_analyser_gender,
+		facefusion.globals.reference_face_position,
+		facefusion.globals.reference_face_distance,
+		id(get_face_reference()),
+		frame_processors_globals.face_swapper_model,
+		frame_processors_globals.face_enhancer_model,
+		frame_processors_globals.face_enhancer_blend,
+		frame_processors_globals.frame_enhancer_model,
+		frame_processors_globals.frame_enhancer_blend
+	)
+
+
+def set_preview_cache(preview_cache : OrderedDict[Any, Any], key : Any, value : Any) -> None:
+	preview_cache[key] = value
+	while len(preview_cache) > PREVIEW_CACHE_LIMIT:
+		preview_cache.popitem(last = False)
+
+
+def clear_preview_cache() -> None:
+	PREVIEW_FRAME_CACHE.clear()
+	PREDICT_FRAME_CACHE.clear()
 
 
 def update_preview_frame_slider(frame_number : int = 0) -> gradio.Slider:
@@ -132,11 +222,17 @@ def update_preview_frame_slider(frame_number : int = 0) -> gradio.Slider:
 	return gradio.Slider()
 
 
-def process_preview_frame(source_face : Face, reference_face : Face, temp_frame : Frame) -> Frame:
+def process_preview_frame(source_face : Face, reference_face : Face, temp_frame : Frame, frame_processors : List[str], preview_request_id : Optional[int] = None) -> Optional[Frame]:
 	temp_frame = resize_frame_dimension(temp_frame, 640, 640)
-	if predict_frame(temp_frame):
+	if predict_preview_frame(temp_frame):
 		return cv2.GaussianBlur(temp_frame, (99, 99), 0)
-	for frame_processor in facefusion.globals.frame_processors:
+	return apply_preview_frame_processors(source_face, reference_face, temp_frame, frame_processors, preview_request_id)
+
+
+def apply_preview_frame_processors(source_face : Face, reference_face : Face, temp_frame : Frame, frame_processors : List[str], preview_request_id : Optional[int] = None) -> Optional[Frame]:
+	for frame_processor in frame_processors:
+		if preview_request_id and preview_request_id != PREVIEW_REQUEST_ID:
+			return None
 		frame_processor_module = load_frame_processor_module(frame_processor)
 		if frame_processor_module.pre_process('preview'):
 			temp_frame = frame_processor_module.process_frame(
@@ -147,6 +243,13 @@ def process_preview_frame(source_face : Face, reference_face : Face, temp_frame
 	return temp_frame
 
 
+def predict_preview_frame(temp_frame : Frame) -> bool:
+	frame_hash = create_frame_hash(temp_frame)
+	if frame_hash not in PREDICT_FRAME_CACHE:
+		set_preview_cache(PREDICT_FRAME_CACHE, frame_hash, predict_frame(temp_frame))
+	return PREDICT_FRAME_CACHE[frame_hash]
+
+
 def conditional_set_face_reference() -> None:
 	if 'reference' in facefusion.globals.face_recognition and not get_face_reference():
 		reference_frame = get_video_frame(facefusion.globals.target_path, facefusion.globals.reference_frame_number)
@@ -1,15 +1,18 @@
 from typing import Any, IO, Tuple, Optional
+import threading
 import gradio
 
 import facefusion.globals
 from facefusion import wording
 from facefusion.face_reference import clear_face_reference
-from facefusion.utilities import is_image, is_video
+from facefusion.face_cluster import clear_face_clusters
+from facefusion.utilities import is_image, is_video, create_video_proxy
 from facefusion.uis.core import register_ui_component
 
 TARGET_FILE : Optional[gradio.File] = None
 TARGET_IMAGE : Optional[gradio.Image] = None
 TARGET_VIDEO : Optional[gradio.Video] = None
+VIDEO_PROXY_STOP_EVENT : Optional[threading.Event] = None
 
 
 def render() -> None:
@@ -41,6 +44,8 @@ def render() -> None:
 		visible = is_target_video,
 		show_label = False
 	)
+	if is_target_video:
+		start_video_proxy(facefusion.globals.target_path)
 	register_ui_component('target_image', TARGET_IMAGE)
 	register_ui_component('target_video', TARGET_VIDEO)
 
@@ -51,11 +56,27 @@ def listen() -> None:
 
 def update(file : IO[Any]) -> Tuple[gradio.Image, gradio.Video]:
 	clear_face_reference()
+	clear_face_clusters()
+	stop_video_proxy()
 	if file and is_image(file.name):
 		facefusion.globals.target_path = file.name
 		return gradio.Image(value = file.name, visible = True), gradio.Video(value = None, visible = False)
 	if file and is_video(file.name):
 		facefusion.globals.target_path = file.name
+		start_video_proxy(file.name)
 		return gradio.Image(value = None, visible = False), gradio.Video(value = file.name, visible = True)
 	facefusion.globals.target_path = None
 	return gradio.Image(value = None, visible = False), gradio.Video(value = None, visible = False)
+
+
+def start_video_proxy(target_path : str) -> None:
+	global VIDEO_PROXY_STOP_EVENT
+
+	stop_video_proxy()
+	VIDEO_PROXY_STOP_EVENT = threading.Event()
+	threading.Thread(target = create_video_proxy, args = (target_path, VIDEO_PROXY_STOP_EVENT), daemon = True).start()
+
+
+def stop_video_proxy() -> None:
+	if VIDEO_PROXY_STOP_EVENT:
+		VIDEO_PROXY_STOP_EVENT.set()
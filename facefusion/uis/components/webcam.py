@@ -1,9 +1,9 @@
-from typing import Optional, Generator, Deque
+from typing import Optional, Generator, Deque, Tuple
 from concurrent.futures import ThreadPoolExecutor
 from collections import deque
-import os
 import platform
-import subprocess
+import threading
+import time
 import cv2
 import gradio
 from tqdm import tqdm
@@ -11,12 +11,10 @@ from tqdm import tqdm
 import facefusion.globals
 from facefusion import wording
 from facefusion.predictor import predict_stream
-from facefusion.typing import Frame, Face
-from facefusion.face_analyser import get_one_face
-from facefusion.processors.frame.core import get_frame_processors_modules
-from facefusion.utilities import open_ffmpeg
-from facefusion.vision import normalize_frame_color, read_static_image
-from facefusion.uis.typing import StreamMode, WebcamMode
+from facefusion.stream import STREAM_BUFFER_SIZE, read_capture_frames, is_capture_active, write_stream_frames, open_stream, create_stream_controller, submit_stream_frame, resolve_stream_frame, calc_stream_frame_budget, cancel_oldest_pending
+from facefusion.typing import Frame, StreamFuture
+from facefusion.vision import normalize_frame_color
+from facefusion.uis.typing import WebcamMode
 from facefusion.uis.core import get_ui_component
 
 WEBCAM_IMAGE : Optional[gradio.Image] = None
@@ -62,36 +60,67 @@ def listen() -> None:
 
 def start(mode: WebcamMode, resolution: str, fps: float) -> Generator[Frame, None, None]:
 	facefusion.globals.face_recognition = 'many'
-	source_face = get_one_face(read_static_image(facefusion.globals.source_path))
 	stream = None
+	stream_thread = None
+	stream_frames : Deque[Frame] = deque(maxlen = STREAM_BUFFER_SIZE)
+	stream_event = threading.Event()
+	stop_event = threading.Event()
 	if mode in [ 'udp', 'v4l2' ]:
 		stream = open_stream(mode, resolution, fps) # type: ignore[arg-type]
+		stream_thread = threading.Thread(target = write_stream_frames, args = (stream, stream_frames, stream_event, stop_event), daemon = True)
+		stream_thread.start()
 	capture = capture_webcam(resolution, fps)
-	if capture.isOpened():
-		for capture_frame in multi_process_capture(source_face, capture):
-			if stream is not None:
-				stream.stdin.write(capture_frame.tobytes())
-			yield normalize_frame_color(capture_frame)
-
-
-def multi_process_capture(source_face: Face, capture : cv2.VideoCapture) -> Generator[Frame, None, None]:
+	capture_frames : Deque[Tuple[float, Frame]] = deque(maxlen = 1)
+	capture_event = threading.Event()
+	capture_thread = threading.Thread(target = read_capture_frames, args = (capture, capture_frames, capture_event, stop_event), daemon = True)
+	try:
+		if capture.isOpened():
+			capture_thread.start()
+			for capture_frame in multi_process_capture(capture_frames, capture_event, capture_thread, fps):
+				if stream_thread is not None:
+					stream_frames.append(capture_frame)
+					stream_event.set()
+				yield normalize_frame_color(capture_frame)
+	finally:
+		stop_event.set()
+		if capture_thread.is_alive():
+			capture_thread.join()
+		capture.release()
+		if stream is not None and stream_thread is not None:
+			stream_thread.join()
+			stream.stdin.close()
+
+
+def multi_process_capture(capture_frames : Deque[Tuple[float, Frame]], capture_event : threading.Event, capture_thread : threading.Thread, fps : float) -> Generator[Frame, None, None]:
 	progress = tqdm(desc = wording.get('processing'), unit = 'frame', dynamic_ncols = True)
+	stream_window_size = facefusion.globals.execution_thread_count + facefusion.globals.execution_queue_count
+	stream_controller = create_stream_controller()
+	frame_budget = calc_stream_frame_budget(fps)
+	drop_total = 0
 	with ThreadPoolExecutor(max_workers = facefusion.globals.execution_thread_count) as executor:
-		futures = []
-		deque_capture_frames : Deque[Frame] = deque()
-		while True:
-			_, capture_frame = capture.read()
+		futures : Deque[StreamFuture] = deque()
+		while is_capture_active(capture_thread, capture_frames):
+			capture_event.wait(0.5)
+			capture_event.clear()
+			if not capture_frames:
+				continue
+			capture_time, capture_frame = capture_frames.pop()
 			if predict_stream(capture_frame):
+				for stream_future in futures:
+					stream_future[3].cancel()
 				return
-			future = executor.submit(process_stream_frame, source_face, capture_frame)
-			futures.append(future)
-			for future_done in [ future for future in futures if future.done() ]:
-				capture_frame = future_done.result()
-				deque_capture_frames.append(capture_frame)
-				futures.remove(future_done)
-			while deque_capture_frames:
-				yield deque_capture_frames.popleft()
+			if len(futures) >= stream_window_size and cancel_oldest_pending(futures):
+				drop_total += 1
+			submit_stream_frame(executor, futures, stream_controller, capture_time, capture_frame)
+			while futures and (futures[0][3].done() or len(futures) > stream_window_size):
+				capture_time, capture_frame = resolve_stream_frame(futures, stream_controller, frame_budget)
+				yield capture_frame
+				progress.set_postfix(latency = '{:.0f}ms'.format((time.perf_counter() - capture_time) * 1000), drop_total = drop_total, quality_level = stream_controller['level'])
 				progress.update()
+		while futures:
+			capture_time, capture_frame = resolve_stream_frame(futures, stream_controller, frame_budget)
+			yield capture_frame
+			progress.update()
 
 
 def stop() -> gradio.Image:
@@ -111,22 +140,3 @@ def capture_webcam(resolution : str, fps : float) -> cv2.VideoCapture:
 	return capture
 
 
-def process_stream_frame(source_face : Face, temp_frame : Frame) -> Frame:
-	for frame_processor_module in get_frame_processors_modules(facefusion.globals.frame_processors):
-		if frame_processor_module.pre_process('stream'):
-			temp_frame = frame_processor_module.process_frame(
-				source_face,
-				None,
-				temp_frame
-			)
-	return temp_frame
-
-
-def open_stream(mode : StreamMode, resolution : str, fps : float) -> subprocess.Popen[bytes]:
-	commands = [ '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', resolution, '-r', str(fps), '-i', '-' ]
-	if mode == 'udp':
-		commands.extend([ '-b:v', '2000k', '-f', 'mpegts', 'udp://localhost:27000?pkt_size=1316' ])
-	if mode == 'v4l2':
-		device_name = os.listdir('/sys/devices/virtual/video4linux')[0]
-		commands.extend([ '-f', 'v4l2', '/dev/' + device_name ])
-	return open_ffmpeg(commands)
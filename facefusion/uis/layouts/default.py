@@ -71,4 +71,4 @@ def listen() -> None:
 
 
 def run(ui : gradio.Blocks) -> None:
-	ui.launch(show_api = False)
+	ui.queue(concurrency_count = 4, api_open = False).launch(show_api = False)
@@ -7,9 +7,11 @@ ComponentName = Literal\
 	'source_image',
 	'target_image',
 	'target_video',
+	'preview_image',
 	'preview_frame_slider',
 	'face_recognition_dropdown',
 	'reference_face_position_gallery',
+	'face_cluster_gallery',
 	'reference_face_distance_slider',
 	'face_analyser_direction_dropdown',
 	'face_analyser_age_dropdown',
@@ -29,4 +31,3 @@ ComponentName = Literal\
 	'webcam_fps_slider'
 ]
 WebcamMode = Literal[ 'inline', 'udp', 'v4l2' ]
-StreamMode = Literal[ 'udp', 'v4l2' ]
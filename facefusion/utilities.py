@@ -1,8 +1,10 @@
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 from functools import lru_cache
 from pathlib import Path
 from tqdm import tqdm
+import bisect
 import glob
+import hashlib
 import mimetypes
 import os
 import platform
@@ -10,15 +12,46 @@ import shutil
 import ssl
 import subprocess
 import tempfile
+import threading
 import urllib
+import uuid
 import onnxruntime
 
 import facefusion.globals
 from facefusion import wording
-from facefusion.vision import detect_fps
+from facefusion.typing import OutputVideoEncoder, VideoSegment, VideoStream
+from facefusion.vision import detect_fps, detect_image_resolution, detect_video_resolution, count_video_frame_total, detect_video_stream, detect_video_cut_frame_numbers
 
 TEMP_DIRECTORY_PATH = os.path.join(tempfile.gettempdir(), 'facefusion')
 TEMP_OUTPUT_VIDEO_NAME = 'temp.mp4'
+TEMP_VIDEO_SEGMENTS_NAME = 'segments.txt'
+VIDEO_PROXY_DIRECTORY_PATH = os.path.join(TEMP_DIRECTORY_PATH, 'proxies')
+VIDEO_PROXY_RESOLUTION = 640
+VIDEO_PROXY_LIMIT = 4
+SMART_CUT_VIDEO_CODECS : Dict[OutputVideoEncoder, str] =\
+{
+	'libx264': 'h264',
+	'libx265': 'hevc',
+	'h264_nvenc': 'h264',
+	'hevc_nvenc': 'hevc'
+}
+SMART_CUT_VIDEO_PROFILES : Dict[str, str] =\
+{
+	'Constrained Baseline': 'baseline',
+	'Baseline': 'baseline',
+	'Main': 'main',
+	'High': 'high',
+	'High 10': 'high10',
+	'High 4:2:2': 'high422',
+	'High 4:4:4 Predictive': 'high444',
+	'Main 10': 'main10'
+}
+SMART_CUT_VIDEO_TAGS : Dict[str, str] =\
+{
+	'h264': 'avc3',
+	'hevc': 'hev1'
+}
+SMART_CUT_FPS_TOLERANCE = 0.01
 
 # monkey patch ssl
 if platform.system().lower() == 'darwin':
@@ -46,16 +79,16 @@ def extract_frames(target_path : str, fps : float) -> bool:
 	trim_frame_start = facefusion.globals.trim_frame_start
 	trim_frame_end = facefusion.globals.trim_frame_end
 	temp_frames_pattern = get_temp_frames_pattern(target_path, '%04d')
-	commands = [ '-hwaccel', 'auto', '-i', target_path, '-q:v', str(temp_frame_compression), '-pix_fmt', 'rgb24' ]
-	if trim_frame_start is not None and trim_frame_end is not None:
-		commands.extend([ '-vf', 'trim=start_frame=' + str(trim_frame_start) + ':end_frame=' + str(trim_frame_end) + ',fps=' + str(fps) ])
-	elif trim_frame_start is not None:
-		commands.extend([ '-vf', 'trim=start_frame=' + str(trim_frame_start) + ',fps=' + str(fps) ])
-	elif trim_frame_end is not None:
-		commands.extend([ '-vf', 'trim=end_frame=' + str(trim_frame_end) + ',fps=' + str(fps) ])
+	commands = [ '-hwaccel', 'auto' ]
+	if trim_frame_start is not None or trim_frame_end is not None:
+		target_fps = detect_fps(target_path)
+		start_frame = trim_frame_start or 0
+		end_frame = trim_frame_end if trim_frame_end is not None else count_video_frame_total(target_path)
+		commands.extend([ '-ss', str(start_frame / target_fps), '-t', str((end_frame - start_frame) / target_fps) ])
+		commands.extend([ '-i', target_path, '-frames:v', str(round((end_frame - start_frame) * fps / target_fps)) ])
 	else:
-		commands.extend([ '-vf', 'fps=' + str(fps) ])
-	commands.extend([ '-vsync', '0', temp_frames_pattern ])
+		commands.extend([ '-i', target_path ])
+	commands.extend([ '-q:v', str(temp_frame_compression), '-pix_fmt', 'rgb24', '-vf', 'fps=' + str(fps), '-vsync', '0', temp_frames_pattern ])
 	return run_ffmpeg(commands)
 
 
@@ -68,7 +101,100 @@ def compress_image(output_path : str) -> bool:
 def merge_video(target_path : str, fps : float) -> bool:
 	temp_output_video_path = get_temp_output_video_path(target_path)
 	temp_frames_pattern = get_temp_frames_pattern(target_path, '%04d')
-	commands = [ '-hwaccel', 'auto', '-r', str(fps), '-i', temp_frames_pattern, '-c:v', facefusion.globals.output_video_encoder ]
+	commands = [ '-hwaccel', 'auto', '-r', str(fps), '-i', temp_frames_pattern ]
+	commands.extend(get_output_video_encoder_commands())
+	commands.extend([ '-y', temp_output_video_path ])
+	return run_ffmpeg(commands)
+
+
+def merge_video_audio(target_path : str, output_path : str, fps : float) -> bool:
+	temp_frames_pattern = get_temp_frames_pattern(target_path, '%04d')
+	commands = [ '-hwaccel', 'auto', '-r', str(fps), '-i', temp_frames_pattern ]
+	commands.extend(get_audio_input_commands(target_path))
+	commands.extend([ '-map', '0:v:0', '-map', '1:a:0?' ])
+	commands.extend(get_output_video_encoder_commands())
+	commands.extend([ '-c:a', 'copy', '-shortest', '-y', output_path ])
+	return run_ffmpeg(commands)
+
+
+def smart_merge_video(target_path : str, output_path : str, fps : float, process_frame_numbers : List[int]) -> bool:
+	video_stream = detect_video_stream(target_path)
+	temp_frame_paths = get_temp_frame_paths(target_path)
+	temp_frame_resolution = detect_image_resolution(temp_frame_paths[0]) if temp_frame_paths else None
+	if not video_stream or not is_smart_cut_compatible(video_stream, temp_frame_resolution, fps, detect_fps(target_path), facefusion.globals.output_video_encoder):
+		return False
+	trim_frame_start = facefusion.globals.trim_frame_start or 0
+	temp_frame_total = len(temp_frame_paths)
+	temp_frames_pattern = get_temp_frames_pattern(target_path, '%04d')
+	temp_directory_path = get_temp_directory_path(target_path)
+	temp_video_segments_path = os.path.join(temp_directory_path, TEMP_VIDEO_SEGMENTS_NAME)
+	cut_frame_numbers = [ cut_frame_number - trim_frame_start for cut_frame_number in detect_video_cut_frame_numbers(target_path) if trim_frame_start <= cut_frame_number < trim_frame_start + temp_frame_total ]
+	video_segments = create_video_segments(cut_frame_numbers, process_frame_numbers, temp_frame_total)
+	video_segment_paths = []
+	for index, (start_frame, end_frame, is_copy) in enumerate(video_segments):
+		video_segment_path = os.path.join(temp_directory_path, 'segment-' + str(index).zfill(4) + '.ts')
+		if is_copy:
+			start_time = (trim_frame_start + start_frame + 0.5) / fps
+			commands = [ '-ss', str(start_time), '-i', target_path, '-map', '0:v:0', '-frames:v', str(end_frame - start_frame), '-c', 'copy', '-f', 'mpegts', '-y', video_segment_path ]
+		else:
+			commands = [ '-hwaccel', 'auto', '-r', str(fps), '-start_number', str(start_frame + 1), '-i', temp_frames_pattern, '-frames:v', str(end_frame - start_frame) ]
+			commands.extend(get_output_video_encoder_commands())
+			commands.extend([ '-pix_fmt', video_stream.get('pix_fmt'), '-profile:v', SMART_CUT_VIDEO_PROFILES.get(video_stream.get('profile')), '-f', 'mpegts', '-y', video_segment_path ])
+		if not run_ffmpeg(commands):
+			return False
+		if not is_copy and not is_same_video_stream(video_stream, detect_video_stream(video_segment_path)):
+			return False
+		video_segment_paths.append(video_segment_path)
+	with open(temp_video_segments_path, 'w') as temp_video_segments_file:
+		for video_segment_path in video_segment_paths:
+			temp_video_segments_file.write('file \'' + video_segment_path + '\'\n')
+	commands = [ '-f', 'concat', '-safe', '0', '-i', temp_video_segments_path ]
+	if not facefusion.globals.skip_audio:
+		commands.extend(get_audio_input_commands(target_path))
+		commands.extend([ '-map', '0:v:0', '-map', '1:a:0?', '-shortest' ])
+	commands.extend([ '-c', 'copy' ])
+	if os.path.splitext(output_path)[-1].lower() in [ '.mp4', '.mov' ]:
+		commands.extend([ '-tag:v', SMART_CUT_VIDEO_TAGS.get(video_stream.get('codec_name')) ])
+	commands.extend([ '-y', output_path ])
+	return run_ffmpeg(commands)
+
+
+def is_smart_cut_compatible(video_stream : VideoStream, temp_frame_resolution : Optional[Tuple[int, int]], fps : float, target_fps : Optional[float], output_video_encoder : OutputVideoEncoder) -> bool:
+	if not target_fps or abs(fps - target_fps) > SMART_CUT_FPS_TOLERANCE:
+		return False
+	if SMART_CUT_VIDEO_CODECS.get(output_video_encoder) != video_stream.get('codec_name'):
+		return False
+	if video_stream.get('profile') not in SMART_CUT_VIDEO_PROFILES or not video_stream.get('pix_fmt'):
+		return False
+	if video_stream.get('field_order') not in [ None, 'progressive' ]:
+		return False
+	return temp_frame_resolution == (video_stream.get('width'), video_stream.get('height'))
+
+
+def is_same_video_stream(video_stream : VideoStream, other_video_stream : Optional[VideoStream]) -> bool:
+	if other_video_stream:
+		return all(video_stream.get(key) == other_video_stream.get(key) for key in [ 'codec_name', 'profile', 'pix_fmt', 'width', 'height' ])
+	return False
+
+
+def create_video_segments(keyframe_numbers : List[int], process_frame_numbers : List[int], frame_total : int) -> List[VideoSegment]:
+	video_segments : List[VideoSegment] = []
+	frame_numbers = sorted(set([ 0, frame_total ] + keyframe_numbers))
+	keyframe_number_set = set(keyframe_numbers)
+	process_frame_numbers = sorted(process_frame_numbers)
+	for start_frame, end_frame in zip(frame_numbers, frame_numbers[1:]):
+		process_frame_index = bisect.bisect_left(process_frame_numbers, start_frame)
+		has_process_frame = process_frame_index < len(process_frame_numbers) and process_frame_numbers[process_frame_index] < end_frame
+		is_copy = start_frame in keyframe_number_set and not has_process_frame
+		if video_segments and video_segments[-1][2] == is_copy:
+			video_segments[-1] = (video_segments[-1][0], end_frame, is_copy)
+		else:
+			video_segments.append((start_frame, end_frame, is_copy))
+	return video_segments
+
+
+def get_output_video_encoder_commands() -> List[str]:
+	commands = [ '-c:v', facefusion.globals.output_video_encoder ]
 	if facefusion.globals.output_video_encoder in [ 'libx264', 'libx265' ]:
 		output_video_compression = round(51 - (facefusion.globals.output_video_quality * 0.51))
 		commands.extend([ '-crf', str(output_video_compression) ])
@@ -78,24 +204,74 @@ def merge_video(target_path : str, fps : float) -> bool:
 	if facefusion.globals.output_video_encoder in [ 'h264_nvenc', 'hevc_nvenc' ]:
 		output_video_compression = round(51 - (facefusion.globals.output_video_quality * 0.51))
 		commands.extend([ '-cq', str(output_video_compression) ])
-	commands.extend([ '-pix_fmt', 'yuv420p', '-colorspace', 'bt709', '-y', temp_output_video_path ])
-	return run_ffmpeg(commands)
+	commands.extend([ '-pix_fmt', 'yuv420p', '-colorspace', 'bt709' ])
+	return commands
 
 
 def restore_audio(target_path : str, output_path : str) -> bool:
+	temp_output_video_path = get_temp_output_video_path(target_path)
+	commands = [ '-hwaccel', 'auto', '-i', temp_output_video_path ]
+	commands.extend(get_audio_input_commands(target_path))
+	commands.extend([ '-c',  'copy', '-map', '0:v:0', '-map', '1:a:0?', '-shortest', '-y', output_path ])
+	return run_ffmpeg(commands)
+
+
+def get_audio_input_commands(target_path : str) -> List[str]:
 	fps = detect_fps(target_path)
 	trim_frame_start = facefusion.globals.trim_frame_start
 	trim_frame_end = facefusion.globals.trim_frame_end
-	temp_output_video_path = get_temp_output_video_path(target_path)
-	commands = [ '-hwaccel', 'auto', '-i', temp_output_video_path ]
+	commands = []
 	if trim_frame_start is not None:
 		start_time = trim_frame_start / fps
 		commands.extend([ '-ss', str(start_time) ])
 	if trim_frame_end is not None:
 		end_time = trim_frame_end / fps
 		commands.extend([ '-to', str(end_time) ])
-	commands.extend([ '-i', target_path, '-c',  'copy', '-map', '0:v:0', '-map', '1:a:0', '-shortest', '-y', output_path ])
-	return run_ffmpeg(commands)
+	commands.extend([ '-i', target_path ])
+	return commands
+
+
+def create_video_proxy(target_path : str, stop_event : Optional[threading.Event] = None) -> bool:
+	target_resolution = detect_video_resolution(target_path)
+	if target_resolution and max(target_resolution) > VIDEO_PROXY_RESOLUTION:
+		video_proxy_path = get_video_proxy_path(target_path)
+		if is_file(video_proxy_path):
+			os.utime(video_proxy_path)
+			return True
+		target_width, target_height = target_resolution
+		video_proxy_scale = VIDEO_PROXY_RESOLUTION / max(target_width, target_height)
+		video_proxy_width = int(target_width * video_proxy_scale) // 2 * 2
+		video_proxy_height = int(target_height * video_proxy_scale) // 2 * 2
+		temp_video_proxy_path = os.path.join(VIDEO_PROXY_DIRECTORY_PATH, 'partial-' + uuid.uuid4().hex + '.mp4')
+		Path(VIDEO_PROXY_DIRECTORY_PATH).mkdir(parents = True, exist_ok = True)
+		commands = [ '-nostdin', '-hwaccel', 'auto', '-i', target_path, '-map', '0:v:0', '-vf', 'scale=' + str(video_proxy_width) + ':' + str(video_proxy_height), '-c:v', 'libx264', '-preset', 'ultrafast', '-tune', 'fastdecode', '-g', '1', '-crf', '23', '-pix_fmt', 'yuv420p', '-vsync', '0', '-y', temp_video_proxy_path ]
+		if wait_ffmpeg(open_ffmpeg(commands), stop_event):
+			os.replace(temp_video_proxy_path, video_proxy_path)
+			clear_video_proxies(VIDEO_PROXY_LIMIT)
+			return True
+		if is_file(temp_video_proxy_path):
+			os.remove(temp_video_proxy_path)
+	return False
+
+
+def clear_video_proxies(video_proxy_limit : int = 0) -> None:
+	video_proxy_paths = [ video_proxy_path for video_proxy_path in glob.glob(os.path.join(VIDEO_PROXY_DIRECTORY_PATH, '*.mp4')) if not os.path.basename(video_proxy_path).startswith('partial-') ]
+	video_proxy_paths.sort(key = os.path.getmtime, reverse = True)
+	for video_proxy_path in video_proxy_paths[video_proxy_limit:]:
+		os.remove(video_proxy_path)
+
+
+def wait_ffmpeg(process : subprocess.Popen[bytes], stop_event : Optional[threading.Event]) -> bool:
+	while process.poll() is None:
+		if stop_event and stop_event.is_set():
+			process.terminate()
+			process.wait()
+			return False
+		try:
+			process.wait(timeout = 0.5)
+		except subprocess.TimeoutExpired:
+			pass
+	return process.returncode == 0
 
 
 def get_temp_frame_paths(target_path : str) -> List[str]:
@@ -118,6 +294,20 @@ def get_temp_output_video_path(target_path : str) -> str:
 	return os.path.join(temp_directory_path, TEMP_OUTPUT_VIDEO_NAME)
 
 
+def get_video_proxy_path(target_path : str) -> str:
+	target_stat = os.stat(target_path)
+	video_proxy_key = os.path.abspath(target_path) + ':' + str(target_stat.st_size) + ':' + str(target_stat.st_mtime_ns)
+	return os.path.join(VIDEO_PROXY_DIRECTORY_PATH, hashlib.sha1(video_proxy_key.encode()).hexdigest() + '.mp4')
+
+
+def resolve_video_preview_path(target_path : str) -> str:
+	if is_file(target_path):
+		video_proxy_path = get_video_proxy_path(target_path)
+		if is_file(video_proxy_path):
+			return video_proxy_path
+	return target_path
+
+
 def normalize_output_path(source_path : Optional[str], target_path : Optional[str], output_path : Optional[str]) -> Optional[str]:
 	if is_file(source_path) and is_file(target_path) and is_directory(output_path):
 		source_name, _ = os.path.splitext(os.path.basename(source_path))
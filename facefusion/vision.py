@@ -1,38 +1,221 @@
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 from functools import lru_cache
+import bisect
+import json
+import os
+import subprocess
+import threading
 import cv2
 
-from facefusion.typing import Frame
+from facefusion.typing import Frame, VideoProbe, VideoReader, VideoStream, VideoPacket
+
+VIDEO_READERS : Dict[str, VideoReader] = {}
+VIDEO_READER_LIMIT = 2
+VIDEO_KEYFRAME_NUMBERS : Dict[str, Tuple[float, Optional[List[int]]]] = {}
+THREAD_LOCK : threading.Lock = threading.Lock()
 
 
 def get_video_frame(video_path : str, frame_number : int = 0) -> Optional[Frame]:
-	if video_path:
+	video_probe = get_video_probe(video_path)
+	if video_probe:
+		frame_position = max(0, min(video_probe.get('frame_total'), frame_number - 1))
+		with THREAD_LOCK:
+			video_reader = get_video_reader(video_path)
+			if video_reader:
+				capture = video_reader.get('capture')
+				if video_reader.get('frame_position') != frame_position:
+					keyframe_number = find_previous_keyframe_number(video_path, frame_position)
+					if not keyframe_number <= video_reader.get('frame_position') < frame_position:
+						video_reader['frame_position'] = keyframe_number
+						capture.set(cv2.CAP_PROP_POS_FRAMES, keyframe_number)
+				while video_reader.get('frame_position') < frame_position and capture.grab():
+					video_reader['frame_position'] += 1
+				has_frame, frame = capture.read()
+				video_reader['frame_position'] += 1
+				if has_frame:
+					return frame
+	return None
+
+
+def get_video_reader(video_path : str) -> Optional[VideoReader]:
+	video_mtime = os.path.getmtime(video_path)
+	video_reader = VIDEO_READERS.pop(video_path, None)
+	if video_reader and video_reader.get('video_mtime') != video_mtime:
+		video_reader.get('capture').release()
+		video_reader = None
+	if video_reader is None:
 		capture = cv2.VideoCapture(video_path)
-		if capture.isOpened():
-			frame_total = capture.get(cv2.CAP_PROP_FRAME_COUNT)
-			capture.set(cv2.CAP_PROP_POS_FRAMES, min(frame_total, frame_number - 1))
-			has_frame, frame = capture.read()
-			capture.release()
-			if has_frame:
-				return frame
+		if not capture.isOpened():
+			return None
+		video_reader =\
+		{
+			'capture': capture,
+			'video_mtime': video_mtime,
+			'frame_position': 0
+		}
+	VIDEO_READERS[video_path] = video_reader
+	while len(VIDEO_READERS) > VIDEO_READER_LIMIT:
+		expired_video_path = next(iter(VIDEO_READERS))
+		VIDEO_READERS.pop(expired_video_path).get('capture').release()
+	return video_reader
+
+
+def clear_video_readers() -> None:
+	with THREAD_LOCK:
+		for video_reader in VIDEO_READERS.values():
+			video_reader.get('capture').release()
+		VIDEO_READERS.clear()
+
+
+def find_previous_keyframe_number(video_path : str, frame_number : int) -> int:
+	keyframe_numbers = get_video_keyframe_numbers(video_path)
+	if keyframe_numbers:
+		keyframe_index = bisect.bisect_right(keyframe_numbers, frame_number) - 1
+		if keyframe_index >= 0:
+			return keyframe_numbers[keyframe_index]
+	return frame_number
+
+
+def get_video_keyframe_numbers(video_path : str) -> Optional[List[int]]:
+	video_mtime = os.path.getmtime(video_path)
+	video_keyframe_numbers = VIDEO_KEYFRAME_NUMBERS.get(video_path)
+	if video_keyframe_numbers is None or video_keyframe_numbers[0] != video_mtime:
+		VIDEO_KEYFRAME_NUMBERS[video_path] = (video_mtime, None)
+		threading.Thread(target = index_video_keyframe_numbers, args = (video_path, video_mtime), daemon = True).start()
+		return None
+	return video_keyframe_numbers[1]
+
+
+def index_video_keyframe_numbers(video_path : str, video_mtime : float) -> None:
+	keyframe_numbers = detect_video_keyframe_numbers(video_path)
+	if VIDEO_KEYFRAME_NUMBERS.get(video_path) == (video_mtime, None):
+		VIDEO_KEYFRAME_NUMBERS[video_path] = (video_mtime, keyframe_numbers)
+
+
+def get_video_probe(video_path : str) -> Optional[VideoProbe]:
+	if video_path and os.path.isfile(video_path):
+		return probe_video(video_path, os.path.getmtime(video_path))
+	return None
+
+
+@lru_cache(maxsize = 128)
+def probe_video(video_path : str, video_mtime : float) -> Optional[VideoProbe]:
+	capture = cv2.VideoCapture(video_path)
+	if capture.isOpened():
+		fps = capture.get(cv2.CAP_PROP_FPS)
+		frame_total = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+		video_probe : VideoProbe =\
+		{
+			'fps': fps,
+			'frame_total': frame_total,
+			'duration': frame_total / fps if fps else 0.0,
+			'resolution': (int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)), int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))),
+			'rotation': int(capture.get(cv2.CAP_PROP_ORIENTATION_META))
+		}
+		capture.release()
+		return video_probe
 	return None
 
 
 def detect_fps(video_path : str) -> Optional[float]:
-	if video_path:
-		capture = cv2.VideoCapture(video_path)
-		if capture.isOpened():
-			return capture.get(cv2.CAP_PROP_FPS)
+	video_probe = get_video_probe(video_path)
+	if video_probe:
+		return video_probe.get('fps')
+	return None
+
+
+def detect_video_resolution(video_path : str) -> Optional[Tuple[int, int]]:
+	video_probe = get_video_probe(video_path)
+	if video_probe:
+		return video_probe.get('resolution')
+	return None
+
+
+def detect_video_stream(video_path : str) -> Optional[VideoStream]:
+	if video_path and os.path.isfile(video_path):
+		return probe_video_stream(video_path, os.path.getmtime(video_path))
+	return None
+
+
+@lru_cache(maxsize = 128)
+def probe_video_stream(video_path : str, video_mtime : float) -> Optional[VideoStream]:
+	output = run_ffprobe([ '-select_streams', 'v:0', '-show_entries', 'stream=codec_name,profile,pix_fmt,width,height,field_order', '-of', 'json', video_path ])
+	if output:
+		streams = json.loads(output).get('streams')
+		if streams:
+			return\
+			{
+				'codec_name': streams[0].get('codec_name'),
+				'profile': streams[0].get('profile'),
+				'pix_fmt': streams[0].get('pix_fmt'),
+				'width': streams[0].get('width'),
+				'height': streams[0].get('height'),
+				'field_order': streams[0].get('field_order')
+			}
+	return None
+
+
+def detect_video_keyframe_numbers(video_path : str) -> List[int]:
+	return create_keyframe_numbers(detect_video_packets(video_path))
+
+
+def detect_video_cut_frame_numbers(video_path : str) -> List[int]:
+	return create_cut_frame_numbers(detect_video_packets(video_path))
+
+
+def detect_video_packets(video_path : str) -> List[VideoPacket]:
+	if video_path and os.path.isfile(video_path):
+		return probe_video_packets(video_path, os.path.getmtime(video_path))
+	return []
+
+
+@lru_cache(maxsize = 128)
+def probe_video_packets(video_path : str, video_mtime : float) -> List[VideoPacket]:
+	video_packets = []
+	output = run_ffprobe([ '-select_streams', 'v:0', '-show_entries', 'packet=pts_time,flags', '-of', 'csv=print_section=0', video_path ])
+	if output:
+		for line in output.splitlines():
+			pts_time, flags = line.split(',')[:2]
+			if pts_time != 'N/A':
+				video_packets.append((float(pts_time), 'K' in flags))
+	return video_packets
+
+
+def create_keyframe_numbers(video_packets : List[VideoPacket]) -> List[int]:
+	return [ frame_number for frame_number, (_, is_keyframe) in enumerate(sorted(video_packets)) if is_keyframe ]
+
+
+def create_cut_frame_numbers(video_packets : List[VideoPacket]) -> List[int]:
+	frame_numbers = { pts_time: frame_number for frame_number, (pts_time, _) in enumerate(sorted(video_packets)) }
+	cut_frame_numbers = []
+	following_pts_time = float('inf')
+	for pts_time, is_keyframe in reversed(video_packets):
+		if is_keyframe and pts_time <= following_pts_time:
+			cut_frame_numbers.append(frame_numbers[pts_time])
+		following_pts_time = min(following_pts_time, pts_time)
+	return sorted(cut_frame_numbers)
+
+
+def run_ffprobe(args : List[str]) -> Optional[str]:
+	commands = [ 'ffprobe', '-hide_banner', '-loglevel', 'error' ]
+	commands.extend(args)
+	try:
+		return subprocess.run(commands, stdout = subprocess.PIPE, stderr = subprocess.PIPE, check = True).stdout.decode()
+	except subprocess.CalledProcessError:
+		return None
+
+
+def detect_image_resolution(image_path : str) -> Optional[Tuple[int, int]]:
+	image = read_image(image_path)
+	if image is not None:
+		return image.shape[1], image.shape[0]
 	return None
 
 
 def count_video_frame_total(video_path : str) -> int:
-	if video_path:
-		capture = cv2.VideoCapture(video_path)
-		if capture.isOpened():
-			video_frame_total = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
-			capture.release()
-			return video_frame_total
+	video_probe = get_video_probe(video_path)
+	if video_probe:
+		return video_probe.get('frame_total')
 	return 0
 
 
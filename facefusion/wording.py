@@ -13,6 +13,7 @@ WORDING =\
 	'keep_fps_help': 'preserve the frames per second (fps) of the target',
 	'keep_temp_help': 'retain temporary frames after processing',
 	'skip_audio_help': 'omit audio from the target',
+	'smart_cut_help': 'stream copy the unprocessed segments of the target video',
 	'face_recognition_help': 'specify the method for face recognition',
 	'face_analyser_direction_help': 'specify the direction used for face analysis',
 	'face_analyser_age_help': 'specify the age used for face analysis',
@@ -20,6 +21,8 @@ WORDING =\
 	'reference_face_position_help': 'specify the position of the reference face',
 	'reference_face_distance_help': 'specify the distance between the reference face and the target face',
 	'reference_frame_number_help': 'specify the number of the reference frame',
+	'skip_faceless_frames_help': 'omit frames without faces from the face processors',
+	'skip_unselected_frames_help': 'omit frames outside the scanned ranges of the selected face from the face swapper',
 	'trim_frame_start_help': 'specify the start frame for extraction',
 	'trim_frame_end_help': 'specify the end frame for extraction',
 	'temp_frame_format_help': 'specify the image format used for frame extraction',
@@ -28,20 +31,56 @@ WORDING =\
 	'output_video_encoder_help': 'specify the encoder used for the output video',
 	'output_video_quality_help': 'specify the quality used for the output video',
 	'max_memory_help': 'specify the maximum amount of ram to be used (in gb)',
+	'model_memory_budget_help': 'specify the maximum size of the models kept loaded between jobs (in gb, 0 keeps every model loaded)',
 	'execution_providers_help': 'choose from the available execution providers (choices: {choices}, ...)',
 	'execution_thread_count_help': 'specify the number of execution threads',
 	'execution_queue_count_help': 'specify the number of execution queries',
 	'skip_download_help': 'omit automate downloads and lookups',
 	'headless_help': 'run the program in headless mode',
+	'live_inputs_help': 'process the live input streams or files and output them via udp starting at port 27000',
+	'benchmark_help': 'benchmark the processing stages on the target or a synthetic target created from the source',
+	'microbenchmark_help': 'benchmark the per face functions on synthetic frames and compare them to the baseline',
+	'benchmark_cycles_help': 'specify the number of benchmark cycles',
+	'benchmark_output_path_help': 'specify the file to write the benchmark report to',
+	'benchmark_configs_help': 'benchmark the configurations given as key=value pairs separated by commas and compare their quality to the first one',
+	'benchmark_quality_budget_help': 'specify the minimum face ssim a configuration needs to be selected',
+	'benchmark_store_path_help': 'specify the directory to store the benchmark runs',
+	'benchmark_baseline_help': 'store the benchmark or microbenchmark run as baseline for the machine and settings',
+	'benchmark_compare_help': 'compare a benchmark run against its baseline or the first of two runs and exit non-zero on regression',
 	'creating_temp': 'Creating temporary resources',
 	'extracting_frames_fps': 'Extracting frames with {fps} FPS',
+	'loading_models': 'Loading models',
+	'model_loaded': 'Loaded model in {load_time:.2f} seconds and warmed up in {warm_up_time:.2f} seconds',
+	'models_loaded': 'Models ready after {total_time:.2f} seconds',
 	'processing': 'Processing',
+	'benchmark_target_not_video': 'Target is not a video, the benchmark uses a synthetic target instead',
+	'creating_synthetic_target': 'Creating synthetic target',
+	'creating_synthetic_target_failed': 'Creating synthetic target failed',
+	'benchmark_stage': '{stage_name}: {time:.2f} seconds, {fps:.2f} fps, {latency_p50:.0f} ms p50, {latency_p95:.0f} ms p95',
+	'benchmark_config_invalid': 'Benchmark configuration {benchmark_config} is invalid',
+	'benchmark_quality': '{config}: {time:.2f} seconds, {psnr:.2f} db psnr, {ssim:.4f} ssim, {face_psnr:.2f} db face psnr, {face_ssim:.4f} face ssim',
+	'benchmark_quality_not_comparable': 'Benchmark configuration {benchmark_config} changes the frame rate or frame count, skipping the quality comparison',
+	'benchmark_quality_selected': 'Fastest configuration within the quality budget: {config}',
+	'microbenchmark_result': '{microbenchmark_name}: {median:.1f} us median, {iqr:.1f} us iqr, {minimum:.1f} us minimum',
+	'microbenchmark_baseline_saved': 'Microbenchmark baseline saved',
+	'benchmark_run_saved': 'Benchmark run {run_id} saved',
+	'benchmark_run_not_found': 'Benchmark run not found',
+	'benchmark_runs_not_comparable': 'Benchmark runs differ in machine or settings and cannot be compared',
+	'comparing_benchmark_runs': 'Comparing {candidate_run_id} against {baseline_run_id}',
+	'benchmark_comparison': '{stage_name} {metric}: {baseline:.4f} -> {candidate:.4f} ({change:+.1%}, p = {p_value:.3f})',
+	'benchmark_regression': ' REGRESSION',
+	'live_input_not_opened': 'Unable to open live input {live_input}',
+	'live_stream_status': 'Stream {index}: {fps:.1f} fps, {latency:.0f} ms latency, {drop_total} dropped',
+	'stream_quality_changed': 'Stream quality level {level}: scale {scale}, detector interval {detector_interval}, enhancer {enhancer}',
+	'indexing_faces': 'Indexing faces',
 	'downloading': 'Downloading',
 	'temp_frames_not_found': 'Temporary frames not found',
 	'compressing_image': 'Compressing image',
 	'compressing_image_failed': 'Compressing image failed',
 	'merging_video_fps': 'Merging video with {fps} FPS',
 	'merging_video_failed': 'Merging video failed',
+	'merging_video_audio_failed': 'Merging video with audio failed',
+	'smart_cutting_video_failed': 'Smart cutting video failed',
 	'skipping_audio': 'Skipping audio',
 	'restoring_audio': 'Restoring audio',
 	'restoring_audio_failed': 'Restoring audio failed',
@@ -74,6 +113,7 @@ WORDING =\
 	'face_analyser_age_dropdown_label': 'FACE ANALYSER AGE',
 	'face_analyser_gender_dropdown_label': 'FACE ANALYSER GENDER',
 	'reference_face_gallery_label': 'REFERENCE FACE',
+	'face_cluster_gallery_label': 'IDENTITIES',
 	'face_recognition_dropdown_label': 'FACE RECOGNITION',
 	'reference_face_distance_slider_label': 'REFERENCE FACE DISTANCE',
 	'max_memory_slider_label': 'MAX MEMORY',
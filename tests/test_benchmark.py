@@ -0,0 +1,119 @@
+from typing import Dict, List
+from argparse import ArgumentParser
+from pathlib import Path
+import json
+import subprocess
+import sys
+import pytest
+
+import facefusion.choices
+import facefusion.globals
+from facefusion import wording
+from facefusion.benchmark import apply_benchmark_config, restore_benchmark_config, benchmark_frames, create_benchmark_stage, record_stage
+from facefusion.utilities import conditional_download
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	conditional_download('.assets/examples',
+	[
+		'https://github.com/facefusion/facefusion-assets/releases/download/examples/source.jpg',
+		'https://github.com/facefusion/facefusion-assets/releases/download/examples/target-240p.mp4'
+	])
+	subprocess.run([ 'ffmpeg', '-i', '.assets/examples/target-240p.mp4', '-vframes', '1', '.assets/examples/target-240p.jpg' ])
+
+
+@pytest.fixture(scope = 'function')
+def program() -> ArgumentParser:
+	program = ArgumentParser()
+	program.add_argument('--face-analyser-direction', dest = 'face_analyser_direction', default = 'left-right', choices = facefusion.choices.face_analyser_directions)
+	program.add_argument('--reference-face-distance', dest = 'reference_face_distance', type = float, default = 1.5)
+	program.add_argument('--keep-fps', dest = 'keep_fps', action = 'store_true')
+	program.add_argument('--frame-processors', dest = 'frame_processors', default = [ 'face_swapper' ], nargs = '+')
+	facefusion.globals.face_analyser_direction = 'left-right'
+	facefusion.globals.reference_face_distance = 1.5
+	facefusion.globals.keep_fps = False
+	facefusion.globals.frame_processors = [ 'face_swapper' ]
+	return program
+
+
+def test_apply_benchmark_config(program : ArgumentParser) -> None:
+	previous_config = apply_benchmark_config(program, 'face_analyser_direction=small-large,reference_face_distance=0.8,keep_fps=true')
+
+	assert previous_config == { 'face_analyser_direction': 'left-right', 'reference_face_distance': 1.5, 'keep_fps': False }
+	assert facefusion.globals.face_analyser_direction == 'small-large'
+	assert facefusion.globals.reference_face_distance == 0.8
+	assert facefusion.globals.keep_fps is True
+	restore_benchmark_config(previous_config)
+	assert facefusion.globals.face_analyser_direction == 'left-right'
+	assert facefusion.globals.reference_face_distance == 1.5
+	assert facefusion.globals.keep_fps is False
+	assert apply_benchmark_config(program, 'default') == {}
+
+
+def test_apply_invalid_benchmark_config(program : ArgumentParser) -> None:
+	assert apply_benchmark_config(program, 'reference_face_distance=0.8,face_analyser_direction=invalid') is None
+	assert apply_benchmark_config(program, 'reference_face_distance=0.8,keep_fps=maybe') is None
+	assert apply_benchmark_config(program, 'keep_fps=true,reference_face_distance=far') is None
+	assert apply_benchmark_config(program, 'frame_processors=face_enhancer') is None
+	assert apply_benchmark_config(program, 'invalid=1') is None
+	assert facefusion.globals.face_analyser_direction == 'left-right'
+	assert facefusion.globals.reference_face_distance == 1.5
+	assert facefusion.globals.keep_fps is False
+
+
+def test_record_stage() -> None:
+	stage_times : Dict[str, List[float]] = {}
+	stage_latencies : Dict[str, List[float]] = {}
+	record_stage(stage_times, stage_latencies, 'analysis', 2.0, [ 0.1, 0.2 ])
+	record_stage(stage_times, stage_latencies, 'analysis', 1.0, [ 0.3 ])
+	record_stage(stage_times, stage_latencies, 'merge', 0.5, [])
+
+	assert stage_times == { 'analysis': [ 2.0, 1.0 ], 'merge': [ 0.5 ] }
+	assert stage_latencies == { 'analysis': [ 0.1, 0.2, 0.3 ], 'merge': [] }
+
+
+def test_create_benchmark_stage() -> None:
+	benchmark_stage = create_benchmark_stage([ 3.0, 1.0, 2.0 ], [ 0.01, 0.02, 0.03, 0.04 ], 50)
+
+	assert benchmark_stage['time'] == 2.0
+	assert benchmark_stage['fps'] == 25.0
+	assert benchmark_stage['latency_p50'] == pytest.approx(25.0)
+	assert benchmark_stage['latency_p95'] == pytest.approx(38.5)
+	assert create_benchmark_stage([ 0.0 ], [], 50)['fps'] == 0.0
+
+
+def test_benchmark_frames() -> None:
+	frame_paths : List[str] = []
+	stage_time, frame_latencies = benchmark_frames([ 'a', 'b', 'c' ], frame_paths.append)
+
+	assert sorted(frame_paths) == [ 'a', 'b', 'c' ]
+	assert len(frame_latencies) == 3
+	assert stage_time >= max(frame_latencies)
+
+
+def test_benchmark_video(tmp_path : Path) -> None:
+	commands = [ sys.executable, 'run.py', '-s', '.assets/examples/source.jpg', '-t', '.assets/examples/target-240p.mp4', '--trim-frame-end', '10', '--benchmark', '--benchmark-cycles', '1', '--benchmark-output-path', '.assets/examples/benchmark.json', '--benchmark-store-path', str(tmp_path) ]
+	run = subprocess.run(commands, stdout = subprocess.PIPE)
+
+	assert run.returncode == 0
+	with open('.assets/examples/benchmark.json') as benchmark_file:
+		benchmark_report = json.load(benchmark_file)
+	assert benchmark_report['cycle_total'] == 1
+	assert set(benchmark_report['stages']) == { 'extraction', 'analysis', 'face_swapper', 'merge', 'audio_restore' }
+
+
+def test_benchmark_image(tmp_path : Path) -> None:
+	commands = [ sys.executable, 'run.py', '-s', '.assets/examples/source.jpg', '-t', '.assets/examples/target-240p.jpg', '--benchmark', '--benchmark-cycles', '1', '--benchmark-output-path', '.assets/examples/benchmark.json', '--benchmark-store-path', str(tmp_path) ]
+	run = subprocess.run(commands, stdout = subprocess.PIPE)
+
+	assert run.returncode == 0
+	assert wording.get('benchmark_target_not_video') in run.stdout.decode()
+
+
+def test_benchmark_invalid_config(tmp_path : Path) -> None:
+	commands = [ sys.executable, 'run.py', '-s', '.assets/examples/source.jpg', '-t', '.assets/examples/target-240p.mp4', '--benchmark', '--benchmark-configs', 'keep_fps=maybe', '--benchmark-store-path', str(tmp_path) ]
+	run = subprocess.run(commands, stdout = subprocess.PIPE)
+
+	assert run.returncode == 1
+	assert wording.get('benchmark_config_invalid').format(benchmark_config = 'keep_fps=maybe') in run.stdout.decode()
@@ -0,0 +1,57 @@
+from typing import List
+import numpy
+
+from facefusion.benchmark_quality import calc_psnr, calc_ssim, crop_face_box, is_benchmark_quality_comparable, select_benchmark_quality
+from facefusion.typing import BenchmarkQuality, BenchmarkReport
+
+
+def create_benchmark_report(fps : float) -> BenchmarkReport:
+	return\
+	{
+		'config': 'default',
+		'target_path': 'target.mp4',
+		'resolution': '320x240',
+		'fps': fps,
+		'frame_total': 2,
+		'cycle_total': 1,
+		'frame_processors': [ 'face_swapper' ],
+		'stages': {}
+	}
+
+
+def test_calc_psnr() -> None:
+	frame = numpy.full((64, 64, 3), 128, dtype = numpy.uint8)
+	assert calc_psnr(frame, frame) == 100.0
+	assert round(calc_psnr(frame + 1, frame), 2) == 48.13
+
+
+def test_calc_ssim() -> None:
+	frame = numpy.random.default_rng(0).integers(0, 255, (64, 64, 3), dtype = numpy.uint8)
+	assert round(calc_ssim(frame, frame), 4) == 1.0
+	assert calc_ssim(255 - frame, frame) < 0
+
+
+def test_crop_face_box() -> None:
+	frame = numpy.zeros((64, 64, 3), dtype = numpy.uint8)
+	assert crop_face_box(frame, (-8, -8, 32, 32)).shape == (32, 32, 3)
+	assert crop_face_box(frame, (0, 0, 8, 8)) is None
+
+
+def test_select_benchmark_quality() -> None:
+	benchmark_qualities : List[BenchmarkQuality] =\
+	[
+		{ 'config': 'default', 'time': 4.0, 'psnr': 100.0, 'ssim': 1.0, 'face_psnr': 100.0, 'face_ssim': 1.0 },
+		{ 'config': 'temp_frame_quality=50', 'time': 3.0, 'psnr': 40.0, 'ssim': 0.97, 'face_psnr': 38.0, 'face_ssim': 0.96 },
+		{ 'config': 'face_swapper_model=inswapper_128_fp16', 'time': 2.0, 'psnr': 30.0, 'ssim': 0.9, 'face_psnr': 28.0, 'face_ssim': 0.9 }
+	]
+	assert select_benchmark_quality(benchmark_qualities, 0.95)['config'] == 'temp_frame_quality=50'
+	assert select_benchmark_quality(benchmark_qualities, 0.8)['config'] == 'face_swapper_model=inswapper_128_fp16'
+	assert select_benchmark_quality(benchmark_qualities, 1.1) is None
+
+
+def test_is_benchmark_quality_comparable() -> None:
+	frame_paths = [ '0001.jpg', '0002.jpg' ]
+
+	assert is_benchmark_quality_comparable(create_benchmark_report(25.0), create_benchmark_report(25.0), frame_paths, frame_paths) is True
+	assert is_benchmark_quality_comparable(create_benchmark_report(30.0), create_benchmark_report(25.0), frame_paths, frame_paths) is False
+	assert is_benchmark_quality_comparable(create_benchmark_report(25.0), create_benchmark_report(25.0), frame_paths[:1], frame_paths) is False
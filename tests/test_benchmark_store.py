@@ -0,0 +1,15 @@
+import pytest
+
+from facefusion.benchmark_store import calc_welch_p_value, compare_samples
+
+
+def test_calc_welch_p_value() -> None:
+	assert calc_welch_p_value([ 1, 2, 3, 4 ], [ 3, 4, 5, 6 ]) == pytest.approx(0.0710, abs = 0.0001)
+	assert calc_welch_p_value([ 1.0, 1.1, 0.9 ], [ 1.0, 1.05, 0.95 ]) == 1.0
+	assert calc_welch_p_value([ 1.0 ], [ 2.0, 2.1 ]) == 1.0
+
+
+def test_compare_samples() -> None:
+	assert compare_samples('analysis', 'time', [ 1.0, 1.01, 0.99, 1.0 ], [ 1.5, 1.51, 1.49, 1.5 ])['regression'] is True
+	assert compare_samples('analysis', 'time', [ 1.5, 1.51, 1.49, 1.5 ], [ 1.0, 1.01, 0.99, 1.0 ])['regression'] is False
+	assert compare_samples('analysis', 'time', [ 1.0, 1.01, 0.99, 1.0 ], [ 1.02, 1.03, 1.01, 1.02 ])['regression'] is False
@@ -30,3 +30,19 @@ def test_image_to_video() -> None:
 
 	assert run.returncode == 0
 	assert wording.get('processing_video_succeed') in run.stdout.decode()
+
+
+def test_import_time() -> None:
+	commands = [ sys.executable, '-X', 'importtime', 'run.py', '--help' ]
+	run = subprocess.run(commands, stdout = subprocess.PIPE, stderr = subprocess.PIPE)
+	import_times = {}
+	for line in run.stderr.decode().splitlines():
+		if line.startswith('import time:') and '|' in line:
+			_, cumulative_time, import_name = line.split('|')
+			if cumulative_time.strip().isdigit():
+				import_times[import_name.strip()] = int(cumulative_time)
+
+	assert run.returncode == 0
+	for import_name in [ 'tensorflow', 'keras', 'opennsfw2', 'insightface', 'basicsr', 'realesrgan', 'torch' ]:
+		assert import_name not in import_times
+	assert import_times.get('facefusion.core', 0) < 3000000
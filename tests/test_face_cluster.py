@@ -0,0 +1,82 @@
+from typing import Any
+import numpy
+import pytest
+from insightface.app.common import Face
+
+import facefusion.globals
+import facefusion.face_cluster as face_cluster
+from facefusion.face_cluster import create_face_clusters, create_frame_ranges, find_reference_face_cluster, filter_face_cluster_frame_paths, clear_face_clusters
+from facefusion.face_reference import set_face_reference, clear_face_reference
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	facefusion.globals.face_recognition = 'reference'
+	facefusion.globals.reference_face_distance = 1.5
+	facefusion.globals.skip_unselected_frames = False
+	facefusion.globals.trim_frame_start = None
+	facefusion.globals.trim_frame_end = None
+	clear_face_clusters()
+	clear_face_reference()
+
+
+def create_face(embedding : numpy.ndarray[Any, Any], det_score : float) -> Face:
+	return Face(embedding = embedding.astype(numpy.float32), det_score = det_score)
+
+
+def test_create_frame_ranges() -> None:
+	assert create_frame_ranges([ 10 ], [ 0, 10, 20, 30 ], 40) == [ (0, 21) ]
+	assert create_frame_ranges([ 0, 10 ], [ 0, 10, 20, 30 ], 40) == [ (0, 21) ]
+	assert create_frame_ranges([ 0, 30 ], [ 0, 10, 20, 30 ], 40) == [ (0, 11), (20, 40) ]
+	assert create_frame_ranges([ 10 ], [ 0, 10, 20, 30, 40, 50 ], 60) == [ (0, 21) ]
+	assert create_frame_ranges([ 10, 40 ], [ 0, 10, 20, 30, 40, 50 ], 60) == [ (0, 21), (30, 51) ]
+	assert create_frame_ranges([], [ 0, 10, 20, 30 ], 40) == []
+
+
+def test_create_face_clusters() -> None:
+	faces =\
+	[
+		create_face(numpy.array([ 1, 0, 0 ]), 0.7),
+		create_face(numpy.array([ 0, 1, 0 ]), 0.9),
+		create_face(numpy.array([ 1, 0.1, 0 ]), 0.8),
+		create_face(numpy.array([ 0, 1, 0.1 ]), 0.6),
+		create_face(numpy.array([ 0.9, 0, 0.1 ]), 0.5)
+	]
+	face_clusters = create_face_clusters(faces, [ 0, 0, 10, 20, 30 ], [ 0, 10, 20, 30 ], 40)
+
+	assert len(face_clusters) == 2
+	assert face_clusters[0].get('face') is faces[2]
+	assert face_clusters[0].get('face_total') == 3
+	assert face_clusters[0].get('frame_number') == 10
+	assert face_clusters[0].get('frame_ranges') == [ (0, 40) ]
+	assert face_clusters[0].get('crop_frame') is None
+	assert face_clusters[1].get('face') is faces[1]
+	assert face_clusters[1].get('face_total') == 2
+	assert face_clusters[1].get('frame_ranges') == [ (0, 31) ]
+	assert create_face_clusters([], [], [ 0, 10 ], 20) == []
+
+
+def test_filter_face_cluster_frame_paths() -> None:
+	temp_frame_paths = [ str(index).zfill(4) + '.jpg' for index in range(10) ]
+
+	assert filter_face_cluster_frame_paths(temp_frame_paths) == temp_frame_paths
+
+
+def test_find_reference_face_cluster() -> None:
+	face_cluster.FACE_CLUSTERS = create_face_clusters([ create_face(numpy.array([ 1, 0, 0 ]), 0.9), create_face(numpy.array([ 0, 1, 0 ]), 0.8) ], [ 0, 10 ], [ 0, 10, 20 ], 30)
+
+	assert find_reference_face_cluster() is None
+	set_face_reference(create_face(numpy.array([ 0.1, 1, 0 ]), 0.7))
+	assert find_reference_face_cluster() is face_cluster.FACE_CLUSTERS[1]
+	set_face_reference(create_face(numpy.array([ 0, 0, 1 ]), 0.7))
+	assert find_reference_face_cluster() is None
+
+
+def test_filter_face_cluster_frame_paths_with_skip_unselected_frames() -> None:
+	temp_frame_paths = [ str(index).zfill(4) + '.jpg' for index in range(40) ]
+	facefusion.globals.skip_unselected_frames = True
+	facefusion.globals.trim_frame_end = 40
+	face_cluster.FACE_CLUSTERS = create_face_clusters([ create_face(numpy.array([ 1, 0, 0 ]), 0.9) ], [ 10 ], [ 0, 10, 20, 30 ], 40)
+	set_face_reference(create_face(numpy.array([ 1, 0.1, 0 ]), 0.7))
+
+	assert filter_face_cluster_frame_paths(temp_frame_paths) == temp_frame_paths[:21]
@@ -0,0 +1,45 @@
+import subprocess
+import numpy
+import pytest
+
+import facefusion.globals
+import facefusion.face_index as face_index
+from facefusion.face_index import filter_face_frame_paths, create_face_index, clear_face_index
+from facefusion.utilities import conditional_download
+from facefusion.vision import write_image
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	facefusion.globals.execution_providers = [ 'CPUExecutionProvider' ]
+	facefusion.globals.execution_thread_count = 1
+	conditional_download('.assets/examples',
+	[
+		'https://github.com/facefusion/facefusion-assets/releases/download/examples/source.jpg'
+	])
+	subprocess.run([ 'ffmpeg', '-i', '.assets/examples/source.jpg', '-vf', 'scale=iw/4:ih/4', '-y', '.assets/examples/source-small.jpg' ])
+	write_image('.assets/examples/faceless.jpg', numpy.zeros((240, 320, 3), dtype = numpy.uint8))
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	clear_face_index()
+
+
+def test_create_face_index() -> None:
+	create_face_index([ '.assets/examples/source.jpg', '.assets/examples/source-small.jpg', '.assets/examples/faceless.jpg' ])
+
+	assert face_index.FACE_INDEX.get('.assets/examples/source.jpg') is True
+	assert face_index.FACE_INDEX.get('.assets/examples/source-small.jpg') is True
+	assert face_index.FACE_INDEX.get('.assets/examples/faceless.jpg') is False
+
+
+def test_filter_face_frame_paths() -> None:
+	temp_frame_paths = [ '.assets/examples/source.jpg', '.assets/examples/faceless.jpg' ]
+	facefusion.globals.skip_faceless_frames = False
+
+	assert filter_face_frame_paths(temp_frame_paths) == temp_frame_paths
+
+	facefusion.globals.skip_faceless_frames = True
+
+	assert filter_face_frame_paths(temp_frame_paths) == [ '.assets/examples/source.jpg' ]
@@ -0,0 +1,84 @@
+from typing import List
+import pytest
+
+import facefusion.globals
+from facefusion.benchmark_store import get_microbenchmark_baseline_path
+from facefusion.microbenchmark import MICROBENCHMARK_ROUNDS, MICROBENCHMARK_ROUND_TIME, measure_microbenchmark, measure_iterations, compare_microbenchmark
+from facefusion.processors.frame import globals as frame_processors_globals
+from facefusion.typing import MicrobenchmarkResult
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	facefusion.globals.benchmark_store_path = '.assets/benchmarks'
+	facefusion.globals.face_analyser_direction = 'left-right'
+	facefusion.globals.face_analyser_age = None
+	facefusion.globals.face_analyser_gender = None
+	facefusion.globals.reference_face_distance = 1.5
+	facefusion.globals.temp_frame_format = 'jpg'
+	facefusion.globals.temp_frame_quality = 100
+	frame_processors_globals.face_enhancer_blend = 80
+
+
+def create_microbenchmark_result(samples : List[float]) -> MicrobenchmarkResult:
+	return\
+	{
+		'iterations': 1,
+		'median': samples[len(samples) // 2],
+		'iqr': 0.0,
+		'minimum': min(samples),
+		'samples': samples
+	}
+
+
+def test_measure_iterations() -> None:
+	calls : List[None] = []
+
+	assert measure_iterations(lambda: calls.append(None), 8) >= 0
+	assert len(calls) == 8
+
+
+def test_measure_microbenchmark() -> None:
+	calls : List[int] = []
+	microbenchmark_result = measure_microbenchmark(lambda: calls.append(sum(range(100))))
+	iterations = microbenchmark_result['iterations']
+
+	assert iterations & (iterations - 1) == 0
+	assert len(microbenchmark_result['samples']) == MICROBENCHMARK_ROUNDS
+	assert len(calls) >= 1 + iterations * (MICROBENCHMARK_ROUNDS + 1)
+	assert min(microbenchmark_result['samples']) * iterations / 1000000 >= MICROBENCHMARK_ROUND_TIME * 0.5
+	assert microbenchmark_result['minimum'] <= microbenchmark_result['median']
+	assert microbenchmark_result['iqr'] >= 0
+
+
+def test_compare_microbenchmark() -> None:
+	microbenchmark_baseline =\
+	{
+		'warp_face@480p': create_microbenchmark_result([ 100.0, 101.0, 99.0, 100.0, 100.5 ]),
+		'paste_back@480p': create_microbenchmark_result([ 200.0, 201.0, 199.0, 200.0, 200.5 ])
+	}
+
+	assert compare_microbenchmark(microbenchmark_baseline, microbenchmark_baseline) is False
+	assert compare_microbenchmark(microbenchmark_baseline,
+	{
+		'warp_face@480p': create_microbenchmark_result([ 80.0, 81.0, 79.0, 80.0, 80.5 ]),
+		'blend_frame@480p': create_microbenchmark_result([ 900.0, 901.0, 899.0, 900.0, 900.5 ])
+	}) is False
+	assert compare_microbenchmark(microbenchmark_baseline,
+	{
+		'warp_face@480p': create_microbenchmark_result([ 100.0, 101.0, 99.0, 100.0, 100.5 ]),
+		'paste_back@480p': create_microbenchmark_result([ 300.0, 301.0, 299.0, 300.0, 300.5 ])
+	}) is True
+
+
+def test_get_microbenchmark_baseline_path() -> None:
+	microbenchmark_baseline_path = get_microbenchmark_baseline_path()
+
+	assert get_microbenchmark_baseline_path() == microbenchmark_baseline_path
+	frame_processors_globals.face_enhancer_blend = 50
+	assert get_microbenchmark_baseline_path() != microbenchmark_baseline_path
+	frame_processors_globals.face_enhancer_blend = 80
+	facefusion.globals.temp_frame_format = 'png'
+	assert get_microbenchmark_baseline_path() != microbenchmark_baseline_path
+	facefusion.globals.temp_frame_format = 'jpg'
+	assert get_microbenchmark_baseline_path() == microbenchmark_baseline_path
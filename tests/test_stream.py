@@ -0,0 +1,35 @@
+import numpy
+import pytest
+from insightface.app.common import Face
+
+import facefusion.globals
+from facefusion.stream import create_stream_controller, create_motion_frame, is_static_stream_frame, composite_stream_frame, set_motion_reference
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	facefusion.globals.frame_processors = [ 'face_swapper' ]
+
+
+def test_composite_stream_frame_with_face_processor() -> None:
+	capture_frame = numpy.full((240, 320, 3), 64, dtype = numpy.uint8)
+	result_frame = numpy.full((240, 320, 3), 192, dtype = numpy.uint8)
+	stream_controller = create_stream_controller()
+	set_motion_reference(stream_controller, create_motion_frame(capture_frame), result_frame, [], 1.0, 0.0)
+
+	assert is_static_stream_frame(stream_controller, create_motion_frame(capture_frame), 0.1) is True
+	assert numpy.array_equal(composite_stream_frame(stream_controller, capture_frame), capture_frame)
+
+
+def test_composite_stream_frame_with_frame_processor() -> None:
+	facefusion.globals.frame_processors = [ 'face_swapper', 'frame_enhancer' ]
+	capture_frame = numpy.full((240, 320, 3), 64, dtype = numpy.uint8)
+	result_frame = numpy.full((240, 320, 3), 192, dtype = numpy.uint8)
+	stream_controller = create_stream_controller()
+	set_motion_reference(stream_controller, create_motion_frame(capture_frame), result_frame, [ Face(bbox = numpy.array([ 10, 10, 50, 50 ])) ], 1.0, 0.0)
+
+	assert stream_controller['motion_regions'] == [ (0, 0, 320, 240) ]
+	assert is_static_stream_frame(stream_controller, create_motion_frame(capture_frame), 0.1) is True
+	assert numpy.array_equal(composite_stream_frame(stream_controller, capture_frame), result_frame)
+	capture_frame[0:120] = 255
+	assert is_static_stream_frame(stream_controller, create_motion_frame(capture_frame), 0.1) is False
@@ -1,10 +1,15 @@
+from typing import Optional
 import glob
+import os
 import platform
+import shutil
 import subprocess
+import threading
 import pytest
 
 import facefusion.globals
-from facefusion.utilities import conditional_download, extract_frames, create_temp, get_temp_directory_path, clear_temp, normalize_output_path, is_file, is_directory, is_image, is_video, get_download_size, is_download_done, encode_execution_providers, decode_execution_providers
+from facefusion.typing import VideoStream
+from facefusion.utilities import VIDEO_PROXY_DIRECTORY_PATH, VIDEO_PROXY_LIMIT, conditional_download, clear_video_proxies, extract_frames, create_video_segments, is_smart_cut_compatible, create_temp, get_temp_directory_path, create_video_proxy, get_video_proxy_path, resolve_video_preview_path, clear_temp, normalize_output_path, is_file, is_directory, is_image, is_video, get_download_size, is_download_done, encode_execution_providers, decode_execution_providers
 
 
 @pytest.fixture(scope = 'module', autouse = True)
@@ -21,6 +26,7 @@ def before_all() -> None:
 	subprocess.run([ 'ffmpeg', '-i', '.assets/examples/target-240p.mp4', '-vf', 'fps=25', '.assets/examples/target-240p-25fps.mp4' ])
 	subprocess.run([ 'ffmpeg', '-i', '.assets/examples/target-240p.mp4', '-vf', 'fps=30', '.assets/examples/target-240p-30fps.mp4' ])
 	subprocess.run([ 'ffmpeg', '-i', '.assets/examples/target-240p.mp4', '-vf', 'fps=60', '.assets/examples/target-240p-60fps.mp4' ])
+	subprocess.run([ 'ffmpeg', '-i', '.assets/examples/target-240p.mp4', '-vf', 'scale=1280:-2', '.assets/examples/target-720p.mp4' ])
 
 
 @pytest.fixture(scope = 'function', autouse = True)
@@ -103,6 +109,87 @@ def test_extract_frames_with_trim_end() -> None:
 		clear_temp(target_path)
 
 
+def test_create_video_segments() -> None:
+	assert create_video_segments([ 0, 10, 20 ], [], 30) == [ (0, 30, True) ]
+	assert create_video_segments([ 0, 10, 20 ], [ 12, 13 ], 30) == [ (0, 10, True), (10, 20, False), (20, 30, True) ]
+	assert create_video_segments([ 5 ], [], 10) == [ (0, 5, False), (5, 10, True) ]
+	assert create_video_segments([], [ 3 ], 10) == [ (0, 10, False) ]
+
+
+def test_is_smart_cut_compatible() -> None:
+	video_stream = create_video_stream()
+
+	assert is_smart_cut_compatible(video_stream, (426, 226), 25.0, 25.0, 'libx264') is True
+	assert is_smart_cut_compatible(video_stream, (426, 226), 29.97, 30000 / 1001, 'libx264') is True
+	assert is_smart_cut_compatible(video_stream, (426, 226), 30.0, 25.0, 'libx264') is False
+	assert is_smart_cut_compatible(video_stream, (426, 226), 25.0, None, 'libx264') is False
+	assert is_smart_cut_compatible(video_stream, (426, 226), 25.0, 25.0, 'libx265') is False
+	assert is_smart_cut_compatible(video_stream, (852, 452), 25.0, 25.0, 'libx264') is False
+	assert is_smart_cut_compatible(create_video_stream(profile = 'High 4:4:4 Intra'), (426, 226), 25.0, 25.0, 'libx264') is False
+	assert is_smart_cut_compatible(create_video_stream(field_order = 'tt'), (426, 226), 25.0, 25.0, 'libx264') is False
+	assert is_smart_cut_compatible(create_video_stream(pix_fmt = None), (426, 226), 25.0, 25.0, 'libx264') is False
+
+
+def create_video_stream(profile : Optional[str] = 'High', pix_fmt : Optional[str] = 'yuv420p', field_order : Optional[str] = 'progressive') -> VideoStream:
+	return\
+	{
+		'codec_name': 'h264',
+		'profile': profile,
+		'pix_fmt': pix_fmt,
+		'width': 426,
+		'height': 226,
+		'field_order': field_order
+	}
+
+
+def test_get_video_proxy_path() -> None:
+	shutil.copyfile('.assets/examples/target-240p.mp4', '.assets/examples/target-240p-copy.mp4')
+	video_proxy_path = get_video_proxy_path('.assets/examples/target-240p-copy.mp4')
+
+	assert get_video_proxy_path(os.path.abspath('.assets/examples/target-240p-copy.mp4')) == video_proxy_path
+	assert get_video_proxy_path('.assets/examples/target-240p.mp4') != video_proxy_path
+	os.utime('.assets/examples/target-240p-copy.mp4', (0, 0))
+	assert get_video_proxy_path('.assets/examples/target-240p-copy.mp4') != video_proxy_path
+
+
+def test_resolve_video_preview_path() -> None:
+	video_proxy_path = get_video_proxy_path('.assets/examples/target-720p.mp4')
+	if is_file(video_proxy_path):
+		os.remove(video_proxy_path)
+
+	assert resolve_video_preview_path('.assets/examples/target-720p.mp4') == '.assets/examples/target-720p.mp4'
+	assert create_video_proxy('.assets/examples/target-240p.mp4') is False
+	assert create_video_proxy('.assets/examples/target-720p.mp4') is True
+	assert resolve_video_preview_path('.assets/examples/target-720p.mp4') == video_proxy_path
+	video_proxy_inode = os.stat(video_proxy_path).st_ino
+	assert create_video_proxy('.assets/examples/target-720p.mp4') is True
+	assert os.stat(video_proxy_path).st_ino == video_proxy_inode
+	assert not glob.glob(os.path.join(os.path.dirname(video_proxy_path), 'partial-*'))
+	assert resolve_video_preview_path('invalid') == 'invalid'
+
+
+def test_create_video_proxy_with_stop() -> None:
+	stop_event = threading.Event()
+	stop_event.set()
+	clear_video_proxies()
+
+	assert create_video_proxy('.assets/examples/target-720p.mp4', stop_event) is False
+	assert not is_file(get_video_proxy_path('.assets/examples/target-720p.mp4'))
+	assert not glob.glob(os.path.join(VIDEO_PROXY_DIRECTORY_PATH, '*.mp4'))
+
+
+def test_clear_video_proxies() -> None:
+	for index in range(VIDEO_PROXY_LIMIT + 2):
+		shutil.copyfile('.assets/examples/target-720p.mp4', '.assets/examples/target-720p-' + str(index) + '.mp4')
+		assert create_video_proxy('.assets/examples/target-720p-' + str(index) + '.mp4') is True
+
+	assert len(glob.glob(os.path.join(VIDEO_PROXY_DIRECTORY_PATH, '*.mp4'))) == VIDEO_PROXY_LIMIT
+	assert is_file(get_video_proxy_path('.assets/examples/target-720p-' + str(VIDEO_PROXY_LIMIT + 1) + '.mp4'))
+	assert not is_file(get_video_proxy_path('.assets/examples/target-720p-0.mp4'))
+	clear_video_proxies()
+	assert not glob.glob(os.path.join(VIDEO_PROXY_DIRECTORY_PATH, '*.mp4'))
+
+
 def test_normalize_output_path() -> None:
 	if platform.system().lower() != 'windows':
 		assert normalize_output_path('.assets/examples/source.jpg', None, '.assets/examples/target-240p.mp4') == '.assets/examples/target-240p.mp4'
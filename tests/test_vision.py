@@ -1,9 +1,12 @@
+import os
 import subprocess
+import cv2
+import numpy
 import pytest
 
 import facefusion.globals
 from facefusion.utilities import  conditional_download
-from facefusion.vision import get_video_frame, detect_fps, count_video_frame_total
+from facefusion.vision import VIDEO_READERS, VIDEO_KEYFRAME_NUMBERS, get_video_frame, get_video_keyframe_numbers, index_video_keyframe_numbers, clear_video_readers, get_video_probe, detect_fps, detect_video_resolution, count_video_frame_total, create_keyframe_numbers, create_cut_frame_numbers
 
 
 @pytest.fixture(scope = 'module', autouse = True)
@@ -35,6 +38,33 @@ def test_get_video_frame() -> None:
 	assert get_video_frame('invalid') is None
 
 
+def test_get_video_frame_with_seek() -> None:
+	clear_video_readers()
+	video_frame = get_video_frame('.assets/examples/target-240p-25fps.mp4', 100)
+	video_capture = VIDEO_READERS.get('.assets/examples/target-240p-25fps.mp4').get('capture')
+	get_video_frame('.assets/examples/target-240p-25fps.mp4', 200)
+	get_video_frame('.assets/examples/target-240p-25fps.mp4', 50)
+
+	assert VIDEO_READERS.get('.assets/examples/target-240p-25fps.mp4').get('capture') is video_capture
+	for frame_number in [ 100, 101, 50 ]:
+		capture = cv2.VideoCapture('.assets/examples/target-240p-25fps.mp4')
+		capture.set(cv2.CAP_PROP_POS_FRAMES, frame_number - 1)
+		_, reference_frame = capture.read()
+		capture.release()
+
+		assert numpy.array_equal(get_video_frame('.assets/examples/target-240p-25fps.mp4', frame_number), reference_frame)
+	assert numpy.array_equal(get_video_frame('.assets/examples/target-240p-25fps.mp4', 100), video_frame)
+	assert VIDEO_READERS.get('.assets/examples/target-240p-25fps.mp4').get('capture') is video_capture
+
+
+def test_get_video_keyframe_numbers() -> None:
+	VIDEO_KEYFRAME_NUMBERS.clear()
+
+	assert get_video_keyframe_numbers('.assets/examples/target-240p-25fps.mp4') is None
+	index_video_keyframe_numbers('.assets/examples/target-240p-25fps.mp4', os.path.getmtime('.assets/examples/target-240p-25fps.mp4'))
+	assert get_video_keyframe_numbers('.assets/examples/target-240p-25fps.mp4')[0] == 0
+
+
 def test_detect_fps() -> None:
 	assert detect_fps('.assets/examples/target-240p-25fps.mp4') == 25.0
 	assert detect_fps('.assets/examples/target-240p-30fps.mp4') == 30.0
@@ -42,8 +72,30 @@ def test_detect_fps() -> None:
 	assert detect_fps('invalid') is None
 
 
+def test_get_video_probe() -> None:
+	assert get_video_probe('.assets/examples/target-240p-25fps.mp4') is get_video_probe('.assets/examples/target-240p-25fps.mp4')
+	assert get_video_probe('.assets/examples/target-240p-25fps.mp4').get('duration') == 10.8
+	assert get_video_probe('invalid') is None
+
+
+def test_detect_video_resolution() -> None:
+	assert detect_video_resolution('.assets/examples/target-240p-25fps.mp4') == (426, 226)
+	assert detect_video_resolution('invalid') is None
+
+
 def test_count_video_frame_total() -> None:
 	assert count_video_frame_total('.assets/examples/target-240p-25fps.mp4') == 270
 	assert count_video_frame_total('.assets/examples/target-240p-30fps.mp4') == 324
 	assert count_video_frame_total('.assets/examples/target-240p-60fps.mp4') == 648
 	assert count_video_frame_total('invalid') == 0
+
+
+def test_create_keyframe_numbers() -> None:
+	assert create_keyframe_numbers([ (0.0, True), (0.12, False), (0.04, False), (0.08, False), (0.16, True) ]) == [ 0, 4 ]
+	assert create_keyframe_numbers([]) == []
+
+
+def test_create_cut_frame_numbers() -> None:
+	assert create_cut_frame_numbers([ (0.0, True), (0.04, False), (0.08, True), (0.12, False) ]) == [ 0, 2 ]
+	assert create_cut_frame_numbers([ (0.0, True), (0.12, False), (0.04, False), (0.08, False), (0.24, True), (0.16, False), (0.20, False) ]) == [ 0 ]
+	assert create_cut_frame_numbers([ (0.0, False), (0.04, True) ]) == [ 1 ]